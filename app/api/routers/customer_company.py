@@ -1,74 +1,102 @@
 # routers/customer_company.py
-from fastapi import APIRouter, Depends, HTTPException, Query, Path, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Body, File, UploadFile, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
-from app.database import get_async_db
+from typing import List, Optional, Literal
+from app.database import get_async_db, get_async_read_db
 from app.schemas.customer_company import (
     CustomerCompany, 
     CustomerCompanyCreate, 
     CustomerCompanyUpdate,
     CustomerCompanyList
 )
+from app.schemas.imports import ImportResult
 from app.services.customer_company_service import AsyncCustomerCompanyService
+from app.core.etag import not_modified
+from app.core.instrumentation import statement_budget
+from app.core.responses import fast_json
+from app.core.spreadsheet import UnsupportedFileType
 
 router = APIRouter()
 
 @router.get("/", response_model=CustomerCompanyList)
 async def get_companies(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     search: Optional[str] = Query(None, description="Search by company name, contact person, location, phone, or email"),
     city: Optional[str] = Query(None, description="Filter by city"),
     state: Optional[str] = Query(None, description="Filter by state"),
     contract_type: Optional[str] = Query(None, description="Filter by contract type"),
-    db: AsyncSession = Depends(get_async_db)
+    after: Optional[str] = Query(None, description="Cursor from next_cursor of the previous page; replaces skip"),
+    count: Literal["exact", "estimated", "none"] = Query("exact", description="How to compute total: exact, estimated or none"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get all companies with pagination and filtering options.
     
     - **skip**: Number of records to skip (for pagination)
     - **limit**: Maximum number of records to return
-    - **search**: Search across multiple fields
+    - **search**: Search across multiple fields, best matches first
     - **city**: Filter by specific city
     - **state**: Filter by specific state
     - **contract_type**: Filter by contract type
+    - **after**: Continue after the `next_cursor` of a previous page (constant time at any depth)
+    - **count**: `exact` (default) counts every match, `estimated` uses planner statistics
+      or a capped count, `none` skips the count; `total_type` in the response says which was used
     """
+    cached = await not_modified(request, response, db, "customer_company")
+    if cached:
+        return cached
     service = AsyncCustomerCompanyService(db)
-    return await service.get_companies(
+    page = await service.get_companies(
         skip=skip, 
         limit=limit, 
         search=search,
         city=city,
         state=state,
-        contract_type=contract_type
+        contract_type=contract_type,
+        after=after,
+        count=count
     )
+    return fast_json(page, response)
 
-@router.get("/search", response_model=List[CustomerCompany])
+@router.get("/search", response_model=List[CustomerCompany], openapi_extra=statement_budget(2))
 async def search_companies(
+    request: Request,
+    response: Response,
     name: str = Query(..., min_length=1, description="Company name to search (minimum 1 character)"),
     limit: int = Query(10, ge=1, le=50, description="Maximum results to return"),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
-    Search companies by name with partial matching.
+    Search companies by name with partial and typo-tolerant matching, ranked by relevance.
     
-    - **name**: Company name to search for (partial match)
+    - **name**: Company name to search for (partial or approximate match)
     - **limit**: Maximum number of results to return
     """
+    cached = await not_modified(request, response, db, "customer_company")
+    if cached:
+        return cached
     service = AsyncCustomerCompanyService(db)
     return await service.search_companies_by_name(name, limit)
 
 
-@router.get("/{company_id}", response_model=CustomerCompany)
+@router.get("/{company_id}", response_model=CustomerCompany, openapi_extra=statement_budget(2))
 async def get_company(
+    request: Request,
+    response: Response,
     company_id: int = Path(..., gt=0, description="Company ID"),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get a specific company by ID.
     
     - **company_id**: The ID of the company to retrieve
     """
+    cached = await not_modified(request, response, db, "customer_company")
+    if cached:
+        return cached
     service = AsyncCustomerCompanyService(db)
     company = await service.get_company(company_id)
     if not company:
@@ -101,6 +129,26 @@ async def create_company(
     service = AsyncCustomerCompanyService(db)
     return await service.create_company(company)
 
+@router.post("/import", response_model=ImportResult)
+async def import_companies(
+    file: UploadFile = File(..., description="CSV or XLSX with a header row"),
+    on_conflict: Literal["skip", "update"] = Query("skip", description="Existing company name: skip or update"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Import companies from a spreadsheet.
+    
+    - **file**: CSV or XLSX whose header row uses the create fields
+      (name, phone, contact_person, email, city, state, pincode, ...)
+    - **on_conflict**: `skip` keeps existing companies with the same name, `update` overwrites them
+    - Rows are streamed and written in batches; invalid rows are reported with their line number
+    """
+    service = AsyncCustomerCompanyService(db)
+    try:
+        return await service.import_companies(file, on_conflict)
+    except UnsupportedFileType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
 @router.put("/{company_id}", response_model=CustomerCompany)
 async def update_company(
     company_id: int = Path(..., gt=0, description="Company ID"),
@@ -140,16 +188,21 @@ async def delete_company(
             detail=f"Company with ID {company_id} not found"
         )
 
-@router.get("/name/{company_name}", response_model=CustomerCompany)
+@router.get("/name/{company_name}", response_model=CustomerCompany, openapi_extra=statement_budget(2))
 async def get_company_by_name(
+    request: Request,
+    response: Response,
     company_name: str = Path(..., min_length=1, description="Exact company name"),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get a company by exact name match.
     
     - **company_name**: The exact name of the company
     """
+    cached = await not_modified(request, response, db, "customer_company")
+    if cached:
+        return cached
     service = AsyncCustomerCompanyService(db)
     company = await service.get_company_by_name(company_name)
     if not company:
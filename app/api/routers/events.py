@@ -0,0 +1,68 @@
+# routers/events.py
+import json
+from fastapi import APIRouter, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import FrozenSet, List, Literal, Optional
+from app.core.config import settings
+from app.core.events import broker
+
+router = APIRouter()
+
+EventTable = Literal["vehicle", "customer_company", "trip_allocation"]
+
+
+def _tables(table: Optional[List[str]]) -> Optional[FrozenSet[str]]:
+    return frozenset(table) if table else None
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    table: Optional[List[EventTable]] = Query(None, description="Only changes to these tables (repeatable)")
+):
+    """
+    Server-Sent Events stream of committed changes to vehicles, companies and trips.
+
+    Each `change` event is JSON: `{"table", "op": insert|update|delete|resync, "count", "ids"}`,
+    one per committed statement: `count` rows changed, with their primary keys
+    in `ids` (null when the statement changed more than 500 rows). Fetch the
+    rows you display by id; when `ids` is null, on `resync`, or when the
+    stream ends, refetch what you display: events may have been missed.
+    """
+    async def events():
+        async with broker.subscribe(_tables(table)) as subscription:
+            yield "retry: 3000\n\n"
+            while not subscription.overflowed and not await request.is_disconnected():
+                event = await subscription.next(settings.events_heartbeat_seconds)
+                if event is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"event: change\ndata: {json.dumps(jsonable_encoder(event))}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def websocket_events(
+    websocket: WebSocket,
+    table: Optional[List[EventTable]] = Query(None, description="Only changes to these tables (repeatable)")
+):
+    """The same change events as /stream, one JSON text message each"""
+    await websocket.accept()
+    async with broker.subscribe(_tables(table)) as subscription:
+        try:
+            while not subscription.overflowed:
+                event = await subscription.next(settings.events_heartbeat_seconds)
+                if event is None:
+                    await websocket.send_json({"table": None, "op": "ping", "count": 0, "ids": None})
+                else:
+                    await websocket.send_json(event)
+        except WebSocketDisconnect:
+            return
+    # Fell too far behind: close so the client reconnects and resyncs
+    await websocket.close(code=1013)
@@ -0,0 +1,49 @@
+# routers/reports.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import List, Optional
+from app.database import get_async_read_db
+from app.schemas.report import TripTotals
+from app.services.report_service import AsyncReportService, GroupBy, Period
+from app.core.etag import not_modified
+from app.core.instrumentation import statement_budget
+
+router = APIRouter()
+
+@router.get("/trips", response_model=List[TripTotals], openapi_extra=statement_budget(2))
+async def get_trip_totals(
+    request: Request,
+    response: Response,
+    group_by: GroupBy = Query("company", description="Totals per company or per vehicle"),
+    period: Period = Query("day", description="Totals per day or per month"),
+    date_from: Optional[date] = Query(None, description="First trip day (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Last trip day (inclusive)"),
+    company_id: Optional[int] = Query(None, gt=0, description="Only this company"),
+    vehicle_id: Optional[int] = Query(None, gt=0, description="Only this vehicle"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Trip count and total load_tons, excluding cancelled trips.
+
+    Served from the daily rollup table, so the cost depends on the number of
+    (day, company, vehicle) combinations in range, not on the number of trips.
+
+    - **group_by**: `company` or `vehicle`
+    - **period**: `day`, or `month` (reported as the first day of the month)
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    # The rollup changes exactly when trip_allocation does
+    cached = await not_modified(request, response, db, "trip_allocation")
+    if cached:
+        return cached
+    service = AsyncReportService(db)
+    return await service.get_trip_totals(
+        group_by=group_by,
+        period=period,
+        date_from=date_from,
+        date_to=date_to,
+        company_id=company_id,
+        vehicle_id=vehicle_id
+    )
@@ -0,0 +1,74 @@
+# routers/system.py
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Literal
+from app.database import async_engine, replica_engine
+from app.core.cache import CACHES
+from app.core.events import broker
+from app.core.fleet_index import fleet_index
+from app.core.pool import pool_stats
+from app.core.slow_queries import slow_query_log
+from app.schemas.system import CacheStats, FleetIndexStats, PoolStats, SlowQueryReport
+
+router = APIRouter()
+
+
+@router.get("/pool", response_model=PoolStats)
+async def get_pool_stats(
+    engine: Literal["primary", "replica"] = Query("primary", description="Which engine's pool to report")
+):
+    """
+    Connection pool statistics for this worker process.
+    
+    Sustained `checked_out` near `size + max_overflow`, or growing wait times,
+    mean the pool is too small for the request concurrency of this worker.
+    """
+    if engine == "replica":
+        if replica_engine is None:
+            raise HTTPException(status_code=404, detail="No read replica configured")
+        return pool_stats(replica_engine.pool)
+    return pool_stats(async_engine.pool)
+
+
+@router.get("/cache", response_model=Dict[str, CacheStats])
+async def get_cache_stats():
+    """Hit/miss/eviction counters of the vehicle and company lookup caches in this worker"""
+    return {cache.name: cache.stats() for cache in CACHES}
+
+
+@router.delete("/cache", status_code=204)
+async def clear_caches():
+    """Drop every entry from this worker's lookup caches"""
+    for cache in CACHES:
+        cache.clear()
+
+
+@router.get("/fleet-index", response_model=FleetIndexStats)
+async def get_fleet_index_stats():
+    """State of this worker's in-memory index behind /api/vehicle/available and /in-line"""
+    return fleet_index.stats()
+
+
+@router.get("/events", response_model=Dict[str, int])
+async def get_event_stats():
+    """Change event subscribers connected to this worker and events received so far"""
+    return broker.stats()
+
+
+@router.get("/slow-queries", response_model=SlowQueryReport)
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000, description="Most recent entries to return")
+):
+    """
+    Statements of this worker slower than LOGMA_SLOW_QUERY_THRESHOLD_MS, newest first.
+
+    Recording is off unless LOGMA_SLOW_QUERY_ENABLED is set. Bound parameters
+    are reduced to their types unless LOGMA_SLOW_QUERY_REDACT_PARAMETERS is
+    false; `plan` appears once the background EXPLAIN has finished.
+    """
+    return {"stats": slow_query_log.stats(), "entries": slow_query_log.recent(limit)}
+
+
+@router.delete("/slow-queries", status_code=204)
+async def clear_slow_queries():
+    """Drop every entry from this worker's slow query log"""
+    slow_query_log.clear()
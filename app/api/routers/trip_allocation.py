@@ -1,30 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from app.database import get_async_db
+from typing import List, Optional
+from app.database import get_async_db, get_async_read_db, read_session_factory
 from app.schemas.trip_allocation import (
+    NaiveDatetime,
     TripAllocationOut,
     TripAllocationCreate,
-    TripAllocationUpdate
+    TripAllocationUpdate,
+    TripAllocationBulkCreate,
+    TripAllocationBulkResult,
+    TripStatus,
+    TripStatusTransition,
+    TripStatusTransitionResult
 )
 from app.services.trip_allocation_service import AsyncTripAllocationService
+from app.core.etag import not_modified
+from app.core.instrumentation import statement_budget
+from app.core.export import ExportFormat, MEDIA_TYPES, stream_export
+from app.core.responses import rows_response
 
 router = APIRouter()
 
-@router.get("/", response_model=List[TripAllocationOut])
-async def get_trips(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+@router.get("/", response_model=List[TripAllocationOut], openapi_extra=statement_budget(2))
+async def get_trips(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    cached = await not_modified(request, response, db, "trip_allocation")
+    if cached:
+        return cached
     service = AsyncTripAllocationService(db)
-    return await service.get_trips(skip=skip, limit=limit)
+    trips, next_cursor = await service.get_trips(skip=skip, limit=limit, after=after)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows_response(trips, response)
 
-@router.get("/{trip_id}", response_model=TripAllocationOut)
-async def get_trip(trip_id: int, db: AsyncSession = Depends(get_async_db)):
+@router.get("/export")
+async def export_trips(
+    request: Request,
+    format: ExportFormat = Query("ndjson", description="ndjson (one JSON object per line) or csv"),
+    date_from: Optional[NaiveDatetime] = Query(None, description="Trips on or after this trip date/time"),
+    date_to: Optional[NaiveDatetime] = Query(None, description="Trips before this trip date/time"),
+    company_id: Optional[int] = Query(None, gt=0, description="Only trips for this company"),
+    status: Optional[List[TripStatus]] = Query(None, description="Only trips in these statuses (repeatable)")
+):
+    """
+    Stream every matching trip, ordered by trip date, as NDJSON or CSV.
+
+    Rows are read from a server-side cursor and written out batch by batch,
+    so exports of any size use constant memory on the server.
+    """
+    if date_from and date_to and date_from >= date_to:
+        raise HTTPException(status_code=400, detail="date_from must be before date_to")
+    query = AsyncTripAllocationService.export_query(
+        date_from=date_from,
+        date_to=date_to,
+        company_id=company_id,
+        statuses=status
+    )
+    return StreamingResponse(
+        stream_export(read_session_factory(request), query, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="trips.{format}"'}
+    )
+
+@router.get("/{trip_id}", response_model=TripAllocationOut, openapi_extra=statement_budget(2))
+async def get_trip(
+    trip_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    cached = await not_modified(request, response, db, "trip_allocation")
+    if cached:
+        return cached
     service = AsyncTripAllocationService(db)
     trip = await service.get_trip(trip_id)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     return trip
 
-@router.post("/", response_model=TripAllocationOut)
+@router.post("/", response_model=TripAllocationOut, openapi_extra=statement_budget(1))
 async def create_trip(trip: TripAllocationCreate, db: AsyncSession = Depends(get_async_db)):
     service = AsyncTripAllocationService(db)
     try:
@@ -32,6 +93,48 @@ async def create_trip(trip: TripAllocationCreate, db: AsyncSession = Depends(get
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/bulk", response_model=TripAllocationBulkResult, status_code=201)
+async def create_trips_bulk(
+    bulk: TripAllocationBulkCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create up to 1000 trips in one transaction and report the result per item.
+
+    Responds 400 when no trip was created (e.g. a rejected all_or_nothing batch);
+    otherwise 201, with any failed best_effort items listed in `results`.
+    """
+    service = AsyncTripAllocationService(db)
+    result = await service.create_trips_bulk(bulk)
+    if result.created == 0 and result.failed:
+        response.status_code = 400
+    return result
+
+@router.post("/transitions", response_model=TripStatusTransitionResult)
+async def transition_trips(
+    transition: TripStatusTransition,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Move every matching trip to `to_status` in one statement (e.g. close the day).
+
+    Trips are filtered by trip day range, vehicles, company and current status;
+    only trips allowed to move to `to_status` by the state machine
+    (pending -> allocated -> in_progress -> completed, cancel from any active
+    status) are changed. Optionally sets `vehicle_daily_status` on their vehicles.
+    At least one of the date range, `vehicle_ids` or `company_id` is required.
+    """
+    if not (transition.date_from or transition.date_to or transition.vehicle_ids or transition.company_id):
+        raise HTTPException(
+            status_code=400,
+            detail="Narrow the transition with date_from/date_to, vehicle_ids or company_id"
+        )
+    if transition.date_from and transition.date_to and transition.date_from > transition.date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    service = AsyncTripAllocationService(db)
+    return await service.transition_trips(transition)
+
 @router.put("/{trip_id}", response_model=TripAllocationOut)
 async def update_trip(trip_id: int, trip: TripAllocationUpdate, db: AsyncSession = Depends(get_async_db)):
     service = AsyncTripAllocationService(db)
@@ -68,56 +68,152 @@
 
 
 # vehicle.py (router)
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, File, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional, Dict, Any
-from app.database import get_async_db
-from app.schemas.vehicle import Vehicle, VehicleCreate, VehicleUpdate, VehicleOut
+from typing import List, Optional, Literal
+from app.database import get_async_db, get_async_read_db
+from app.schemas.vehicle import (
+    Vehicle,
+    VehicleCreate,
+    VehicleUpdate,
+    VehicleOut,
+    VehicleOutList,
+    VehicleDailyStatusBulkUpdate,
+    VehicleDailyStatusResult,
+    VehicleDailyRolloverResult,
+    VehicleRecentAllocation,
+    VehicleAllocationHistory,
+    CustomerField
+)
+from app.schemas.imports import ImportResult
+from app.core.etag import etag_matches, not_modified
+from app.core.instrumentation import statement_budget
+from app.core.fleet_index import fleet_index
+from app.core.spreadsheet import UnsupportedFileType
 from app.services.vehicle_service import AsyncVehicleService
 
 router = APIRouter()
 
 @router.get("/", response_model=List[VehicleOut])
 async def get_vehicles(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = Query(None, description="Filter by vehicle status"),
     daily_status: Optional[str] = Query(None, description="Filter by daily status"),
-    db: AsyncSession = Depends(get_async_db)
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
+    cached = await not_modified(request, response, db, "vehicle")
+    if cached:
+        return cached
     service = AsyncVehicleService(db)
-    return await service.get_vehicles(skip=skip, limit=limit, status=status, daily_status=daily_status)
+    try:
+        vehicles, next_cursor = await service.get_vehicles(
+            skip=skip, limit=limit, status=status, daily_status=daily_status, after=after
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return vehicles
+
+def _render_vehicles(vehicles: List[dict]) -> bytes:
+    return VehicleOutList.dump_json(VehicleOutList.validate_python(vehicles))
+
 
-@router.get("/available", response_model=List[VehicleOut])
-async def get_available_vehicles(db: AsyncSession = Depends(get_async_db)):
+def _from_fleet_index(request: Request, daily_status: str) -> Optional[Response]:
+    """Serve active vehicles in `daily_status` from the fleet index, or None when it is stale"""
+    rendered = fleet_index.rendered("active", daily_status, _render_vehicles)
+    if rendered is None:
+        return None
+    body, etag = rendered
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/available", response_model=List[VehicleOut], openapi_extra=statement_budget(2))
+async def get_available_vehicles(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    indexed = _from_fleet_index(request, "available")
+    if indexed:
+        return indexed
+    cached = await not_modified(request, response, db, "vehicle")
+    if cached:
+        return cached
     service = AsyncVehicleService(db)
     return await service.get_available_vehicles_today()
 
-@router.get("/in-line", response_model=List[VehicleOut])
-async def get_vehicles_in_line(db: AsyncSession = Depends(get_async_db)):
+@router.get("/in-line", response_model=List[VehicleOut], openapi_extra=statement_budget(2))
+async def get_vehicles_in_line(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    indexed = _from_fleet_index(request, "in_line")
+    if indexed:
+        return indexed
+    cached = await not_modified(request, response, db, "vehicle")
+    if cached:
+        return cached
     service = AsyncVehicleService(db)
     return await service.get_vehicles_in_line()
 
+@router.post("/daily-status", response_model=VehicleDailyStatusResult)
+async def bulk_update_daily_status(
+    update: VehicleDailyStatusBulkUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Move a batch of vehicles to one daily status with a single UPDATE"""
+    service = AsyncVehicleService(db)
+    updated = await service.bulk_update_daily_status(update.vehicle_ids, update.daily_status)
+    return VehicleDailyStatusResult(updated=updated)
+
+@router.post("/daily-status/rollover", response_model=VehicleDailyRolloverResult)
+async def rollover_daily_status(db: AsyncSession = Depends(get_async_db)):
+    """
+    Reset the whole fleet's daily status now (the same job runs on schedule).
+
+    Vehicles with an active trip become 'assigned', the rest 'available'.
+    """
+    service = AsyncVehicleService(db)
+    changed = await service.rollover_daily_status()
+    return VehicleDailyRolloverResult(updated=sum(changed.values()), **changed)
+
 # NEW ENDPOINT: Get recent customer allocation by vehicle number
-@router.get("/recent-allocation/{vehicle_number}")
+@router.get(
+    "/recent-allocation/{vehicle_number}",
+    response_model=VehicleRecentAllocation,
+    response_model_exclude_unset=True,
+    openapi_extra=statement_budget(1)
+)
 async def get_recent_customer_allocation(
     vehicle_number: str, 
-    db: AsyncSession = Depends(get_async_db)
-) -> Dict[str, Any]:
+    fields: Optional[List[CustomerField]] = Query(
+        None, description="Customer fields to return (repeatable; default all)"
+    ),
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """
     Get the most recently allocated customer details for a vehicle based on vehicle number.
     
     Args:
         vehicle_number: The vehicle number to search for
+        fields: Customer fields to include besides customer_company_id
         
     Returns:
-        Dictionary containing vehicle info, recent allocation, and customer details
+        Vehicle info, recent allocation, and customer details
         
     Raises:
         HTTPException: 404 if vehicle not found
     """
     service = AsyncVehicleService(db)
-    result = await service.get_recent_customer_allocation_by_vehicle_number(vehicle_number)
+    result = await service.get_recent_customer_allocation_by_vehicle_number(vehicle_number, fields)
     
     if not result:
         raise HTTPException(
@@ -128,27 +224,43 @@ async def get_recent_customer_allocation(
     return result
 
 # NEW ENDPOINT: Get all customer allocations by vehicle number
-@router.get("/allocations/{vehicle_number}")
+@router.get(
+    "/allocations/{vehicle_number}",
+    response_model=VehicleAllocationHistory,
+    response_model_exclude_unset=True,
+    openapi_extra=statement_budget(1)
+)
 async def get_all_customer_allocations(
     vehicle_number: str,
-    limit: int = Query(10, description="Maximum number of allocations to return"),
-    db: AsyncSession = Depends(get_async_db)
-) -> Dict[str, Any]:
+    limit: int = Query(10, ge=1, le=500, description="Maximum number of allocations to return"),
+    after: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[List[CustomerField]] = Query(
+        None, description="Customer fields to return (repeatable; default all)"
+    ),
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """
-    Get all customer allocations for a vehicle (most recent first).
+    Get customer allocations for a vehicle (most recent first), one page at a time.
     
     Args:
         vehicle_number: The vehicle number to search for
         limit: Maximum number of allocations to return (default: 10)
+        after: Continue after the `next_cursor` of a previous page
+        fields: Customer fields to include besides customer_company_id
         
     Returns:
-        Dictionary containing vehicle info and list of allocations with customer details
+        Vehicle info, a page of allocations with customer details and the next cursor
         
     Raises:
-        HTTPException: 404 if vehicle not found
+        HTTPException: 404 if vehicle not found, 400 for an invalid cursor
     """
     service = AsyncVehicleService(db)
-    result = await service.get_all_customer_allocations_by_vehicle_number(vehicle_number, limit)
+    try:
+        result = await service.get_all_customer_allocations_by_vehicle_number(
+            vehicle_number, limit, after, fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     if not result:
         raise HTTPException(
@@ -158,8 +270,16 @@ async def get_all_customer_allocations(
     
     return result
 
-@router.get("/{vehicle_id}", response_model=VehicleOut)
-async def get_vehicle(vehicle_id: int, db: AsyncSession = Depends(get_async_db)):
+@router.get("/{vehicle_id}", response_model=VehicleOut, openapi_extra=statement_budget(2))
+async def get_vehicle(
+    vehicle_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    cached = await not_modified(request, response, db, "vehicle")
+    if cached:
+        return cached
     service = AsyncVehicleService(db)
     vehicle = await service.get_vehicle(vehicle_id)
     if not vehicle:
@@ -169,11 +289,30 @@ async def get_vehicle(vehicle_id: int, db: AsyncSession = Depends(get_async_db))
 @router.post("/", response_model=VehicleOut)
 async def create_vehicle(vehicle: VehicleCreate, db: AsyncSession = Depends(get_async_db)):
     service = AsyncVehicleService(db)
-    # Fixed: Check if vehicle_number already exists (not vehicle_id)
-    existing = await service.get_vehicle_by_vehicle_number(vehicle.vehicle_number)
-    if existing:
-        raise HTTPException(status_code=400, detail="Vehicle number already exists")
-    return await service.create_vehicle(vehicle)
+    # Duplicate vehicle_number is caught by the unique index, no pre-check query
+    try:
+        return await service.create_vehicle(vehicle)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/import", response_model=ImportResult)
+async def import_vehicles(
+    file: UploadFile = File(..., description="CSV or XLSX with a header row"),
+    on_conflict: Literal["skip", "update"] = Query("skip", description="Existing vehicle_number: skip or update"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Import vehicles from a spreadsheet.
+
+    Columns: vehicle_number, registration_number, vehicle_type, status, daily_status.
+    Rows are streamed and written in batches, so earlier batches stay
+    committed when later rows fail; failures are reported per row.
+    """
+    service = AsyncVehicleService(db)
+    try:
+        return await service.import_vehicles(file, on_conflict)
+    except UnsupportedFileType as e:
+        raise HTTPException(status_code=415, detail=str(e))
 
 @router.put("/{vehicle_id}", response_model=VehicleOut)
 async def update_vehicle(
@@ -182,7 +321,10 @@ async def update_vehicle(
     db: AsyncSession = Depends(get_async_db)
 ):
     service = AsyncVehicleService(db)
-    updated_vehicle = await service.update_vehicle(vehicle_id, vehicle)
+    try:
+        updated_vehicle = await service.update_vehicle(vehicle_id, vehicle)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not updated_vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     return updated_vehicle
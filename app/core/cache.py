@@ -0,0 +1,127 @@
+# core/cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache whose entries also expire after `ttl` seconds.
+
+    Values should be plain data (see `snapshot`), never live ORM instances.
+    `invalidate` leaves a short tombstone: for `holdoff` seconds the key is
+    not repopulated, so a lagging read replica cannot put back the value a
+    write just replaced.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, holdoff: float = 0.0, enabled: bool = True):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.holdoff = holdoff
+        self.enabled = enabled
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._tombstones: Dict[Hashable, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if self._tombstones:
+            invalidated_at = self._tombstones.get(key)
+            if invalidated_at is not None:
+                if now - invalidated_at < self.holdoff:
+                    return
+                del self._tombstones[key]
+        self._data[key] = (now + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys: Hashable) -> None:
+        self.invalidate_many(keys)
+
+    def invalidate_many(self, keys: Iterable[Hashable]) -> None:
+        now = time.monotonic()
+        for key in keys:
+            self._data.pop(key, None)
+            if self.holdoff > 0:
+                self._tombstones[key] = now
+            self.invalidations += 1
+        if len(self._tombstones) > self.maxsize:
+            self._tombstones = {k: t for k, t in self._tombstones.items() if now - t < self.holdoff}
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._tombstones.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+def snapshot(instance) -> dict:
+    """Detached copy of an ORM row's column values"""
+    return {column.key: getattr(instance, column.key) for column in instance.__table__.columns}
+
+
+def restore(model, data: dict):
+    """Build a transient (session-less) instance of `model` from a snapshot"""
+    return model(**data)
+
+
+def _make_cache(name: str) -> TTLCache:
+    # A replica may still serve the old row right after a write; don't cache it back
+    holdoff = settings.replica_pin_seconds if settings.replica_database_url else 0.0
+    return TTLCache(
+        name,
+        maxsize=settings.cache_max_entries,
+        ttl=settings.cache_ttl_seconds,
+        holdoff=holdoff,
+        enabled=settings.cache_enabled,
+    )
+
+
+# Per-process lookup caches, invalidated by the service write paths
+vehicle_cache = _make_cache("vehicle")  # vehicle_id -> snapshot
+vehicle_number_cache = _make_cache("vehicle_number")  # vehicle_number -> vehicle_id
+company_cache = _make_cache("company")  # customer_company_id -> snapshot
+
+CACHES = [vehicle_cache, vehicle_number_cache, company_cache]
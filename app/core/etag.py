@@ -0,0 +1,108 @@
+# core/etag.py
+import hashlib
+import logging
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import company_cache, vehicle_cache, vehicle_number_cache
+
+logger = logging.getLogger(__name__)
+
+# Lookup caches holding rows of each versioned table
+TABLE_CACHES = {
+    "vehicle": [vehicle_cache, vehicle_number_cache],
+    "customer_company": [company_cache],
+    "trip_allocation": [],
+}
+
+# SQLSTATE undefined_table
+UNDEFINED_TABLE = "42P01"
+
+# False once we learn table_version is missing (migration 0005 not applied)
+_versions_available = True
+# Last version of each table seen by this worker
+_last_seen: Dict[str, int] = {}
+
+
+def versions_installed() -> bool:
+    """False once table_versions found the counters missing (migration 0005 not applied)"""
+    return _versions_available
+
+
+async def table_versions(db: AsyncSession, *tables: str) -> Optional[Dict[str, int]]:
+    """
+    Read the change counters of `tables` (one small indexed query).
+
+    A counter that moved since this worker last looked means another worker
+    or process wrote to the table, so the matching lookup caches are cleared
+    before anything is served from them. Returns None when the counters are
+    not installed, and also (for this call only) when reading them failed,
+    e.g. on a connection error or statement timeout.
+    """
+    global _versions_available
+    if not _versions_available:
+        return None
+    try:
+        result = await db.execute(
+            text(
+                "SELECT table_name, sum(version) FROM table_version "
+                "WHERE table_name = ANY(:tables) GROUP BY table_name"
+            ),
+            {"tables": list(tables)}
+        )
+    except Exception as e:
+        await db.rollback()
+        if isinstance(e, DBAPIError) and getattr(e.orig, "sqlstate", None) == UNDEFINED_TABLE:
+            _versions_available = False
+            logger.warning(f"ETags disabled, table_version not installed: {str(e)}")
+        else:
+            logger.warning(f"Could not read table versions: {str(e)}")
+        return None
+
+    versions = {table: 0 for table in tables}
+    versions.update({table: int(version) for table, version in result.all()})
+    for table, version in versions.items():
+        if _last_seen.get(table) != version:
+            _last_seen[table] = version
+            for cache in TABLE_CACHES.get(table, []):
+                cache.clear()
+    return versions
+
+
+def make_etag(request: Request, versions: Dict[str, int]) -> str:
+    """Weak ETag for this URL (path and query) at the given table versions"""
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    signal = f"{request.url.path}?{query}|" + ",".join(f"{t}:{v}" for t, v in sorted(versions.items()))
+    return f'W/"{hashlib.sha1(signal.encode()).hexdigest()[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    # Weak comparison: W/"x" matches "x"
+    return "*" in candidates or any(c.removeprefix("W/") == etag.removeprefix("W/") for c in candidates)
+
+
+async def not_modified(request: Request, response: Response, db: AsyncSession, *tables: str) -> Optional[Response]:
+    """
+    Conditional GET check for handlers whose output depends only on `tables`.
+
+    Returns a 304 response to send as-is when the client's If-None-Match is
+    still current, so the handler skips its query and serialization;
+    otherwise sets the ETag on `response` and returns None.
+    """
+    versions = await table_versions(db, *tables)
+    if versions is None:
+        return None
+    etag = make_etag(request, versions)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
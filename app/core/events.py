@@ -0,0 +1,141 @@
+# core/events.py
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, FrozenSet, List, Optional, Set
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel written by the triggers of migration 0007
+EVENTS_CHANNEL = "logma_events"
+# Sent to subscribers after the LISTEN connection was re-established: events
+# may have been missed, so clients should refetch what they display
+RESYNC_EVENT = {"table": None, "op": "resync", "count": 0, "ids": None}
+
+
+class Subscription:
+    """One client's bounded queue of events, optionally limited to some tables"""
+
+    def __init__(self, tables: Optional[FrozenSet[str]], maxsize: int):
+        self.tables = tables
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=maxsize)
+        # Set when the client fell behind and events were dropped
+        self.overflowed = False
+
+    def offer(self, event: dict) -> None:
+        if self.overflowed:
+            return
+        if self.tables and event["table"] is not None and event["table"] not in self.tables:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def next(self, timeout: float) -> Optional[dict]:
+        """The next event, or None after `timeout` seconds without one"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """
+    Fans database change events out to this worker's subscribers.
+
+    Every worker runs its own LISTEN connection (see `listen`), so each one
+    receives every committed change, whichever worker or process made it.
+    A subscriber that cannot keep up is marked overflowed instead of
+    slowing the others down; its stream then ends so the client reconnects
+    and resyncs.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        # In-process consumers (e.g. the fleet index), called for every event
+        self._handlers: List[Callable[[dict], None]] = []
+        self.published = 0
+
+    def add_handler(self, handler: Callable[[dict], None]) -> None:
+        self._handlers.append(handler)
+
+    @asynccontextmanager
+    async def subscribe(self, tables: Optional[FrozenSet[str]] = None) -> AsyncIterator[Subscription]:
+        subscription = Subscription(tables, self.queue_size)
+        self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event: dict) -> None:
+        self.published += 1
+        for handler in self._handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Event handler failed for {event.get('table')}: {str(e)}")
+        for subscription in self._subscriptions:
+            subscription.offer(event)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscriptions),
+            "published": self.published,
+        }
+
+
+def _listen_dsn() -> str:
+    # asyncpg takes a plain postgresql:// DSN; NOTIFY is only delivered on the primary
+    url = make_url(settings.database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+async def listen(broker: EventBroker, reconnect_seconds: float = 5.0, keepalive_seconds: float = 30.0) -> None:
+    """
+    Hold a LISTEN connection and publish its notifications until cancelled.
+
+    Uses a dedicated asyncpg connection outside the SQLAlchemy pool, since
+    it stays checked out for the life of the worker. Reconnects after
+    failures and then publishes RESYNC_EVENT.
+    """
+    def on_notify(connection, pid, channel, payload):
+        try:
+            broker.publish(json.loads(payload))
+        except ValueError:
+            logger.warning(f"Ignoring malformed {channel} payload: {payload[:200]}")
+
+    connected_before = False
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(_listen_dsn())
+            await connection.add_listener(EVENTS_CHANNEL, on_notify)
+            logger.info(f"Listening for {EVENTS_CHANNEL} notifications")
+            if connected_before:
+                broker.publish(RESYNC_EVENT)
+            connected_before = True
+            # Notifications arrive through the callback; the periodic query
+            # only notices a dead connection
+            while True:
+                await asyncio.sleep(keepalive_seconds)
+                await connection.execute("SELECT 1")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"{EVENTS_CHANNEL} listener failed, reconnecting in {reconnect_seconds:g}s: {str(e)}")
+            await asyncio.sleep(reconnect_seconds)
+        finally:
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+
+
+broker = EventBroker(queue_size=settings.events_queue_size)
@@ -0,0 +1,66 @@
+# core/export.py
+import csv
+import io
+from datetime import date, datetime
+from typing import AsyncIterator, Callable, List, Literal, Sequence, Union
+
+import orjson
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Rows fetched from the server-side cursor (and encoded) per round trip
+EXPORT_BATCH_SIZE = 1000
+
+
+def _encode_ndjson(columns: List[str], rows: Sequence) -> bytes:
+    # Same encoder, and so the same datetime format, as the JSON responses
+    return b"".join(
+        orjson.dumps(dict(zip(columns, row)), option=orjson.OPT_APPEND_NEWLINE)
+        for row in rows
+    )
+
+
+def _encode_csv(columns: List[str], rows: Sequence) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, (datetime, date)) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+def _csv_header(columns: List[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(columns)
+    return buffer.getvalue()
+
+
+async def stream_export(
+    session_factory: Callable[[], AsyncSession],
+    query: Select,
+    fmt: ExportFormat,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> AsyncIterator[Union[str, bytes]]:
+    """
+    Run `query` on a server-side cursor and yield it encoded as NDJSON or CSV.
+
+    Opens its own session because the response body is produced after the
+    request's dependencies have been cleaned up. Only one batch of rows is
+    held at a time, so memory stays flat however many rows match.
+    """
+    encode = _encode_ndjson if fmt == "ndjson" else _encode_csv
+    async with session_factory() as session:
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        columns = list(result.keys())
+        if fmt == "csv":
+            yield _csv_header(columns)
+        async for rows in result.partitions():
+            yield encode(columns, rows)
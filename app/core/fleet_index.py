@@ -0,0 +1,193 @@
+# core/fleet_index.py
+import hashlib
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+Key = Tuple[str, str]  # (status, daily_status)
+
+
+class FleetIndex:
+    """
+    In-process copy of the vehicle table grouped by (status, daily_status).
+
+    Holds plain snapshots (see cache.snapshot). The vehicle write paths apply
+    their own changes immediately; writes made by other workers are picked
+    up by the next reconciliation against the database, and deletes already
+    from their change events (`apply_event`). A reconciliation reads only
+    the rows changed since the previous one (`apply_changes`); the whole
+    table is read (`replace_all`) on the first load and when rows went
+    missing, at most once per `full_reload_interval` seconds.
+    Once the last reconciliation is older than `max_staleness` seconds,
+    `rendered` returns None and callers go back to querying the database.
+    """
+
+    def __init__(self, max_staleness: float, full_reload_interval: float = 60, enabled: bool = True):
+        self.max_staleness = max_staleness
+        self.full_reload_interval = full_reload_interval
+        self.enabled = enabled
+        self._buckets: Dict[Key, Dict[int, dict]] = {}
+        self._key_of: Dict[int, Key] = {}
+        # key -> (body, etag), dropped whenever the bucket changes
+        self._rendered: Dict[Key, Tuple[bytes, str]] = {}
+        self._reconciled_at: Optional[float] = None
+        self.version: Optional[int] = None  # table version the last reload was based on
+        # Database time the rows were last read at; None until the next full reload
+        self.loaded_at: Optional[datetime] = None
+        self._full_reload_started: Optional[float] = None
+        self.reloads = 0
+        self.incremental_reloads = 0
+        self.hits = 0
+        self.misses = 0
+
+    def fresh(self) -> bool:
+        return (
+            self.enabled
+            and self._reconciled_at is not None
+            and time.monotonic() - self._reconciled_at <= self.max_staleness
+        )
+
+    def full_reload_due(self) -> bool:
+        """Whether a full reload is needed and allowed now (see full_reload_interval)"""
+        if self.loaded_at is not None:
+            return False
+        now = time.monotonic()
+        if self._full_reload_started is not None and now - self._full_reload_started < self.full_reload_interval:
+            return False
+        self._full_reload_started = now
+        return True
+
+    def replace_all(
+        self,
+        vehicles: Iterable[dict],
+        version: Optional[int] = None,
+        loaded_at: Optional[datetime] = None
+    ) -> None:
+        """Swap in a full reload of the table"""
+        buckets: Dict[Key, Dict[int, dict]] = {}
+        key_of: Dict[int, Key] = {}
+        for vehicle in vehicles:
+            key = (vehicle["status"], vehicle["daily_status"])
+            buckets.setdefault(key, {})[vehicle["vehicle_id"]] = vehicle
+            key_of[vehicle["vehicle_id"]] = key
+        self._buckets, self._key_of, self._rendered = buckets, key_of, {}
+        self.version = version
+        self.loaded_at = loaded_at
+        self.reloads += 1
+        self.touch()
+
+    def apply_changes(self, vehicles: Iterable[dict], version: int, loaded_at: datetime) -> None:
+        """Apply the rows changed since `loaded_at` of the previous reload"""
+        self.upsert_many(vehicles)
+        self.version = version
+        self.loaded_at = loaded_at
+        self.incremental_reloads += 1
+        self.touch()
+
+    def touch(self) -> None:
+        """Record that the index was just confirmed current"""
+        self._reconciled_at = time.monotonic()
+
+    def mark_stale(self) -> None:
+        """Serve from the database until the next reconciliation (after set-based writes)"""
+        self._reconciled_at = None
+        self.version = None
+
+    def require_full_reload(self) -> None:
+        """Serve from the database until the whole table was read again"""
+        self.mark_stale()
+        self.loaded_at = None
+
+    def disable(self) -> None:
+        """Serve from the database for the life of the process"""
+        self.enabled = False
+        self.mark_stale()
+
+    def __len__(self) -> int:
+        return len(self._key_of)
+
+    def upsert(self, vehicle: dict) -> None:
+        self.remove(vehicle["vehicle_id"])
+        key = (vehicle["status"], vehicle["daily_status"])
+        self._buckets.setdefault(key, {})[vehicle["vehicle_id"]] = vehicle
+        self._key_of[vehicle["vehicle_id"]] = key
+        self._rendered.pop(key, None)
+
+    def upsert_many(self, vehicles: Iterable[dict]) -> None:
+        for vehicle in vehicles:
+            self.upsert(vehicle)
+
+    def remove(self, vehicle_id: int) -> None:
+        key = self._key_of.pop(vehicle_id, None)
+        if key is not None:
+            self._buckets[key].pop(vehicle_id, None)
+            self._rendered.pop(key, None)
+
+    def apply_event(self, event: dict) -> None:
+        """
+        Apply a change event from core.events (one per statement, see migration 0007).
+
+        Events carry keys, not rows: deletes are applied here, inserts and
+        updates are picked up by the next reconciliation, since they move
+        the vehicle table version.
+        """
+        if event["op"] == "resync":
+            self.mark_stale()
+        elif event["table"] != "vehicle" or event["op"] != "delete":
+            return
+        elif event["ids"] is None:
+            # Too many rows to list
+            self.mark_stale()
+        else:
+            for vehicle_id in event["ids"]:
+                self.remove(vehicle_id)
+
+    def vehicles(self, status: str, daily_status: str) -> List[dict]:
+        bucket = self._buckets.get((status, daily_status), {})
+        return [bucket[vehicle_id] for vehicle_id in sorted(bucket)]
+
+    def rendered(
+        self,
+        status: str,
+        daily_status: str,
+        render: Callable[[List[dict]], bytes]
+    ) -> Optional[Tuple[bytes, str]]:
+        """
+        Encoded body and strong ETag of one bucket, or None when the index is stale.
+
+        `render` runs only when the bucket changed since it was last encoded.
+        """
+        if not self.fresh():
+            self.misses += 1
+            return None
+        self.hits += 1
+        key = (status, daily_status)
+        cached = self._rendered.get(key)
+        if cached is None:
+            body = render(self.vehicles(status, daily_status))
+            cached = (body, f'"{hashlib.sha1(body).hexdigest()[:20]}"')
+            self._rendered[key] = cached
+        return cached
+
+    def stats(self) -> dict:
+        age = None if self._reconciled_at is None else time.monotonic() - self._reconciled_at
+        return {
+            "enabled": self.enabled,
+            "fresh": self.fresh(),
+            "vehicles": len(self._key_of),
+            "age_seconds": round(age, 3) if age is not None else None,
+            "max_staleness_seconds": self.max_staleness,
+            "reloads": self.reloads,
+            "incremental_reloads": self.incremental_reloads,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+fleet_index = FleetIndex(
+    max_staleness=settings.fleet_index_max_staleness_seconds,
+    full_reload_interval=settings.fleet_index_full_reload_seconds,
+    enabled=settings.fleet_index_enabled,
+)
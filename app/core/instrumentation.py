@@ -0,0 +1,167 @@
+# core/instrumentation.py
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Key of a route's statement budget in its openapi_extra (see statement_budget)
+BUDGET_KEY = "x-statement-budget"
+# Attribute set on the execution context while its statement runs
+_STARTED_ATTR = "_logma_started"
+
+
+class RequestStats:
+    """SQL statements issued on behalf of one request and the time spent in them"""
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("logma_request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, or None outside a request (e.g. background jobs)"""
+    return _current.get()
+
+
+def statement_budget(statements: int) -> dict:
+    """
+    openapi_extra for a route: the most SQL statements one request may issue.
+
+    Checked by RequestInstrumentationMiddleware according to
+    settings.statement_budget_mode; also published in the OpenAPI schema.
+    """
+    return {BUDGET_KEY: statements}
+
+
+class StatementBudgetExceeded(AssertionError):
+    """A request issued more SQL statements than its route's budget (budget mode 'raise')"""
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        setattr(context, _STARTED_ATTR, time.perf_counter())
+
+
+def _record(context) -> None:
+    started = getattr(context, _STARTED_ATTR, None)
+    stats = _current.get()
+    if started is None or stats is None:
+        return
+    delattr(context, _STARTED_ATTR)
+    stats.statements += 1
+    stats.db_seconds += time.perf_counter() - started
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record(context)
+
+
+def _handle_error(exception_context):
+    # Failed statements count too; after_cursor_execute does not run for them
+    if exception_context.execution_context is not None:
+        _record(exception_context.execution_context)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attribute every statement `engine` runs to the current request (if any)"""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    db_ms = stats.db_seconds * 1000
+    app_ms = max(elapsed * 1000 - db_ms, 0.0)
+    return (
+        f'db;dur={db_ms:.1f};desc="{stats.statements} statements", '
+        f"app;dur={app_ms:.1f}, total;dur={elapsed * 1000:.1f}"
+    )
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Count SQL statements and time spent in the database per request.
+
+    Adds a Server-Timing header (db, app = everything else, total) and logs
+    one line per request with the route template, status and the same
+    numbers, also passed as `extra={"request_stats": ...}` for structured
+    log handlers. The header is written when the response starts, so for
+    streamed responses it covers the work before the first byte; the log
+    line covers the whole request.
+
+    Routes may declare a statement budget (openapi_extra=statement_budget(n)).
+    With budget_mode 'warn' a request over budget logs a warning; with
+    'raise' it raises StatementBudgetExceeded once the response is done,
+    which fails the test that made the request.
+    """
+
+    def __init__(self, app: ASGIApp, budget_mode: str = "off"):
+        self.app = app
+        self.budget_mode = budget_mode
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = server_timing(stats, time.perf_counter() - started)
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            # The route template keeps log lines groupable (/api/vehicle/{vehicle_id}, not /api/vehicle/42)
+            path = getattr(route, "path", scope["path"])
+            db_ms = stats.db_seconds * 1000
+            logger.info(
+                f"{scope['method']} {path} {status} statements={stats.statements} "
+                f"db_ms={db_ms:.1f} app_ms={max(elapsed * 1000 - db_ms, 0.0):.1f} total_ms={elapsed * 1000:.1f}",
+                extra={"request_stats": {
+                    "method": scope["method"],
+                    "route": path,
+                    "status": status,
+                    "statements": stats.statements,
+                    "db_ms": round(db_ms, 3),
+                    "total_ms": round(elapsed * 1000, 3),
+                }}
+            )
+        self._check_budget(scope, path, stats)
+
+    def _check_budget(self, scope: Scope, path: str, stats: RequestStats) -> None:
+        if self.budget_mode == "off":
+            return
+        extra = getattr(scope.get("route"), "openapi_extra", None) or {}
+        budget = extra.get(BUDGET_KEY)
+        if budget is None or stats.statements <= budget:
+            return
+        message = f"{scope['method']} {path} issued {stats.statements} SQL statements, budget is {budget}"
+        if self.budget_mode == "raise":
+            raise StatementBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,210 @@
+# core/metrics.py
+"""
+Prometheus metrics, served at /metrics.
+
+Request latency and counts are recorded by MetricsMiddleware. Pool, cache
+and fleet index numbers are not touched on the request path: each worker
+copies them from the objects that already track them every
+`metrics_sample_seconds` (and when scraped), see `sample_runtime_metrics`.
+
+With several worker processes, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory (cleared on every deploy) before starting them. Each worker then
+writes its metrics to files there and /metrics adds up all workers,
+whichever one serves the scrape. Without it, /metrics reports only the
+worker that answers.
+"""
+import os
+import time
+from typing import Dict, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import CACHES
+from app.core.fleet_index import fleet_index
+from app.core.pool import pool_stats
+from app.database import async_engine, replica_engine
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# Anything else is reported as OTHER, so clients cannot create new series
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+REQUEST_SECONDS = Histogram(
+    "logma_http_request_duration_seconds",
+    "Time to handle a request, until the response is complete",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+REQUESTS = Counter(
+    "logma_http_requests",
+    "Requests handled, by response status code",
+    ["method", "route", "status"],
+)
+TRIPS_CREATED = Counter(
+    "logma_trips_created",
+    "Trip allocations created",
+    ["source"],  # single, bulk
+)
+TRIP_VALIDATION_FAILURES = Counter(
+    "logma_trip_validation_failures",
+    "Trip allocations rejected by vehicle or company validation",
+    ["reason"],  # vehicle_not_found, vehicle_inactive, vehicle_unavailable, vehicle_busy, company_not_found
+)
+
+# Sampled; livesum adds up the workers that are running
+POOL_CONNECTIONS = Gauge(
+    "logma_db_pool_connections",
+    "Connections of the engine's pool, by state",
+    ["engine", "state"],  # checked_out, checked_in, overflow
+    multiprocess_mode="livesum",
+)
+POOL_CAPACITY = Gauge(
+    "logma_db_pool_capacity",
+    "Most connections the pool may open (pool_size + max_overflow)",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+POOL_CHECKOUTS = Counter("logma_db_pool_checkouts", "Connections checked out of the pool", ["engine"])
+POOL_TIMEOUTS = Counter("logma_db_pool_timeouts", "Checkouts that gave up after pool_timeout", ["engine"])
+POOL_WAIT_SECONDS = Counter("logma_db_pool_wait_seconds", "Time spent waiting for a connection", ["engine"])
+CACHE_ENTRIES = Gauge(
+    "logma_cache_entries",
+    "Entries in the lookup caches",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+CACHE_EVENTS = Counter(
+    "logma_cache_events",
+    "Lookup cache activity",
+    ["cache", "event"],  # hit, miss, eviction, expiration, invalidation
+)
+FLEET_INDEX_REQUESTS = Counter(
+    "logma_fleet_index_requests",
+    "/available and /in-line requests, served from memory (hit) or the database (miss)",
+    ["result"],
+)
+
+# Last sampled value of each cumulative in-process counter
+_sampled: Dict[Tuple[int, tuple], float] = {}
+# Labelled children of the request metrics, looked up once per route
+_request_seconds: Dict[Tuple[str, str], object] = {}
+_requests: Dict[Tuple[str, str, int], object] = {}
+
+
+def _advance(counter: Counter, labels: tuple, value: float) -> None:
+    """Move `counter` up to `value`, a running total kept by this worker"""
+    key = (id(counter), labels)
+    delta = value - _sampled.get(key, 0)
+    if delta < 0:  # the source started over (e.g. the pool was recreated)
+        delta = value
+    if delta:
+        counter.labels(*labels).inc(delta)
+    _sampled[key] = value
+
+
+def sample_runtime_metrics() -> None:
+    """Copy pool, cache and fleet index statistics of this worker into the metrics"""
+    for name, engine in (("primary", async_engine), ("replica", replica_engine)):
+        if engine is None:
+            continue
+        stats = pool_stats(engine.pool)
+        for state in ("checked_out", "checked_in", "overflow"):
+            POOL_CONNECTIONS.labels(name, state).set(stats[state])
+        POOL_CAPACITY.labels(name).set(stats["size"] + stats["max_overflow"])
+        _advance(POOL_CHECKOUTS, (name,), stats["checkouts"])
+        _advance(POOL_TIMEOUTS, (name,), stats["timeouts"])
+        _advance(POOL_WAIT_SECONDS, (name,), stats["wait_seconds_total"])
+
+    for cache in CACHES:
+        stats = cache.stats()
+        CACHE_ENTRIES.labels(cache.name).set(stats["size"])
+        for event, field in (
+            ("hit", "hits"), ("miss", "misses"), ("eviction", "evictions"),
+            ("expiration", "expirations"), ("invalidation", "invalidations"),
+        ):
+            _advance(CACHE_EVENTS, (cache.name, event), stats[field])
+
+    _advance(FLEET_INDEX_REQUESTS, ("hit",), fleet_index.hits)
+    _advance(FLEET_INDEX_REQUESTS, ("miss",), fleet_index.misses)
+
+
+async def sample_runtime_metrics_job() -> None:
+    sample_runtime_metrics()
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    histogram = _request_seconds.get((method, route))
+    if histogram is None:
+        histogram = _request_seconds[(method, route)] = REQUEST_SECONDS.labels(method, route)
+    counter = _requests.get((method, route, status))
+    if counter is None:
+        counter = _requests[(method, route, status)] = REQUESTS.labels(method, route, str(status))
+    histogram.observe(seconds)
+    counter.inc()
+
+
+class MetricsMiddleware:
+    """
+    Record latency and status of every HTTP request by route template.
+
+    Requests that match no route are reported as route "unmatched", so
+    scanners probing random URLs do not create new series.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            method = scope["method"] if scope["method"] in METHODS else "OTHER"
+            observe_request(
+                method,
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - started
+            )
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus text exposition of every worker's metrics (see module docstring)"""
+    sample_runtime_metrics()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_worker_exited() -> None:
+    """Drop this worker's live gauges from the multiprocess directory (on shutdown)"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,110 @@
+# core/pagination.py
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.sql import ColumnElement
+
+
+class InvalidCursor(ValueError):
+    """Raised when an `after` token cannot be decoded"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise InvalidCursor("Invalid cursor")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Build an opaque cursor from the sort key values of the last row of a page"""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _python_type(column: ColumnElement) -> Optional[type]:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        # Expressions without a known type (e.g. a function result) are not checked
+        return None
+
+
+def _check_type(value: Any, column: ColumnElement) -> None:
+    expected = _python_type(column)
+    if expected is None or value is None:
+        return
+    if expected is float:
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif expected is int:
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    elif expected is date:
+        # datetime is a date subclass; a DATE key must decode to a plain date
+        valid = isinstance(value, date) and not isinstance(value, datetime)
+    else:
+        valid = isinstance(value, expected)
+    if not valid:
+        raise InvalidCursor("Invalid cursor")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by `encode_cursor` and check it has `size` keys"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Invalid cursor")
+    return [_decode_value(v) for v in values]
+
+
+def keyset_after(
+    columns: Sequence[ColumnElement],
+    cursor: str,
+    descending: bool = False
+) -> ColumnElement:
+    """
+    Build the WHERE clause that continues a keyset page after `cursor`.
+
+    `columns` must be the same columns (in the same order) the query is
+    ordered by, ending with the primary key so the ordering is total. All
+    columns are compared in one row-value comparison, which Postgres can
+    answer with a single range scan on a matching composite index.
+    """
+    values = decode_cursor(cursor, len(columns))
+    # A tampered cursor would otherwise fail as a bind error inside the driver
+    for value, column in zip(values, columns):
+        _check_type(value, column)
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
+
+
+def split_page(rows: Sequence[Any], limit: int, *attrs: str) -> Tuple[List[Any], Optional[str]]:
+    """
+    Split `limit + 1` fetched rows into the page and the cursor for the next one.
+
+    Queries fetch one extra row so the last page can be detected without a
+    COUNT; the cursor is None when there is nothing after this page.
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor([getattr(last, attr) for attr in attrs])
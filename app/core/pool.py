@@ -0,0 +1,59 @@
+# core/pool.py
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            if waited > self.wait_seconds_max:
+                self.wait_seconds_max = waited
+
+    def recreate(self):
+        # Keep the counters when SQLAlchemy swaps the pool (e.g. engine.dispose())
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.timeouts = self.timeouts
+        pool.wait_seconds_total = self.wait_seconds_total
+        pool.wait_seconds_max = self.wait_seconds_max
+        return pool
+
+
+def pool_stats(pool) -> dict:
+    """Current utilization and cumulative wait statistics of a pool"""
+    stats = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+    checkouts = getattr(pool, "checkouts", 0)
+    stats.update(
+        checkouts=checkouts,
+        timeouts=getattr(pool, "timeouts", 0),
+        wait_seconds_total=round(getattr(pool, "wait_seconds_total", 0.0), 6),
+        wait_seconds_max=round(getattr(pool, "wait_seconds_max", 0.0), 6),
+        wait_seconds_avg=round(getattr(pool, "wait_seconds_total", 0.0) / checkouts, 6) if checkouts else 0.0,
+    )
+    return stats
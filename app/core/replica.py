@@ -0,0 +1,55 @@
+# core/replica.py
+import time
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Set on responses to writes; while it is in the future the client reads from the primary
+PRIMARY_PIN_COOKIE = "logma_primary_until"
+# Clients that do not keep cookies can ask for a primary read explicitly
+CONSISTENCY_HEADER = "x-read-consistency"
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def pinned_to_primary(request: Request) -> bool:
+    """Whether this request must read from the primary to see its own recent writes"""
+    if request.headers.get(CONSISTENCY_HEADER, "").lower() == "primary":
+        return True
+    try:
+        return float(request.cookies.get(PRIMARY_PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class PrimaryPinMiddleware:
+    """
+    Pin a client to the primary for `seconds` after a successful write.
+
+    Adds a short-lived cookie to 2xx/3xx responses of write requests; the
+    read session dependency honours it so replica lag never hides a write
+    from the client that made it. State lives in the cookie, so this works
+    across workers without shared storage.
+    """
+
+    def __init__(self, app: ASGIApp, seconds: float):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS or self.seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.seconds
+                cookie = (
+                    f"{PRIMARY_PIN_COOKIE}={until:.3f}; Max-Age={int(self.seconds) + 1}; "
+                    f"Path=/; HttpOnly; SameSite=Lax"
+                )
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
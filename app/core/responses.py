@@ -0,0 +1,39 @@
+# core/responses.py
+from typing import Any, Iterable, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.engine import Row
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson; the app's default response class.
+
+    orjson encodes datetimes, dates and UUIDs itself, so rows can be passed
+    as plain dicts without going through jsonable_encoder first. Naive
+    datetimes come out without an offset, as they do with the default encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def fast_json(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    Return `content` as-is, skipping response_model validation and encoding.
+
+    Only for data that already has the endpoint's response shape. Headers
+    the handler set on its injected `response` (ETag, X-Next-Cursor) are
+    carried over, since FastAPI only merges them into responses it builds.
+    """
+    fast = FastJSONResponse(content)
+    if response is not None:
+        fast.headers.raw.extend(response.headers.raw)
+    return fast
+
+
+def rows_response(rows: Iterable[Row], response: Optional[Response] = None) -> FastJSONResponse:
+    """Serialize column-select rows whose names and types match the response model"""
+    return fast_json([row._asdict() for row in rows], response)
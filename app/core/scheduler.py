@@ -0,0 +1,46 @@
+# core/scheduler.py
+import asyncio
+import logging
+from datetime import datetime, time, timedelta
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def parse_time_of_day(value: str) -> Optional[time]:
+    """Parse "HH:MM" into a time; an empty value disables the job"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    return datetime.strptime(value, "%H:%M").time()
+
+
+def seconds_until(at: time, now: Optional[datetime] = None) -> float:
+    """Seconds from `now` until the next occurrence of `at` (local time)"""
+    now = now or datetime.now()
+    run_at = datetime.combine(now.date(), at)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return (run_at - now).total_seconds()
+
+
+async def run_daily(at: time, job: Callable[[], Awaitable[object]], name: str) -> None:
+    """Run `job` every day at `at` until cancelled; failures are logged, not raised"""
+    logger.info(f"Scheduled {name} daily at {at.strftime('%H:%M')}")
+    while True:
+        await asyncio.sleep(seconds_until(at))
+        try:
+            await job()
+        except Exception as e:
+            logger.error(f"Scheduled job {name} failed: {str(e)}")
+
+
+async def run_every(seconds: float, job: Callable[[], Awaitable[object]], name: str) -> None:
+    """Run `job` now and then every `seconds` until cancelled; failures are logged, not raised"""
+    logger.info(f"Scheduled {name} every {seconds:g}s")
+    while True:
+        try:
+            await job()
+        except Exception as e:
+            logger.error(f"Scheduled job {name} failed: {str(e)}")
+        await asyncio.sleep(seconds)
@@ -0,0 +1,219 @@
+# core/slow_queries.py
+import asyncio
+import contextvars
+import itertools
+import logging
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statements longer than this are stored cut short (multi-row INSERTs can be huge)
+MAX_STATEMENT_CHARS = 10000
+MAX_PARAMETER_CHARS = 200
+# Only these can be explained without running them
+EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+EXPLAIN_TIMEOUT_SECONDS = 10
+
+
+def _caller() -> Optional[str]:
+    """
+    The service method (or failing that, the app function) that issued the statement.
+
+    Under the async engine, cursor events run in a greenlet whose own stack
+    ends at SQLAlchemy; the awaiting coroutines are on the parent greenlet's
+    stack, so both are searched.
+    """
+    first_app_frame = None
+    frame = sys._getframe(1)
+    current = getcurrent()
+    while True:
+        while frame is not None:
+            module = frame.f_globals.get("__name__", "")
+            if module.startswith("app.") and module != __name__:
+                name = f"{module}.{frame.f_code.co_qualname}"
+                if module.startswith("app.services."):
+                    return name
+                first_app_frame = first_app_frame or name
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return first_app_frame
+        frame = current.gr_frame
+
+
+def _parameter(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= MAX_PARAMETER_CHARS else text[:MAX_PARAMETER_CHARS] + "..."
+
+
+def redact(parameters: Any) -> Any:
+    """Keep the shape and types of bound parameters, drop their values"""
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [f"<{type(value).__name__}>" for value in parameters]
+    return f"<{type(parameters).__name__}>"
+
+
+class SlowQueryLog:
+    """
+    The most recent statements of this worker that took `threshold_ms` or longer.
+
+    Each entry holds the SQL, the bound parameters (or only their types with
+    `redact_parameters`), the duration, the service method that issued it
+    and, with `explain`, the plan from EXPLAIN (ANALYZE off). The plan is
+    fetched afterwards on a separate connection, one at a time, so recording
+    never delays the slow request further; it shows the plan for the same
+    parameters, which may differ from the one actually used if statistics
+    changed in between.
+    """
+
+    def __init__(self, maxsize: int, threshold_ms: float, redact_parameters: bool = True, explain: bool = True):
+        self.threshold_ms = threshold_ms
+        self.redact_parameters = redact_parameters
+        self.explain = explain
+        self._entries: "deque[dict]" = deque(maxlen=maxsize)
+        self._ids = itertools.count(1)
+        # Attribute set on the execution context while its statement runs
+        self._started_attr = f"_logma_slow_started_{id(self)}"
+        self._explaining = False
+        self._explain_task: Optional[asyncio.Task] = None  # keeps the running EXPLAIN referenced
+        self.recorded = 0
+        self.explains_skipped = 0
+
+    def attach(self, engine: AsyncEngine) -> None:
+        """Time every statement `engine` runs"""
+        sync_engine = engine.sync_engine
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                setattr(context, self._started_attr, time.perf_counter())
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self._finished(engine, context, statement, parameters, executemany)
+
+        def handle_error(exception_context):
+            # Statements cancelled by command_timeout end up here and are the slowest of all
+            context = exception_context.execution_context
+            if context is not None:
+                self._finished(
+                    engine, context, exception_context.statement, exception_context.parameters,
+                    context.executemany, error=str(exception_context.original_exception)
+                )
+
+        event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(sync_engine, "handle_error", handle_error)
+
+    def _finished(
+        self,
+        engine: AsyncEngine,
+        context,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        error: Optional[str] = None
+    ) -> None:
+        started = getattr(context, self._started_attr, None)
+        if started is None:
+            return
+        delattr(context, self._started_attr)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms < self.threshold_ms or statement.lstrip()[:7].lower() == "explain":
+            return
+        if executemany and parameters:
+            parameters = parameters[0]
+
+        entry = {
+            "id": next(self._ids),
+            "recorded_at": datetime.now(timezone.utc),
+            "duration_ms": round(duration_ms, 3),
+            "statement": statement if len(statement) <= MAX_STATEMENT_CHARS else statement[:MAX_STATEMENT_CHARS] + "...",
+            "parameters": redact(parameters) if self.redact_parameters else (
+                {key: _parameter(value) for key, value in parameters.items()} if isinstance(parameters, dict)
+                else [_parameter(value) for value in parameters or ()]
+            ),
+            "executemany": executemany,
+            "caller": _caller(),
+            "error": error,
+            "plan": None,
+            "explain_error": None,
+        }
+        self._entries.append(entry)
+        self.recorded += 1
+        logger.warning(f"Slow query ({duration_ms:.0f} ms) from {entry['caller']}: {statement[:200]}")
+
+        if self.explain and len(statement) <= MAX_STATEMENT_CHARS:
+            self._schedule_explain(engine, entry, statement, parameters)
+
+    def _schedule_explain(self, engine: AsyncEngine, entry: dict, statement: str, parameters: Any) -> None:
+        if not statement.lstrip()[:6].lower().startswith(EXPLAINABLE):
+            entry["explain_error"] = "not an explainable statement"
+            return
+        if self._explaining:
+            # The database is likely overloaded already; do not pile EXPLAINs on top
+            self.explains_skipped += 1
+            entry["explain_error"] = "skipped: another EXPLAIN was running"
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            entry["explain_error"] = "skipped: no event loop"
+            return
+        self._explaining = True
+        # A fresh context: the EXPLAIN must not count towards the current request's statements
+        self._explain_task = loop.create_task(
+            self._explain(engine, entry, statement, parameters), context=contextvars.Context()
+        )
+
+    async def _explain(self, engine: AsyncEngine, entry: dict, statement: str, parameters: Any) -> None:
+        async def plan() -> List[str]:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE off) {statement}", parameters or ())
+                return [row[0] for row in result]
+
+        try:
+            # Bounds the wait for a pooled connection too
+            entry["plan"] = await asyncio.wait_for(plan(), EXPLAIN_TIMEOUT_SECONDS)
+        except Exception as e:
+            entry["explain_error"] = str(e)[:500] or type(e).__name__
+        finally:
+            self._explaining = False
+
+    def recent(self, limit: Optional[int] = None) -> List[dict]:
+        """Entries newest first"""
+        entries = list(reversed(self._entries))
+        return entries[:limit] if limit else entries
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.slow_query_enabled,
+            "threshold_ms": self.threshold_ms,
+            "size": len(self._entries),
+            "maxsize": self._entries.maxlen,
+            "recorded": self.recorded,
+            "explains_skipped": self.explains_skipped,
+        }
+
+
+slow_query_log = SlowQueryLog(
+    maxsize=settings.slow_query_log_size,
+    threshold_ms=settings.slow_query_threshold_ms,
+    redact_parameters=settings.slow_query_redact_parameters,
+    explain=settings.slow_query_explain,
+)
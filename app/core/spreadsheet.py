@@ -0,0 +1,95 @@
+# core/spreadsheet.py
+import codecs
+import csv
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+
+# (1-based row number in the file, column name -> value)
+Row = Tuple[int, Dict[str, Optional[str]]]
+
+
+class UnsupportedFileType(ValueError):
+    """Raised for uploads that are neither CSV nor XLSX"""
+
+
+def _normalize_header(name) -> str:
+    return str(name or "").strip().lower().replace(" ", "_")
+
+
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _iter_csv(upload: UploadFile) -> Iterator[Row]:
+    # Decode the spooled upload incrementally instead of reading it into memory
+    reader = csv.reader(codecs.iterdecode(upload.file, "utf-8-sig"))
+    header = None
+    for line_number, values in enumerate(reader, start=1):
+        if header is None:
+            header = [_normalize_header(name) for name in values]
+            continue
+        if not any(v.strip() for v in values):
+            continue
+        yield line_number, {key: _clean(value) for key, value in zip(header, values) if key}
+
+
+def _iter_xlsx(upload: UploadFile) -> Iterator[Row]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise UnsupportedFileType("Excel import requires openpyxl; upload a CSV instead")
+
+    # read_only mode streams rows from the sheet XML instead of loading the workbook
+    workbook = load_workbook(upload.file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = None
+        for line_number, values in enumerate(rows, start=1):
+            if header is None:
+                header = [_normalize_header(name) for name in values]
+                continue
+            if all(v is None or str(v).strip() == "" for v in values):
+                continue
+            yield line_number, {key: _clean(value) for key, value in zip(header, values) if key}
+    finally:
+        workbook.close()
+
+
+def iter_rows(upload: UploadFile) -> Iterator[Row]:
+    """Iterate over the data rows of a CSV or XLSX upload, keyed by normalized header"""
+    filename = (upload.filename or "").lower()
+    content_type = upload.content_type or ""
+    if filename.endswith(".xlsx") or "spreadsheetml" in content_type:
+        return _iter_xlsx(upload)
+    if filename.endswith(".csv") or content_type in ("text/csv", "application/csv", "text/plain"):
+        return _iter_csv(upload)
+    raise UnsupportedFileType("Upload a .csv or .xlsx file")
+
+
+async def iter_batches(upload: UploadFile, batch_size: int = 500) -> AsyncIterator[List[Row]]:
+    """
+    Yield the rows of an upload in batches of at most `batch_size`.
+
+    Parsing is blocking file I/O, so each batch is read in the threadpool;
+    only one batch is held in memory at a time.
+    """
+    rows = iter_rows(upload)
+
+    def next_batch() -> List[Row]:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                break
+        return batch
+
+    while True:
+        batch = await run_in_threadpool(next_batch)
+        if not batch:
+            return
+        yield batch
@@ -1,17 +1,53 @@
-from fastapi import FastAPI
-from app.database import Base, async_engine
+import asyncio
+from fastapi import FastAPI, Request
+from app.core.config import settings
+from app.database import Base, async_engine, replica_engine
+from app.core.events import broker, listen
+from app.core.fleet_index import fleet_index
+from app.core.instrumentation import RequestInstrumentationMiddleware, instrument_engine
+from app.core.metrics import MetricsMiddleware, mark_worker_exited, metrics_endpoint, sample_runtime_metrics_job
+from app.core.replica import PrimaryPinMiddleware
+from app.core.responses import FastJSONResponse
+from app.core.scheduler import parse_time_of_day, run_daily, run_every
+from app.core.slow_queries import slow_query_log
 from app.models.vehicle import Vehicle
 from app.models.customer_company import CustomerCompany
 from app.models.trip_allocation import Trip_Allocation
+from app.models.scheduled_job import ScheduledJobRun
 from app.api.routers import vehicle
 from app.api.routers import customer_company
 from app.api.routers import trip_allocation
+from app.api.routers import system
+from app.api.routers import reports
+from app.api.routers import events
+from app.services.vehicle_service import refresh_fleet_index, run_daily_rollover
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
+
+if replica_engine is not None:
+    app.add_middleware(PrimaryPinMiddleware, seconds=settings.replica_pin_seconds)
+
+if settings.instrumentation_enabled:
+    for engine in (async_engine, replica_engine):
+        if engine is not None:
+            instrument_engine(engine)
+    # Added after the other middleware so it times them too
+    app.add_middleware(RequestInstrumentationMiddleware, budget_mode=settings.statement_budget_mode)
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+if settings.slow_query_enabled:
+    for engine in (async_engine, replica_engine):
+        if engine is not None:
+            slow_query_log.attach(engine)
 
 app.include_router(vehicle.router, prefix="/api/vehicle", tags=['Vehicle Management'])
 app.include_router(customer_company.router, prefix="/api/customer", tags=['Customer Company Management'])
 app.include_router(trip_allocation.router, prefix="/api/trip_allocation", tags=['Trip Allocations Management'])
+app.include_router(events.router, prefix="/api/events", tags=['Events'])
+app.include_router(reports.router, prefix="/api/reports", tags=['Reports'])
+app.include_router(system.router, prefix="/api/system", tags=['System'])
 
 
 @app.get('/')
@@ -20,8 +56,54 @@ async def test_route():
     return {'message': message}
 
 
+@app.get('/metrics', include_in_schema=False)
+async def metrics(request: Request):
+    return await metrics_endpoint(request)
+
+
 @app.on_event('startup')
 async def create_db_tables():
     async with async_engine.begin() as conn:
         print("----&->   ", Base.metadata.tables.keys())
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@app.on_event('startup')
+async def start_daily_rollover():
+    rollover_at = parse_time_of_day(settings.daily_rollover_at)
+    if rollover_at:
+        app.state.rollover_task = asyncio.create_task(
+            run_daily(rollover_at, run_daily_rollover, "daily status rollover")
+        )
+
+
+@app.on_event('startup')
+async def start_fleet_index():
+    if settings.fleet_index_enabled:
+        app.state.fleet_index_task = asyncio.create_task(
+            run_every(settings.fleet_index_refresh_seconds, refresh_fleet_index, "fleet index refresh")
+        )
+
+
+@app.on_event('startup')
+async def start_event_listener():
+    if settings.events_enabled:
+        broker.add_handler(fleet_index.apply_event)
+        app.state.events_task = asyncio.create_task(listen(broker))
+
+
+@app.on_event('startup')
+async def start_metrics_sampling():
+    if settings.metrics_enabled:
+        app.state.metrics_task = asyncio.create_task(
+            run_every(settings.metrics_sample_seconds, sample_runtime_metrics_job, "metrics sampling")
+        )
+
+
+@app.on_event('shutdown')
+async def stop_background_jobs():
+    for name in ("rollover_task", "fleet_index_task", "events_task", "metrics_task"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+    mark_worker_exited()
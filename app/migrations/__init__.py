@@ -0,0 +1,117 @@
+# migrations/__init__.py
+"""
+Versioned schema migrations.
+
+`Base.metadata.create_all` builds fresh databases at startup; the modules in
+`app/migrations/versions` bring existing databases up to date. Each module
+defines:
+
+- `revision`: ordered, unique version string ("0001", "0002", ...)
+- `description`: one line for the status listing
+- `concurrent`: True when the statements must run outside a transaction
+  (CREATE/DROP INDEX CONCURRENTLY). Each statement is then committed on its
+  own, so they must be idempotent (IF [NOT] EXISTS).
+- `upgrade` / `downgrade`: lists of SQL statements
+
+Applied revisions are recorded in the `schema_migrations` table.
+Run with `python -m app.migrations [status|upgrade|downgrade]`.
+"""
+import importlib
+import logging
+import pkgutil
+from types import ModuleType
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.migrations import versions
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+def load_migrations() -> List[ModuleType]:
+    """Import every migration module, ordered by revision"""
+    modules = [
+        importlib.import_module(f"{versions.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(versions.__path__)
+        if info.name.startswith("v")
+    ]
+    modules.sort(key=lambda m: m.revision)
+    revisions = [m.revision for m in modules]
+    if len(set(revisions)) != len(revisions):
+        raise RuntimeError(f"Duplicate migration revisions: {revisions}")
+    return modules
+
+
+async def _ensure_table(conn: AsyncConnection) -> None:
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+        " revision VARCHAR(32) PRIMARY KEY,"
+        " description TEXT,"
+        " applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+    ))
+
+
+async def applied_revisions(engine: AsyncEngine) -> List[str]:
+    """Return the revisions already applied to the database"""
+    async with engine.begin() as conn:
+        await _ensure_table(conn)
+        result = await conn.execute(text(f"SELECT revision FROM {MIGRATIONS_TABLE} ORDER BY revision"))
+        return list(result.scalars().all())
+
+
+async def _run(engine: AsyncEngine, migration: ModuleType, statements: List[str]) -> None:
+    if migration.concurrent:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for statement in statements:
+                logger.info(f"[{migration.revision}] {statement}")
+                await conn.execute(text(statement))
+    else:
+        async with engine.begin() as conn:
+            for statement in statements:
+                logger.info(f"[{migration.revision}] {statement}")
+                await conn.execute(text(statement))
+
+
+async def upgrade(engine: AsyncEngine, target: Optional[str] = None) -> List[str]:
+    """Apply pending migrations up to and including `target` (default: all)"""
+    applied = set(await applied_revisions(engine))
+    done = []
+    for migration in load_migrations():
+        if target is not None and migration.revision > target:
+            break
+        if migration.revision in applied:
+            continue
+        await _run(engine, migration, migration.upgrade)
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(f"INSERT INTO {MIGRATIONS_TABLE} (revision, description) VALUES (:revision, :description)"),
+                {"revision": migration.revision, "description": migration.description}
+            )
+        logger.info(f"Applied migration {migration.revision}: {migration.description}")
+        done.append(migration.revision)
+    return done
+
+
+async def downgrade(engine: AsyncEngine, target: str) -> List[str]:
+    """Revert applied migrations newer than `target` ("0000" reverts all)"""
+    applied = set(await applied_revisions(engine))
+    done = []
+    for migration in reversed(load_migrations()):
+        if migration.revision <= target:
+            break
+        if migration.revision not in applied:
+            continue
+        await _run(engine, migration, migration.downgrade)
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(f"DELETE FROM {MIGRATIONS_TABLE} WHERE revision = :revision"),
+                {"revision": migration.revision}
+            )
+        logger.info(f"Reverted migration {migration.revision}: {migration.description}")
+        done.append(migration.revision)
+    return done
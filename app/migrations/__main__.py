@@ -0,0 +1,36 @@
+# migrations/__main__.py
+import argparse
+import asyncio
+import logging
+
+from app.database import async_engine
+from app.migrations import applied_revisions, downgrade, load_migrations, upgrade
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        if args.command == "upgrade":
+            done = await upgrade(async_engine, args.target)
+            print(f"Applied: {', '.join(done) or 'nothing to do'}")
+        elif args.command == "downgrade":
+            done = await downgrade(async_engine, args.target)
+            print(f"Reverted: {', '.join(done) or 'nothing to do'}")
+        else:
+            applied = set(await applied_revisions(async_engine))
+            for migration in load_migrations():
+                mark = "x" if migration.revision in applied else " "
+                print(f"[{mark}] {migration.revision}  {migration.description}")
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.migrations")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("status", help="List migrations and whether they are applied")
+    up = sub.add_parser("upgrade", help="Apply pending migrations")
+    up.add_argument("target", nargs="?", default=None, help="Stop after this revision")
+    down = sub.add_parser("downgrade", help="Revert migrations newer than target")
+    down.add_argument("target", help="Revision to keep (0000 reverts everything)")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,39 @@
+"""
+Indexes for the trip allocation hot paths.
+
+- active-trip check per vehicle (partial, only pending/allocated/in_progress rows)
+- per-vehicle history ordered by created_at DESC
+- trips by customer company
+- keyset pagination of the customer company list
+
+If a CONCURRENTLY build is interrupted Postgres leaves an INVALID index behind
+that IF NOT EXISTS will skip; drop it before re-running the upgrade.
+"""
+
+revision = "0001"
+description = "trip_allocation hot path indexes"
+concurrent = True
+
+upgrade = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trip_allocation_vehicle_active "
+    "ON trip_allocation (vehicle_id) "
+    "WHERE status IN ('pending', 'allocated', 'in_progress')",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trip_allocation_vehicle_created_at "
+    "ON trip_allocation (vehicle_id, created_at DESC, trip_allocation_id DESC)",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trip_allocation_company_trip_date "
+    "ON trip_allocation (customer_company_id, trip_date_time)",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customer_company_name_id "
+    "ON customer_company (name, customer_company_id)",
+
+    "ANALYZE trip_allocation",
+]
+
+downgrade = [
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_customer_company_name_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_trip_allocation_company_trip_date",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_trip_allocation_vehicle_created_at",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_trip_allocation_vehicle_active",
+]
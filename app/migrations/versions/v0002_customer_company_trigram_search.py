@@ -0,0 +1,42 @@
+"""
+Trigram indexes behind the customer company search.
+
+GIN gin_trgm_ops indexes let Postgres answer `ILIKE '%term%'` and the
+word-similarity operator (`<%`) without scanning customer_company. They are not
+declared on the model because they need the pg_trgm extension; the search
+service falls back to plain ILIKE when the extension is missing.
+
+CREATE EXTENSION needs a role allowed to create it (superuser, or a trusted
+extension on PostgreSQL 13+).
+"""
+
+revision = "0002"
+description = "pg_trgm indexes for customer company search"
+concurrent = True
+
+upgrade = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customer_company_name_trgm "
+    "ON customer_company USING gin (name gin_trgm_ops)",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customer_company_contact_person_trgm "
+    "ON customer_company USING gin (contact_person gin_trgm_ops)",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customer_company_factory_location_trgm "
+    "ON customer_company USING gin (factory_location gin_trgm_ops)",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customer_company_phone_trgm "
+    "ON customer_company USING gin (phone gin_trgm_ops)",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customer_company_email_trgm "
+    "ON customer_company USING gin (email gin_trgm_ops)",
+]
+
+downgrade = [
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_customer_company_email_trgm",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_customer_company_phone_trgm",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_customer_company_factory_location_trgm",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_customer_company_contact_person_trgm",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_customer_company_name_trgm",
+]
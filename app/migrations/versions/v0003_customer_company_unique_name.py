@@ -0,0 +1,31 @@
+"""
+Make customer_company.name unique.
+
+The service already rejects duplicate names; the unique index lets imports
+use INSERT ... ON CONFLICT (name). The existing ix_customer_company_name is
+rebuilt as unique under the same name so migrated and freshly created
+databases match. The build fails if duplicate names already exist; merge or
+rename them first.
+"""
+
+revision = "0003"
+description = "unique customer_company.name"
+concurrent = True
+
+upgrade = [
+    "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_customer_company_name_unique "
+    "ON customer_company (name)",
+
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_customer_company_name",
+
+    "ALTER INDEX ix_customer_company_name_unique RENAME TO ix_customer_company_name",
+]
+
+downgrade = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customer_company_name_plain "
+    "ON customer_company (name)",
+
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_customer_company_name",
+
+    "ALTER INDEX ix_customer_company_name_plain RENAME TO ix_customer_company_name",
+]
@@ -0,0 +1,29 @@
+"""
+Enforce one active trip per vehicle.
+
+Replaces the plain partial index from 0001 with a unique one, so two
+concurrent dispatches cannot both allocate the same vehicle. create_trip
+relies on it through INSERT ... ON CONFLICT DO NOTHING. The build fails if
+a vehicle already has several pending/allocated/in_progress trips; cancel
+or complete the extras first.
+"""
+
+revision = "0004"
+description = "unique active trip per vehicle"
+concurrent = True
+
+upgrade = [
+    "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_trip_allocation_vehicle_active "
+    "ON trip_allocation (vehicle_id) "
+    "WHERE status IN ('pending', 'allocated', 'in_progress')",
+
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_trip_allocation_vehicle_active",
+]
+
+downgrade = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trip_allocation_vehicle_active "
+    "ON trip_allocation (vehicle_id) "
+    "WHERE status IN ('pending', 'allocated', 'in_progress')",
+
+    "DROP INDEX CONCURRENTLY IF EXISTS ux_trip_allocation_vehicle_active",
+]
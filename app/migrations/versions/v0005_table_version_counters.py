@@ -0,0 +1,49 @@
+"""
+Per-table change counters behind the ETag / conditional GET support.
+
+A statement-level trigger bumps a counter in table_version after every
+INSERT/UPDATE/DELETE/TRUNCATE on vehicle, customer_company and
+trip_allocation. The bump is part of the writing transaction, so it rolls
+back with it and replicates exactly like the data. Each table has 16 slots
+picked by backend PID, so concurrent writers rarely wait on the same
+counter row; the table's version is the sum of its slots.
+"""
+
+revision = "0005"
+description = "table_version change counters"
+concurrent = False
+
+TABLES = ["vehicle", "customer_company", "trip_allocation"]
+
+upgrade = [
+    "CREATE TABLE IF NOT EXISTS table_version ("
+    " table_name VARCHAR(63) NOT NULL,"
+    " slot SMALLINT NOT NULL,"
+    " version BIGINT NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (table_name, slot))",
+
+    "CREATE OR REPLACE FUNCTION logma_bump_table_version() RETURNS trigger "
+    "LANGUAGE plpgsql AS $$ "
+    "BEGIN "
+    "  INSERT INTO table_version (table_name, slot, version) "
+    "  VALUES (TG_TABLE_NAME, pg_backend_pid() % 16, 1) "
+    "  ON CONFLICT (table_name, slot) DO UPDATE SET version = table_version.version + 1; "
+    "  RETURN NULL; "
+    "END $$",
+] + [
+    statement
+    for table in TABLES
+    for statement in (
+        f"DROP TRIGGER IF EXISTS logma_table_version ON {table}",
+        f"CREATE TRIGGER logma_table_version "
+        f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION logma_bump_table_version()",
+    )
+]
+
+downgrade = [
+    f"DROP TRIGGER IF EXISTS logma_table_version ON {table}" for table in TABLES
+] + [
+    "DROP FUNCTION IF EXISTS logma_bump_table_version()",
+    "DROP TABLE IF EXISTS table_version",
+]
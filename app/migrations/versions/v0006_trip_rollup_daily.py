@@ -0,0 +1,111 @@
+"""
+Daily trip count and tonnage per company and vehicle.
+
+trip_rollup_daily holds one row per (trip day, company, vehicle). A row
+trigger on trip_allocation applies each INSERT, UPDATE and DELETE to it as
+a delta in the same transaction, so every write path stays in step,
+including bulk creates and imports. Cancelled trips are not counted.
+Updates that leave the day, company, vehicle, load and counted state
+unchanged (most status changes) skip the rollup entirely. Rows whose
+count drops to zero are deleted.
+
+The upgrade backfills existing trips. CREATE TRIGGER locks trip_allocation
+against writes until the migration commits, so no trip is missed or
+counted twice. To rebuild later, use `python -m app.scripts.rebuild_trip_rollups`.
+"""
+
+revision = "0006"
+description = "trip_rollup_daily with incremental maintenance"
+concurrent = False
+
+upgrade = [
+    "CREATE TABLE IF NOT EXISTS trip_rollup_daily ("
+    " day DATE NOT NULL,"
+    " customer_company_id INTEGER NOT NULL,"
+    " vehicle_id INTEGER NOT NULL,"
+    " trip_count INTEGER NOT NULL DEFAULT 0,"
+    " load_tons DOUBLE PRECISION NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (day, customer_company_id, vehicle_id))",
+
+    "CREATE INDEX IF NOT EXISTS ix_trip_rollup_daily_company_day "
+    "ON trip_rollup_daily (customer_company_id, day)",
+
+    "CREATE INDEX IF NOT EXISTS ix_trip_rollup_daily_vehicle_day "
+    "ON trip_rollup_daily (vehicle_id, day)",
+
+    "CREATE OR REPLACE FUNCTION logma_trip_rollup_apply("
+    " p_day DATE, p_company INTEGER, p_vehicle INTEGER, p_count INTEGER, p_tons DOUBLE PRECISION"
+    ") RETURNS void LANGUAGE plpgsql AS $$ "
+    "BEGIN "
+    "  INSERT INTO trip_rollup_daily AS r (day, customer_company_id, vehicle_id, trip_count, load_tons) "
+    "  VALUES (p_day, p_company, p_vehicle, p_count, p_tons) "
+    "  ON CONFLICT (day, customer_company_id, vehicle_id) DO UPDATE "
+    "  SET trip_count = r.trip_count + EXCLUDED.trip_count, "
+    "      load_tons = r.load_tons + EXCLUDED.load_tons; "
+    "  IF p_count < 0 THEN "
+    "    DELETE FROM trip_rollup_daily "
+    "    WHERE day = p_day AND customer_company_id = p_company "
+    "      AND vehicle_id = p_vehicle AND trip_count <= 0; "
+    "  END IF; "
+    "END $$",
+
+    "CREATE OR REPLACE FUNCTION logma_trip_rollup() RETURNS trigger "
+    "LANGUAGE plpgsql AS $$ "
+    "DECLARE "
+    "  old_counted BOOLEAN := TG_OP <> 'INSERT' AND OLD.status IS DISTINCT FROM 'cancelled'; "
+    "  new_counted BOOLEAN := TG_OP <> 'DELETE' AND NEW.status IS DISTINCT FROM 'cancelled'; "
+    "BEGIN "
+    "  IF TG_OP = 'UPDATE' AND old_counted = new_counted "
+    "     AND OLD.trip_date_time::date = NEW.trip_date_time::date "
+    "     AND OLD.customer_company_id = NEW.customer_company_id "
+    "     AND OLD.vehicle_id = NEW.vehicle_id "
+    "     AND OLD.load_tons = NEW.load_tons THEN "
+    "    RETURN NULL; "
+    "  END IF; "
+    "  IF old_counted THEN "
+    "    PERFORM logma_trip_rollup_apply("
+    "      OLD.trip_date_time::date, OLD.customer_company_id, OLD.vehicle_id, -1, -OLD.load_tons); "
+    "  END IF; "
+    "  IF new_counted THEN "
+    "    PERFORM logma_trip_rollup_apply("
+    "      NEW.trip_date_time::date, NEW.customer_company_id, NEW.vehicle_id, 1, NEW.load_tons); "
+    "  END IF; "
+    "  RETURN NULL; "
+    "END $$",
+
+    "CREATE OR REPLACE FUNCTION logma_trip_rollup_truncate() RETURNS trigger "
+    "LANGUAGE plpgsql AS $$ "
+    "BEGIN "
+    "  TRUNCATE trip_rollup_daily; "
+    "  RETURN NULL; "
+    "END $$",
+
+    "DROP TRIGGER IF EXISTS logma_trip_rollup ON trip_allocation",
+
+    "CREATE TRIGGER logma_trip_rollup "
+    "AFTER INSERT OR UPDATE OR DELETE ON trip_allocation "
+    "FOR EACH ROW EXECUTE FUNCTION logma_trip_rollup()",
+
+    "DROP TRIGGER IF EXISTS logma_trip_rollup_truncate ON trip_allocation",
+
+    "CREATE TRIGGER logma_trip_rollup_truncate "
+    "AFTER TRUNCATE ON trip_allocation "
+    "FOR EACH STATEMENT EXECUTE FUNCTION logma_trip_rollup_truncate()",
+
+    "DELETE FROM trip_rollup_daily",
+
+    "INSERT INTO trip_rollup_daily (day, customer_company_id, vehicle_id, trip_count, load_tons) "
+    "SELECT trip_date_time::date, customer_company_id, vehicle_id, count(*), sum(load_tons) "
+    "FROM trip_allocation "
+    "WHERE status IS DISTINCT FROM 'cancelled' "
+    "GROUP BY 1, 2, 3",
+]
+
+downgrade = [
+    "DROP TRIGGER IF EXISTS logma_trip_rollup_truncate ON trip_allocation",
+    "DROP TRIGGER IF EXISTS logma_trip_rollup ON trip_allocation",
+    "DROP FUNCTION IF EXISTS logma_trip_rollup_truncate()",
+    "DROP FUNCTION IF EXISTS logma_trip_rollup()",
+    "DROP FUNCTION IF EXISTS logma_trip_rollup_apply(DATE, INTEGER, INTEGER, INTEGER, DOUBLE PRECISION)",
+    "DROP TABLE IF EXISTS trip_rollup_daily",
+]
@@ -0,0 +1,77 @@
+"""
+Change notifications on the logma_events channel.
+
+Statement-level triggers on vehicle, customer_company and trip_allocation
+send one NOTIFY per INSERT, UPDATE or DELETE statement, however many rows
+it touched. The payload is JSON with the table, the operation, the number
+of rows and their primary keys; past MAX_NOTIFY_IDS rows the keys are
+left out (null) and listeners refetch instead. Set-based writes (the daily
+rollover, bulk status updates, bulk creates, imports) therefore cost one
+event each, not one per row. Statements that touch no rows send nothing.
+
+NOTIFY is transactional: listeners hear about a change when it commits and
+never about one that rolled back. Each worker holds one LISTEN connection
+(app/core/events.py) and fans the events out to its WebSocket and SSE
+clients. Each trigger reads its rows from a transition table, so every
+event needs its own trigger.
+"""
+
+revision = "0007"
+description = "NOTIFY logma_events on vehicle, company and trip changes"
+concurrent = False
+
+# table -> primary key sent in the payload
+KEY_COLUMNS = {
+    "vehicle": "vehicle_id",
+    "customer_company": "customer_company_id",
+    "trip_allocation": "trip_allocation_id",
+}
+
+# Most keys in one payload; 500 ten-digit ids stay well below the 8000 byte NOTIFY limit
+MAX_NOTIFY_IDS = 500
+
+# event -> transition table it reads
+TRANSITION_TABLES = {
+    "INSERT": "NEW TABLE",
+    "UPDATE": "NEW TABLE",
+    "DELETE": "OLD TABLE",
+}
+
+upgrade = [
+    "CREATE OR REPLACE FUNCTION logma_notify_change() RETURNS trigger "
+    "LANGUAGE plpgsql AS $$ "
+    "DECLARE "
+    "  changed BIGINT; "
+    "  ids JSONB; "
+    "BEGIN "
+    "  EXECUTE 'SELECT count(*) FROM changed_rows' INTO changed; "
+    "  IF changed = 0 THEN "
+    "    RETURN NULL; "
+    "  END IF; "
+    "  IF changed <= TG_ARGV[1]::integer THEN "
+    "    EXECUTE format('SELECT jsonb_agg(%1$I ORDER BY %1$I) FROM changed_rows', TG_ARGV[0]) INTO ids; "
+    "  END IF; "
+    "  PERFORM pg_notify('logma_events', jsonb_build_object("
+    "    'table', TG_TABLE_NAME, 'op', lower(TG_OP), 'count', changed, 'ids', ids)::text); "
+    "  RETURN NULL; "
+    "END $$",
+] + [
+    statement
+    for table, key in KEY_COLUMNS.items()
+    for event, transition in TRANSITION_TABLES.items()
+    for statement in (
+        f"DROP TRIGGER IF EXISTS logma_notify_{event.lower()} ON {table}",
+        f"CREATE TRIGGER logma_notify_{event.lower()} "
+        f"AFTER {event} ON {table} "
+        f"REFERENCING {transition} AS changed_rows "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION logma_notify_change('{key}', '{MAX_NOTIFY_IDS}')",
+    )
+]
+
+downgrade = [
+    f"DROP TRIGGER IF EXISTS logma_notify_{event.lower()} ON {table}"
+    for table in KEY_COLUMNS
+    for event in TRANSITION_TABLES
+] + [
+    "DROP FUNCTION IF EXISTS logma_notify_change()",
+]
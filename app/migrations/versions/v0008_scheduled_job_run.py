@@ -0,0 +1,24 @@
+"""
+Record the last day each scheduled daily job ran.
+
+Every worker schedules the fleet daily_status rollover. The worker that
+runs it claims the day in scheduled_job_run within the rollover
+transaction; workers whose scheduler fires later that day find the day
+already claimed and skip it. New databases get the table from create_all
+(models.scheduled_job).
+"""
+
+revision = "0008"
+description = "scheduled_job_run"
+concurrent = False
+
+upgrade = [
+    "CREATE TABLE IF NOT EXISTS scheduled_job_run ("
+    " job_name VARCHAR(63) PRIMARY KEY,"
+    " last_run_on DATE NOT NULL,"
+    " ran_at TIMESTAMPTZ NOT NULL DEFAULT now())",
+]
+
+downgrade = [
+    "DROP TABLE IF EXISTS scheduled_job_run",
+]
@@ -0,0 +1,21 @@
+"""
+Index the trip export order.
+
+GET /api/trip_allocation/export orders by (trip_date_time,
+trip_allocation_id). Without a company filter nothing else serves that
+order, so Postgres sorted the whole table before sending the first row.
+With the index, rows stream in index order from the start.
+"""
+
+revision = "0009"
+description = "trip_allocation export order index"
+concurrent = True
+
+upgrade = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trip_allocation_trip_date_id "
+    "ON trip_allocation (trip_date_time, trip_allocation_id)",
+]
+
+downgrade = [
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_trip_allocation_trip_date_id",
+]
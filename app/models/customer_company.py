@@ -1,5 +1,5 @@
 # Updated CustomerCompany Model
-from sqlalchemy import Column, Integer, String, Text, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -9,7 +9,7 @@ class CustomerCompany(Base):
     customer_company_id = Column(Integer, primary_key=True, index=True)
     
     # Basic identity
-    name = Column(String(200), nullable=False, index=True)
+    name = Column(String(200), nullable=False, index=True, unique=True)
     contact_person = Column(String(100))
     
     # Contact details
@@ -33,5 +33,10 @@ class CustomerCompany(Base):
     # Relationships
     trip_allocations = relationship("Trip_Allocation", back_populates="customer_company")
 
+    __table_args__ = (
+        # Keyset pagination of the company list (ORDER BY name, id)
+        Index("ix_customer_company_name_id", name, customer_company_id),
+    )
+
     def __repr__(self):
         return f"<CustomerCompany(id={self.customer_company_id}, name='{self.name}')>"
\ No newline at end of file
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Date, DateTime, String
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ScheduledJobRun(Base):
+    """The last day each once-a-day job ran, shared by all workers"""
+    __tablename__ = "scheduled_job_run"
+
+    job_name = Column(String(63), primary_key=True)
+    last_run_on = Column(Date, nullable=False)
+    ran_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<ScheduledJobRun(job='{self.job_name}', last_run_on={self.last_run_on})>"
@@ -1,7 +1,27 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, func, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+# Statuses that keep a vehicle busy; a vehicle may only have one such trip
+ACTIVE_TRIP_STATUSES = ("pending", "allocated", "in_progress")
+TRIP_STATUSES = ACTIVE_TRIP_STATUSES + ("completed", "cancelled")
+# Predicate of the one-active-trip index, as literal SQL: ON CONFLICT must repeat
+# it without bound parameters for Postgres to match the index under a generic plan
+ACTIVE_TRIP_PREDICATE = "status IN (%s)" % ", ".join(f"'{status}'" for status in ACTIVE_TRIP_STATUSES)
+
+# Allowed status changes; completed and cancelled are final
+TRIP_TRANSITIONS = {
+    "pending": ("allocated", "cancelled"),
+    "allocated": ("in_progress", "cancelled"),
+    "in_progress": ("completed", "cancelled"),
+    "completed": (),
+    "cancelled": (),
+}
+
+
+def statuses_leading_to(status: str) -> tuple:
+    """Current statuses from which a trip may move to `status`"""
+    return tuple(source for source, targets in TRIP_TRANSITIONS.items() if status in targets)
 
 class Trip_Allocation(Base):
     __tablename__ = "trip_allocation"
@@ -23,5 +43,27 @@ class Trip_Allocation(Base):
     vehicle = relationship("Vehicle", back_populates="trip_allocations")
     customer_company = relationship("CustomerCompany", back_populates="trip_allocations")
 
+    # Kept in sync with app/migrations/versions, which builds them CONCURRENTLY on live databases
+    __table_args__ = (
+        # One active trip per vehicle; also serves the active-trip checks
+        Index(
+            "ux_trip_allocation_vehicle_active",
+            vehicle_id,
+            unique=True,
+            postgresql_where=text(ACTIVE_TRIP_PREDICATE)
+        ),
+        # Per-vehicle allocation history, newest first
+        Index(
+            "ix_trip_allocation_vehicle_created_at",
+            vehicle_id,
+            created_at.desc(),
+            trip_allocation_id.desc()
+        ),
+        # Trips by company
+        Index("ix_trip_allocation_company_trip_date", customer_company_id, trip_date_time),
+        # Trip export order
+        Index("ix_trip_allocation_trip_date_id", trip_date_time, trip_allocation_id),
+    )
+
     def __repr__(self):
         return f"<Trip_Allocation(id={self.trip_allocation_id}, vehicle_id={self.vehicle_id}, status='{self.status}')>"
\ No newline at end of file
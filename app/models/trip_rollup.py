@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Date, Float, Integer, MetaData, Table
+
+# Owned by migration 0006 rather than Base.metadata: the table is only
+# correct together with the trip_allocation triggers that maintain it, so
+# create_all must not create it on its own.
+rollup_metadata = MetaData()
+
+trip_rollup_daily = Table(
+    "trip_rollup_daily",
+    rollup_metadata,
+    Column("day", Date, primary_key=True),
+    Column("customer_company_id", Integer, primary_key=True),
+    Column("vehicle_id", Integer, primary_key=True),
+    Column("trip_count", Integer, nullable=False),
+    Column("load_tons", Float, nullable=False),
+)
@@ -4,6 +4,10 @@ from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+# Values of Vehicle.status and Vehicle.daily_status
+VEHICLE_STATUSES = ("active", "inactive")
+DAILY_STATUSES = ("available", "in_line", "assigned")
+
 class Vehicle(Base):
     __tablename__ = "vehicle"
     
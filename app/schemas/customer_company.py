@@ -1,7 +1,7 @@
 # schemas/customer_company.py
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Literal
 
 class CustomerCompanyBase(BaseModel):
     name: str
@@ -31,16 +31,16 @@ class CustomerCompanyUpdate(BaseModel):
     contact_details: Optional[str] = None
 
 class CustomerCompany(CustomerCompanyBase):
+    model_config = ConfigDict(from_attributes=True)
+
     customer_company_id: int  # Changed from 'id' to match model
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True  # Use orm_mode for Pydantic v1
-        # from_attributes = True  # This is for Pydantic v2
-
 class CustomerCompanyList(BaseModel):
     companies: List[CustomerCompany]
-    total: int
+    total: Optional[int] = None  # None when the count was skipped
+    total_type: Literal["exact", "estimated", "none"] = "exact"
     skip: int
-    limit: int
\ No newline at end of file
+    limit: int
+    next_cursor: Optional[str] = None
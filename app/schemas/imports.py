@@ -0,0 +1,16 @@
+# schemas/imports.py
+from pydantic import BaseModel
+from typing import List
+
+class ImportRowError(BaseModel):
+    row: int  # 1-based line in the uploaded file, header included
+    error: str
+
+class ImportResult(BaseModel):
+    processed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0  # rows that already existed (on_conflict=skip) or repeat an earlier row
+    failed: int = 0
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False  # only the first MAX_IMPORT_ERRORS errors are listed
@@ -0,0 +1,12 @@
+# schemas/report.py
+from datetime import date
+from typing import Optional
+from pydantic import BaseModel
+
+class TripTotals(BaseModel):
+    """Trips and tonnage of one company or vehicle over one day or month"""
+    period: date  # the day, or the first day of the month
+    customer_company_id: Optional[int] = None
+    vehicle_id: Optional[int] = None
+    trip_count: int
+    load_tons: float
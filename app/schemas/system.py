@@ -0,0 +1,67 @@
+# schemas/system.py
+from datetime import datetime
+from typing import Any, List, Optional
+from pydantic import BaseModel
+
+class PoolStats(BaseModel):
+    size: int  # configured pool_size
+    checked_out: int  # connections in use right now
+    checked_in: int  # idle connections in the pool
+    overflow: int  # connections open beyond pool_size
+    max_overflow: int
+    checkouts: int  # since process start
+    timeouts: int  # checkouts that gave up after pool_timeout
+    wait_seconds_total: float
+    wait_seconds_max: float
+    wait_seconds_avg: float
+
+
+class CacheStats(BaseModel):
+    enabled: bool
+    size: int
+    maxsize: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_ratio: float
+    evictions: int  # dropped to stay within maxsize
+    expirations: int  # dropped because older than ttl_seconds
+    invalidations: int
+
+
+class FleetIndexStats(BaseModel):
+    enabled: bool
+    fresh: bool  # False: /available and /in-line are being served from the database
+    vehicles: int
+    age_seconds: Optional[float] = None  # since the last reconciliation
+    max_staleness_seconds: float
+    reloads: int  # full reloads of the vehicle table
+    hits: int  # requests served from memory
+    misses: int  # requests that fell back to the database
+
+
+class SlowQuery(BaseModel):
+    id: int
+    recorded_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: Any = None  # bound values, or only their types when redacted
+    executemany: bool
+    caller: Optional[str] = None  # service method (or app function) that issued the statement
+    error: Optional[str] = None  # set when the statement failed, e.g. on command_timeout
+    plan: Optional[List[str]] = None  # EXPLAIN (ANALYZE off), filled in shortly after recording
+    explain_error: Optional[str] = None
+
+
+class SlowQueryLogStats(BaseModel):
+    enabled: bool
+    threshold_ms: float
+    size: int
+    maxsize: int
+    recorded: int  # since process start
+    explains_skipped: int  # slow queries recorded while another EXPLAIN was running
+
+
+class SlowQueryReport(BaseModel):
+    stats: SlowQueryLogStats
+    entries: List[SlowQuery]  # newest first
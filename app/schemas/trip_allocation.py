@@ -1,38 +1,30 @@
-from pydantic import BaseModel, Field, validator
-from datetime import datetime
-from typing import Optional
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
+from datetime import date, datetime
+from typing import Annotated, Optional, List, Literal
+from app.schemas.vehicle import DailyStatus
+
+# Checked by pydantic-core itself, no Python validator call per field
+TripType = Literal["single", "multiple"]
+EntryRole = Literal["TM", "TM Assistant"]
+TripStatus = Literal["pending", "allocated", "in_progress", "completed", "cancelled"]
+
+
+def _strip_timezone(v: datetime) -> datetime:
+    """Keep the wall-clock time and drop the offset; trip_date_time is stored naive"""
+    return v.replace(tzinfo=None) if v.tzinfo is not None else v
+
+
+NaiveDatetime = Annotated[datetime, AfterValidator(_strip_timezone)]
 
 class TripAllocationBase(BaseModel):
     vehicle_id: int = Field(..., description="ID of the vehicle")
     company_id: int = Field(..., description="ID of the customer company")
     load_tons: float = Field(..., gt=0, description="Load in tons")
     factory: str = Field(..., min_length=1, description="Factory name")
-    trip_type: str = Field(..., description="Trip type: 'single' or 'multiple'")
-    trip_date_time: datetime = Field(..., description="Trip date and time")
+    trip_type: TripType = Field(..., description="Trip type: 'single' or 'multiple'")
+    trip_date_time: NaiveDatetime = Field(..., description="Trip date and time")
     transport_manager_name: str = Field(..., min_length=1, description="Transport manager name")
-    entry_by_role: str = Field(..., description="Entry role: 'TM' or 'TM Assistant'")
-
-    @validator('trip_type')
-    def validate_trip_type(cls, v):
-        """Validate trip type is either 'single' or 'multiple'"""
-        if v not in ['single', 'multiple']:
-            raise ValueError("Trip type must be either 'single' or 'multiple'")
-        return v
-
-    @validator('entry_by_role')
-    def validate_entry_by_role(cls, v):
-        """Validate entry role is either 'TM' or 'TM Assistant'"""
-        if v not in ['TM', 'TM Assistant']:
-            raise ValueError("Entry role must be either 'TM' or 'TM Assistant'")
-        return v
-
-    @validator('trip_date_time')
-    def ensure_naive_datetime(cls, v):
-        """Ensure datetime is timezone-naive for PostgreSQL compatibility"""
-        if v and v.tzinfo is not None:
-            # Convert to naive datetime by removing timezone info
-            return v.replace(tzinfo=None)
-        return v
+    entry_by_role: EntryRole = Field(..., description="Entry role: 'TM' or 'TM Assistant'")
 
 class TripAllocationCreate(TripAllocationBase):
     """Schema for creating a new trip allocation"""
@@ -40,6 +32,8 @@ class TripAllocationCreate(TripAllocationBase):
 
 class TripAllocationOut(BaseModel):
     """Schema for trip allocation output"""
+    model_config = ConfigDict(from_attributes=True)
+
     trip_allocation_id: int
     vehicle_id: int
     customer_company_id: int  # This matches the database field name
@@ -53,48 +47,58 @@ class TripAllocationOut(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
-        from_attributes = True
-
 class TripAllocationUpdate(BaseModel):
     """Schema for updating trip allocation - all fields optional"""
     vehicle_id: Optional[int] = Field(None, description="ID of the vehicle")
     company_id: Optional[int] = Field(None, description="ID of the customer company")
     load_tons: Optional[float] = Field(None, gt=0, description="Load in tons")
     factory: Optional[str] = Field(None, min_length=1, description="Factory name")
-    trip_type: Optional[str] = Field(None, description="Trip type")
-    trip_date_time: Optional[datetime] = Field(None, description="Trip date and time")
+    trip_type: Optional[TripType] = Field(None, description="Trip type")
+    trip_date_time: Optional[NaiveDatetime] = Field(None, description="Trip date and time")
     transport_manager_name: Optional[str] = Field(None, min_length=1, description="Transport manager name")
-    entry_by_role: Optional[str] = Field(None, description="Entry role")
-    status: Optional[str] = Field(None, description="Trip status")
+    entry_by_role: Optional[EntryRole] = Field(None, description="Entry role")
+    # Whether the trip may move to it is checked on update (TRIP_TRANSITIONS)
+    status: Optional[TripStatus] = Field(None, description="Trip status")
+
+class TripAllocationBulkCreate(BaseModel):
+    """Schema for creating many trip allocations in one request"""
+    trips: List[TripAllocationCreate] = Field(..., min_length=1, max_length=1000, description="Trips to create")
+    mode: Literal["all_or_nothing", "best_effort"] = Field(
+        "all_or_nothing",
+        description="all_or_nothing creates no trips if any item fails; best_effort creates the valid ones"
+    )
 
-    @validator('trip_type')
-    def validate_trip_type(cls, v):
-        """Validate trip type is either 'single' or 'multiple'"""
-        if v is not None and v not in ['single', 'multiple']:
-            raise ValueError("Trip type must be either 'single' or 'multiple'")
-        return v
+class TripAllocationBulkItemResult(BaseModel):
+    """Outcome of one item of a bulk create, by position in the request"""
+    index: int
+    status: Literal["created", "failed", "skipped"]
+    trip: Optional[TripAllocationOut] = None
+    error: Optional[str] = None
 
-    @validator('entry_by_role')
-    def validate_entry_by_role(cls, v):
-        """Validate entry role is either 'TM' or 'TM Assistant'"""
-        if v is not None and v not in ['TM', 'TM Assistant']:
-            raise ValueError("Entry role must be either 'TM' or 'TM Assistant'")
-        return v
+class TripAllocationBulkResult(BaseModel):
+    """Schema for bulk create output"""
+    mode: str
+    created: int
+    failed: int
+    results: List[TripAllocationBulkItemResult]
 
-    @validator('status')
-    def validate_status(cls, v):
-        """Validate status is valid"""
-        valid_statuses = ['pending', 'allocated', 'in_progress', 'completed', 'cancelled']
-        if v is not None and v not in valid_statuses:
-            raise ValueError(f"Status must be one of: {', '.join(valid_statuses)}")
-        return v
+class TripStatusTransition(BaseModel):
+    """Move every trip matching the filters to `to_status` in one statement"""
+    to_status: TripStatus = Field(..., description="Status to move the matching trips to")
+    from_status: Optional[List[TripStatus]] = Field(
+        None, description="Only trips currently in these statuses (default: every status allowed to move to to_status)"
+    )
+    date_from: Optional[date] = Field(None, description="Only trips on or after this trip day")
+    date_to: Optional[date] = Field(None, description="Only trips on or before this trip day")
+    vehicle_ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000, description="Only these vehicles")
+    company_id: Optional[int] = Field(None, gt=0, description="Only this customer company")
+    vehicle_daily_status: Optional[DailyStatus] = Field(
+        None, description="Also set this daily_status on the vehicles of the moved trips, in the same transaction"
+    )
 
-    @validator('trip_date_time')
-    def ensure_naive_datetime(cls, v):
-        """Ensure datetime is timezone-naive for PostgreSQL compatibility"""
-        if v and v.tzinfo is not None:
-            # Convert to naive datetime by removing timezone info
-            return v.replace(tzinfo=None)
-        return v
\ No newline at end of file
+class TripStatusTransitionResult(BaseModel):
+    """Schema for bulk status transition output"""
+    to_status: str
+    updated: int
+    trip_ids: List[int]
+    vehicles_updated: int  # vehicles whose daily_status actually changed
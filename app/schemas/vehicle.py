@@ -1,7 +1,11 @@
 # vehicle.py (schemas)
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List, Literal
+
+# Values of Vehicle.status and Vehicle.daily_status (models.vehicle.VEHICLE_STATUSES, DAILY_STATUSES)
+VehicleStatus = Literal["active", "inactive"]
+DailyStatus = Literal["available", "in_line", "assigned"]
 
 class VehicleBase(BaseModel):
     vehicle_number: str
@@ -11,29 +15,101 @@ class VehicleBase(BaseModel):
     daily_status: str = "available"
 
 class VehicleCreate(VehicleBase):
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+    status: VehicleStatus = "active"
+    daily_status: DailyStatus = "available"
 
 class VehicleOut(VehicleBase):
+    model_config = ConfigDict(from_attributes=True)
+
     vehicle_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
-    
-    class Config:
-        orm_mode = True
-        from_attributes = True
 
 class VehicleUpdate(BaseModel):
     vehicle_number: Optional[str] = None
     registration_number: Optional[str] = None
     vehicle_type: Optional[str] = None
-    status: Optional[str] = None
-    daily_status: Optional[str] = None
+    status: Optional[VehicleStatus] = None
+    daily_status: Optional[DailyStatus] = None
 
 class Vehicle(VehicleBase):
+    model_config = ConfigDict(from_attributes=True)
+
     vehicle_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
-    
-    class Config:
-        from_attributes = True
\ No newline at end of file
+
+class VehicleDailyStatusBulkUpdate(BaseModel):
+    vehicle_ids: List[int] = Field(..., min_length=1, max_length=10000)
+    daily_status: DailyStatus
+
+class VehicleDailyStatusResult(BaseModel):
+    updated: int  # rows whose daily_status actually changed
+
+class VehicleDailyRolloverResult(BaseModel):
+    updated: int
+    available: int  # vehicles moved to 'available'
+    assigned: int  # vehicles moved to 'assigned' because they have an active trip
+
+# Customer columns a caller may ask for in allocation history responses
+CustomerField = Literal[
+    "name", "contact_person", "phone", "email", "factory_location", "city",
+    "state", "pincode", "contract_type", "contact_details"
+]
+
+class AllocationVehicle(BaseModel):
+    vehicle_id: int
+    vehicle_number: str
+    registration_number: str
+    vehicle_type: str
+    status: Optional[str] = None
+    daily_status: Optional[str] = None
+
+class AllocationTrip(BaseModel):
+    trip_allocation_id: int
+    load_tons: float
+    factory: str
+    trip_type: str
+    trip_date_time: datetime
+    transport_manager_name: str
+    entry_by_role: str
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class AllocationCustomer(BaseModel):
+    """Customer of an allocation; only the requested fields are set"""
+    customer_company_id: int
+    name: Optional[str] = None
+    contact_person: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    factory_location: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    pincode: Optional[str] = None
+    contract_type: Optional[str] = None
+    contact_details: Optional[str] = None
+
+class AllocationEntry(BaseModel):
+    allocation: AllocationTrip
+    customer: AllocationCustomer
+
+class VehicleRecentAllocation(BaseModel):
+    vehicle: AllocationVehicle
+    recent_allocation: Optional[AllocationTrip] = None
+    customer_details: Optional[AllocationCustomer] = None
+    message: Optional[str] = None  # only when the vehicle has no allocations
+
+class VehicleAllocationHistory(BaseModel):
+    vehicle: AllocationVehicle
+    allocations: List[AllocationEntry]
+    total_allocations: Optional[int] = None  # entries on this page
+    next_cursor: Optional[str] = None
+    message: Optional[str] = None  # only when the vehicle has no allocations
+
+
+# Validates and serializes a whole list in one pydantic-core call
+VehicleOutList = TypeAdapter(List[VehicleOut])
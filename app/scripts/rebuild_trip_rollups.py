@@ -0,0 +1,35 @@
+# scripts/rebuild_trip_rollups.py
+"""
+Backfill or repair trip_rollup_daily from trip_allocation.
+
+    python -m app.scripts.rebuild_trip_rollups [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+
+The triggers from migration 0006 keep the rollup current; run this after
+loading history with the triggers disabled, or to rebuild a range of days.
+Writes to trip_allocation wait while it runs, so rebuild large histories
+a month or so at a time.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date
+
+from app.database import AsyncSessionLocal, async_engine
+from app.services.report_service import AsyncReportService
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        async with AsyncSessionLocal() as session:
+            rows = await AsyncReportService(session).rebuild_trip_rollups(args.date_from, args.date_to)
+        print(f"Rebuilt {rows} rollup rows")
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.scripts.rebuild_trip_rollups")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First trip day to rebuild")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last trip day to rebuild")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,169 @@
+# services/bulk_import.py
+import csv
+import logging
+from functools import lru_cache
+from typing import AsyncIterator, List, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.spreadsheet import Row
+from app.schemas.imports import ImportResult, ImportRowError
+
+logger = logging.getLogger(__name__)
+
+# Per-row errors kept in the response; further errors are only counted
+MAX_IMPORT_ERRORS = 1000
+
+
+def _record_error(result: ImportResult, row: int, error: str) -> None:
+    result.failed += 1
+    if len(result.errors) < MAX_IMPORT_ERRORS:
+        result.errors.append(ImportRowError(row=row, error=error))
+    else:
+        result.errors_truncated = True
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def _present(data: dict) -> dict:
+    """Drop blank cells so the schema defaults apply instead of an explicit None"""
+    return {key: value for key, value in data.items() if value is not None}
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def _validate_rows(schema: Type[BaseModel], rows: List[Row], result: ImportResult) -> List[Tuple[int, dict]]:
+    """
+    Validate a batch of rows, returning (row number, values) of the valid ones.
+
+    The whole batch is validated in one pydantic-core call; only a batch
+    that contains an invalid row is validated again row by row, to report
+    the errors and keep the valid rows. Blank cells count as missing, and
+    only the fields present in the row are returned, so schema defaults
+    never overwrite stored values on update.
+    """
+    rows = [(row_number, _present(data)) for row_number, data in rows]
+    try:
+        models = _list_adapter(schema).validate_python([data for _, data in rows])
+        return [(row_number, model.model_dump(exclude_unset=True)) for (row_number, _), model in zip(rows, models)]
+    except ValidationError:
+        pass
+    valid = []
+    for row_number, data in rows:
+        try:
+            valid.append((row_number, schema(**data).model_dump(exclude_unset=True)))
+        except ValidationError as e:
+            _record_error(result, row_number, _format_validation_error(e))
+    return valid
+
+
+def _upsert_statement(model, key: str, rows: List[dict], on_conflict: str):
+    """INSERT ... ON CONFLICT (key) for `rows`, returning the key and whether the row is new"""
+    key_column = getattr(model, key)
+    stmt = pg_insert(model).values(rows)
+    if on_conflict == "update":
+        changes = {column: stmt.excluded[column] for column in rows[0] if column != key}
+        if hasattr(model, "updated_at"):
+            changes["updated_at"] = func.now()
+        return stmt.on_conflict_do_update(index_elements=[key_column], set_=changes).returning(
+            key_column, literal_column("xmax = 0").label("inserted")
+        )
+    return stmt.on_conflict_do_nothing(index_elements=[key_column]).returning(
+        key_column, literal_column("true").label("inserted")
+    )
+
+
+async def _write_batch(
+    db: AsyncSession,
+    model,
+    key: str,
+    batch: List[Tuple[int, dict]],
+    on_conflict: str,
+    result: ImportResult
+) -> None:
+    try:
+        returned = (await db.execute(
+            _upsert_statement(model, key, [values for _, values in batch], on_conflict)
+        )).all()
+        await db.commit()
+    except DBAPIError as e:
+        await db.rollback()
+        if len(batch) == 1:
+            _record_error(result, batch[0][0], str(e.orig).strip().splitlines()[0])
+            return
+        # One bad row fails the whole statement; retry row by row to find it
+        logger.info(f"Import batch failed, retrying {len(batch)} rows individually: {str(e.orig)}")
+        for item in batch:
+            await _write_batch(db, model, key, [item], on_conflict, result)
+        return
+
+    inserted = sum(1 for row in returned if row.inserted)
+    result.inserted += inserted
+    if on_conflict == "update":
+        result.updated += len(returned) - inserted
+    else:
+        result.skipped += len(batch) - len(returned)
+
+
+async def import_rows(
+    db: AsyncSession,
+    batches: AsyncIterator[List[Row]],
+    schema: Type[BaseModel],
+    model,
+    key: str,
+    on_conflict: str = "skip"
+) -> ImportResult:
+    """
+    Validate and upsert uploaded rows into `model`, one multi-row statement per batch.
+
+    Each row is validated with `schema`; invalid rows are reported and the
+    rest of the batch is written with INSERT ... ON CONFLICT (`key`) DO
+    NOTHING (on_conflict=skip) or DO UPDATE (on_conflict=update) and
+    committed, so memory stays bounded by the batch size whatever the file
+    size. A key repeated within a batch is skipped after its first row.
+    Blank cells get the column default on insert and leave the stored value
+    alone on update; rows with different blank columns go in separate
+    statements.
+    """
+    result = ImportResult()
+    last_row = 1
+    try:
+        async for rows in batches:
+            if not rows:
+                continue
+            last_row = rows[-1][0]
+            result.processed += len(rows)
+            batch = {}
+            for row_number, values in _validate_rows(schema, rows, result):
+                if values[key] in batch:
+                    result.skipped += 1
+                    continue
+                batch[values[key]] = (row_number, values)
+            # One statement per column set: a multi-row VALUES needs the same
+            # columns in every row, and a missing cell must not become a value
+            groups = {}
+            for item in batch.values():
+                groups.setdefault(tuple(sorted(item[1])), []).append(item)
+            for group in groups.values():
+                await _write_batch(db, model, key, group, on_conflict, result)
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Rows before the unreadable part are already committed
+        _record_error(result, last_row + 1, f"Could not read file: {str(e)}")
+
+    logger.info(
+        f"Imported {model.__tablename__}: {result.inserted} inserted, {result.updated} updated, "
+        f"{result.skipped} skipped, {result.failed} failed"
+    )
+    return result
@@ -1,24 +1,124 @@
 # services/customer_company_service.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, func, and_
+from sqlalchemy import select, insert, update, delete, or_, func, and_, literal, text
 from sqlalchemy.exc import IntegrityError
+from app.core.cache import company_cache, restore, snapshot
+from app.core.pagination import InvalidCursor, keyset_after, split_page
+from app.core.spreadsheet import iter_batches
 from app.models.customer_company import CustomerCompany
 from app.schemas.customer_company import (
     CustomerCompanyCreate, 
     CustomerCompanyUpdate, 
-    CustomerCompanyList,
     CustomerCompany as CustomerCompanySchema
 )
-from typing import List, Optional
-from fastapi import HTTPException
+from app.schemas.imports import ImportResult
+from app.services.bulk_import import import_rows
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, UploadFile
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Columns matched by the free-text company search, with their relevance weight
+SEARCH_FIELDS = ["name", "contact_person", "factory_location", "phone", "email"]
+SEARCH_WEIGHTS = {"name": 1.0, "contact_person": 0.6, "factory_location": 0.6, "phone": 0.4, "email": 0.4}
+
+# Upper bound for the COUNT behind count=estimated on filtered lists
+COUNT_ESTIMATE_CAP = 10000
+
+# Whether pg_trgm is installed in the connected database: None until a search
+# checked, True for good; a False is rechecked after TRIGRAM_RECHECK_SECONDS so
+# installing the extension takes effect without a restart
+_trigram_available: Optional[bool] = None
+_trigram_checked_at = 0.0
+TRIGRAM_RECHECK_SECONDS = 300
+
 class AsyncCustomerCompanyService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def _has_trigram(self) -> bool:
+        """Whether the pg_trgm extension is installed (cached, see _trigram_available)"""
+        global _trigram_available, _trigram_checked_at
+        if _trigram_available or (
+            _trigram_available is False
+            and time.monotonic() - _trigram_checked_at < TRIGRAM_RECHECK_SECONDS
+        ):
+            return _trigram_available
+        try:
+            # In a savepoint, so a failure leaves the request's transaction usable
+            async with self.db.begin_nested():
+                result = await self.db.execute(
+                    text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                )
+        except Exception as e:
+            # Not cached: the next search checks again
+            logger.warning(f"Could not detect pg_trgm, using ILIKE search: {str(e)}")
+            return False
+        _trigram_available = result.scalar() is not None
+        _trigram_checked_at = time.monotonic()
+        return _trigram_available
+
+    async def _search_clause(self, term: str, fields: List[str]):
+        """
+        Build the search filter and relevance rank for `term` over `fields`.
+
+        With pg_trgm the ILIKE predicates are served by the GIN trigram indexes
+        from migration 0002, the `<%` operator adds typo-tolerant matches on the
+        name and rows are ranked by word similarity (name weighted highest).
+        Without it this falls back to plain ILIKE and the rank is None.
+        """
+        pattern = f"%{term}%"
+        columns = [getattr(CustomerCompany, field) for field in fields]
+        conditions = [column.ilike(pattern) for column in columns]
+        if not await self._has_trigram():
+            return or_(*conditions), None
+
+        conditions.append(literal(term).op("<%")(CustomerCompany.name))
+        ranks = [
+            func.word_similarity(term, column) * SEARCH_WEIGHTS.get(field, 1.0)
+            for field, column in zip(fields, columns)
+        ]
+        rank = func.coalesce(func.greatest(*ranks), 0.0) if len(ranks) > 1 else ranks[0]
+        return or_(*conditions), rank
+
+    async def _count_companies(self, filters: list, count: str) -> Tuple[Optional[int], str]:
+        """
+        Compute the list total for `filters` according to `count`.
+
+        - exact: full COUNT(*) over the filtered rows
+        - estimated: planner statistics (pg_class.reltuples) when unfiltered,
+          otherwise a COUNT capped at COUNT_ESTIMATE_CAP rows; a capped result
+          is reported as estimated and is a lower bound
+        - none: skip the count entirely
+        """
+        if count == "none":
+            return None, "none"
+
+        if count == "estimated":
+            if not filters:
+                result = await self.db.execute(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'customer_company'::regclass")
+                )
+                estimate = result.scalar()
+                # reltuples is -1 (or 0 on old servers) until the table is first analyzed
+                if estimate and estimate > 0:
+                    return int(estimate), "estimated"
+            capped = select(CustomerCompany.customer_company_id)
+            if filters:
+                capped = capped.where(and_(*filters))
+            capped = capped.limit(COUNT_ESTIMATE_CAP).subquery()
+            result = await self.db.execute(select(func.count()).select_from(capped))
+            total = result.scalar()
+            return total, "estimated" if total >= COUNT_ESTIMATE_CAP else "exact"
+
+        count_query = select(func.count(CustomerCompany.customer_company_id))
+        if filters:
+            count_query = count_query.where(and_(*filters))
+        result = await self.db.execute(count_query)
+        return result.scalar(), "exact"
+
     async def get_companies(
         self,
         skip: int = 0,
@@ -26,24 +126,27 @@ class AsyncCustomerCompanyService:
         search: Optional[str] = None,
         city: Optional[str] = None,
         state: Optional[str] = None,
-        contract_type: Optional[str] = None
-    ) -> CustomerCompanyList:
-        """Get companies with pagination and filtering"""
+        contract_type: Optional[str] = None,
+        after: Optional[str] = None,
+        count: str = "exact"
+    ) -> dict:
+        """
+        Get companies with offset or `after` cursor pagination and filtering.
+
+        Searches are ordered by relevance when pg_trgm is available,
+        otherwise (and without a search) by name. `count` selects how the
+        total is computed, see `_count_companies`.
+
+        Returns a plain dict in the shape of CustomerCompanyList: only the
+        response columns are selected and passed on as-is, so the router can
+        serialize them without building and validating a model per row.
+        """
         try:
-            query = select(CustomerCompany)
-            count_query = select(func.count(CustomerCompany.customer_company_id))
-            
             filters = []
+            rank = None
             
-            if search:
-                search_filter = f"%{search.strip()}%"
-                search_conditions = or_(
-                    CustomerCompany.name.ilike(search_filter),
-                    CustomerCompany.contact_person.ilike(search_filter),
-                    CustomerCompany.factory_location.ilike(search_filter),
-                    CustomerCompany.phone.ilike(search_filter),
-                    CustomerCompany.email.ilike(search_filter)
-                )
+            if search and search.strip():
+                search_conditions, rank = await self._search_clause(search.strip(), SEARCH_FIELDS)
                 filters.append(search_conditions)
             
             if city:
@@ -55,99 +158,125 @@ class AsyncCustomerCompanyService:
             if contract_type:
                 filters.append(CustomerCompany.contract_type == contract_type)
             
-            if filters:
-                filter_condition = and_(*filters)
-                query = query.where(filter_condition)
-                count_query = count_query.where(filter_condition)
-            
-            count_result = await self.db.execute(count_query)
-            total = count_result.scalar()
+            total, total_type = await self._count_companies(filters, count)
             
-            query = query.offset(skip).limit(limit).order_by(CustomerCompany.name)
+            sort_key = [CustomerCompany.name, CustomerCompany.customer_company_id]
+            if rank is not None:
+                sort_key.insert(0, -rank)
+            labels = [f"sort_{i}" for i in range(len(sort_key))]
+            fields = list(CustomerCompanySchema.model_fields)
+            query = select(
+                *[getattr(CustomerCompany, name) for name in fields],
+                *[column.label(label) for column, label in zip(sort_key, labels)]
+            )
+            if filters:
+                query = query.where(and_(*filters))
+            if after:
+                query = query.where(keyset_after(sort_key, after))
+            else:
+                query = query.offset(skip)
+            query = query.order_by(*sort_key).limit(limit + 1)
             result = await self.db.execute(query)
-            companies = result.scalars().all()
+            rows, next_cursor = split_page(result.all(), limit, *labels)
             
-            return CustomerCompanyList(
-                companies=companies,
-                total=total,
-                skip=skip,
-                limit=limit
-            )
+            return {
+                "companies": [{name: row._mapping[name] for name in fields} for row in rows],
+                "total": total,
+                "total_type": total_type,
+                "skip": skip,
+                "limit": limit,
+                "next_cursor": next_cursor,
+            }
             
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.error(f"Error getting companies: {str(e)}")
             raise HTTPException(status_code=500, detail="Error retrieving companies")
 
     async def get_company(self, company_id: int) -> Optional[CustomerCompany]:
-        """Get a single company by ID"""
+        """Get a single company by ID, from the lookup cache when fresh"""
+        cached = company_cache.get(company_id)
+        if cached is not None:
+            return restore(CustomerCompany, cached)
         try:
             query = select(CustomerCompany).where(CustomerCompany.customer_company_id == company_id)
             result = await self.db.execute(query)
-            return result.scalar_one_or_none()
+            company = result.scalar_one_or_none()
+            if company:
+                company_cache.set(company_id, snapshot(company))
+            return company
         except Exception as e:
             logger.error(f"Error getting company {company_id}: {str(e)}")
             raise HTTPException(status_code=500, detail="Error retrieving company")
 
     async def create_company(self, company: CustomerCompanyCreate) -> CustomerCompany:
-        """Create a new company"""
+        """Create a new company with INSERT ... RETURNING"""
         try:
-            existing = await self.get_company_by_name(company.name)
-            if existing:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Company with name '{company.name}' already exists"
-                )
-            
-            db_company = CustomerCompany(**company.dict())  # Changed from dict()
-            self.db.add(db_company)
+            # Duplicate names are rejected by the unique index, no pre-check query
+            query = insert(CustomerCompany).values(**company.model_dump()).returning(CustomerCompany)
+            result = await self.db.execute(query)
+            db_company = result.scalar_one()
             await self.db.commit()
-            await self.db.refresh(db_company)
             
             logger.info(f"Created company: {db_company.name} (ID: {db_company.customer_company_id})")
             return db_company
             
-        except HTTPException:
-            raise
         except IntegrityError as e:
             await self.db.rollback()
             logger.error(f"Integrity error creating company: {str(e)}")
-            raise HTTPException(status_code=400, detail="Company with this information already exists")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Company with name '{company.name}' already exists"
+            )
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error creating company: {str(e)}")
             raise HTTPException(status_code=500, detail="Error creating company")
 
+    async def import_companies(self, upload: UploadFile, on_conflict: str = "skip") -> ImportResult:
+        """Stream a CSV/XLSX of companies into the table, upserting on name"""
+        try:
+            return await import_rows(
+                self.db, iter_batches(upload), CustomerCompanyCreate, CustomerCompany, "name", on_conflict
+            )
+        finally:
+            company_cache.clear()
+
     async def update_company(
         self,
         company_id: int,
         company: CustomerCompanyUpdate
         ) -> Optional[CustomerCompany]:
-        """Update an existing company"""
+        """Update an existing company with UPDATE ... RETURNING"""
+        update_data = company.model_dump(exclude_unset=True)
+        if not update_data:
+            return await self.get_company(company_id)
         try:
-            db_company = await self.get_company(company_id)
+            query = (
+                update(CustomerCompany)
+                .where(CustomerCompany.customer_company_id == company_id)
+                .values(**update_data)
+                .returning(CustomerCompany)
+            )
+            result = await self.db.execute(query)
+            db_company = result.scalar_one_or_none()
             if not db_company:
+                await self.db.rollback()
                 return None
-            
-            if company.name and company.name != db_company.name:
-                existing = await self.get_company_by_name(company.name)
-                if existing and existing.customer_company_id != company_id:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Company with name '{company.name}' already exists"
-                    )
-            
-            update_data = company.dict(exclude_unset=True)  # Changed from dict()
-            for field, value in update_data.items():
-                setattr(db_company, field, value)
-            
             await self.db.commit()
-            await self.db.refresh(db_company)
+            company_cache.invalidate(company_id)
             
             logger.info(f"Updated company: {db_company.name} (ID: {db_company.customer_company_id})")
             return db_company
             
-        except HTTPException:
-            raise
+        except IntegrityError as e:
+            await self.db.rollback()
+            logger.error(f"Integrity error updating company {company_id}: {str(e)}")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Company with name '{company.name}' already exists"
+            )
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error updating company {company_id}: {str(e)}")
@@ -156,14 +285,19 @@ class AsyncCustomerCompanyService:
     async def delete_company(self, company_id: int) -> bool:
         """Delete a company"""
         try:
-            db_company = await self.get_company(company_id)
-            if not db_company:
-                return False
-            
-            await self.db.delete(db_company)
+            query = (
+                delete(CustomerCompany)
+                .where(CustomerCompany.customer_company_id == company_id)
+                .returning(CustomerCompany.name)
+            )
+            result = await self.db.execute(query)
+            name = result.scalar_one_or_none()
             await self.db.commit()
+            company_cache.invalidate(company_id)
+            if name is None:
+                return False
             
-            logger.info(f"Deleted company: {db_company.name} (ID: {company_id})")
+            logger.info(f"Deleted company: {name} (ID: {company_id})")
             return True
             
         except Exception as e:
@@ -182,11 +316,13 @@ class AsyncCustomerCompanyService:
             raise HTTPException(status_code=500, detail="Error retrieving company")
 
     async def search_companies_by_name(self, name: str, limit: int = 10) -> List[CustomerCompany]:
-        """Search companies by name (partial match)"""
+        """Search companies by name (partial or fuzzy match), best matches first"""
         try:
-            query = select(CustomerCompany).where(
-                CustomerCompany.name.ilike(f"%{name}%")
-            ).limit(limit).order_by(CustomerCompany.name)
+            condition, rank = await self._search_clause(name.strip(), ["name"])
+            order = [CustomerCompany.name, CustomerCompany.customer_company_id]
+            if rank is not None:
+                order.insert(0, rank.desc())
+            query = select(CustomerCompany).where(condition).order_by(*order).limit(limit)
             result = await self.db.execute(query)
             return result.scalars().all()
         except Exception as e:
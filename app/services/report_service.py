@@ -0,0 +1,117 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Date, cast, delete, func, insert, select, text
+from sqlalchemy.exc import ProgrammingError
+from datetime import date, timedelta
+from typing import List, Literal, Optional
+from fastapi import HTTPException
+import logging
+
+from app.models.trip_allocation import Trip_Allocation
+from app.models.trip_rollup import trip_rollup_daily
+
+logger = logging.getLogger(__name__)
+
+Period = Literal["day", "month"]
+GroupBy = Literal["company", "vehicle"]
+
+class AsyncReportService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_trip_totals(
+        self,
+        group_by: GroupBy,
+        period: Period = "day",
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        company_id: Optional[int] = None,
+        vehicle_id: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Trip count and tonnage per company or vehicle and per day or month.
+
+        Reads only trip_rollup_daily; `date_from` and `date_to` are inclusive
+        trip days. Cancelled trips are not counted.
+        """
+        rollup = trip_rollup_daily.c
+        key = rollup.customer_company_id if group_by == "company" else rollup.vehicle_id
+        bucket = rollup.day if period == "day" else cast(func.date_trunc("month", rollup.day), Date)
+
+        query = select(
+            bucket.label("period"),
+            key,
+            func.sum(rollup.trip_count).label("trip_count"),
+            func.sum(rollup.load_tons).label("load_tons")
+        )
+        if date_from:
+            query = query.where(rollup.day >= date_from)
+        if date_to:
+            query = query.where(rollup.day <= date_to)
+        if company_id:
+            query = query.where(rollup.customer_company_id == company_id)
+        if vehicle_id:
+            query = query.where(rollup.vehicle_id == vehicle_id)
+        query = query.group_by(bucket, key).order_by(bucket, key)
+
+        try:
+            result = await self.db.execute(query)
+            return [dict(row._mapping) for row in result]
+        except ProgrammingError as e:
+            logger.error(f"Trip rollups unavailable: {str(e)}")
+            raise HTTPException(
+                status_code=503,
+                detail="Trip rollups are not installed; run `python -m app.migrations upgrade`"
+            )
+        except Exception as e:
+            logger.error(f"Error getting trip totals: {str(e)}")
+            raise HTTPException(status_code=500, detail="Error retrieving trip totals")
+
+    async def rebuild_trip_rollups(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> int:
+        """
+        Recompute trip_rollup_daily from trip_allocation for the given trip days
+        (inclusive; all days when omitted) and return the number of rollup rows.
+
+        Holds a SHARE lock on trip_allocation until commit so trips written
+        meanwhile cannot be counted twice or missed; reads are not blocked.
+        """
+        trip_day = cast(Trip_Allocation.trip_date_time, Date)
+        rollup = trip_rollup_daily.c
+        clear = delete(trip_rollup_daily)
+        source = (
+            select(
+                trip_day,
+                Trip_Allocation.customer_company_id,
+                Trip_Allocation.vehicle_id,
+                func.count(),
+                func.sum(Trip_Allocation.load_tons)
+            )
+            .where(Trip_Allocation.status.is_distinct_from("cancelled"))
+            .group_by(trip_day, Trip_Allocation.customer_company_id, Trip_Allocation.vehicle_id)
+        )
+        if date_from:
+            clear = clear.where(rollup.day >= date_from)
+            source = source.where(Trip_Allocation.trip_date_time >= date_from)
+        if date_to:
+            clear = clear.where(rollup.day <= date_to)
+            source = source.where(Trip_Allocation.trip_date_time < date_to + timedelta(days=1))
+
+        try:
+            await self.db.execute(text("LOCK TABLE trip_allocation IN SHARE MODE"))
+            await self.db.execute(clear)
+            result = await self.db.execute(
+                insert(trip_rollup_daily).from_select(
+                    ["day", "customer_company_id", "vehicle_id", "trip_count", "load_tons"],
+                    source
+                )
+            )
+            await self.db.commit()
+            logger.info(f"Rebuilt {result.rowcount} trip rollup rows")
+            return result.rowcount
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error rebuilding trip rollups: {str(e)}")
+            raise
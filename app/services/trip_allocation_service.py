@@ -1,15 +1,32 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
-from typing import List, Optional
+from sqlalchemy import Select, select, delete, insert, update, literal, text, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List, Optional, Tuple
 from fastapi import HTTPException
 import logging
 
-from app.models.trip_allocation import Trip_Allocation
+from app.core.pagination import InvalidCursor, keyset_after, split_page
+
+from app.core.cache import snapshot, vehicle_cache
+from app.core.fleet_index import fleet_index
+from app.core.metrics import TRIPS_CREATED, TRIP_VALIDATION_FAILURES
+from app.models.trip_allocation import Trip_Allocation, ACTIVE_TRIP_PREDICATE, ACTIVE_TRIP_STATUSES, statuses_leading_to
 from app.models.vehicle import Vehicle
 from app.models.customer_company import CustomerCompany
+from app.services.customer_company_service import AsyncCustomerCompanyService
 from app.schemas.trip_allocation import (
     TripAllocationCreate,
-    TripAllocationUpdate
+    TripAllocationOut,
+    TripAllocationUpdate,
+    TripAllocationBulkCreate,
+    TripAllocationBulkItemResult,
+    TripAllocationBulkResult,
+    TripStatusTransition,
+    TripStatusTransitionResult
 )
 
 logger = logging.getLogger(__name__)
@@ -25,6 +42,7 @@ class AsyncTripAllocationService:
         vehicle = result.scalar_one_or_none()
         
         if not vehicle:
+            TRIP_VALIDATION_FAILURES.labels("vehicle_not_found").inc()
             raise HTTPException(
                 status_code=404, 
                 detail=f"Vehicle with ID {vehicle_id} not found"
@@ -32,60 +50,83 @@ class AsyncTripAllocationService:
         return vehicle
 
     async def _validate_company_exists(self, company_id: int) -> CustomerCompany:
-        """Validate that customer company exists and return it"""
-        query = select(CustomerCompany).where(CustomerCompany.customer_company_id == company_id)
-        result = await self.db.execute(query)
-        company = result.scalar_one_or_none()
+        """Validate that customer company exists and return it (through the company lookup cache)"""
+        company = await AsyncCustomerCompanyService(self.db).get_company(company_id)
         
         if not company:
+            TRIP_VALIDATION_FAILURES.labels("company_not_found").inc()
             raise HTTPException(
                 status_code=404, 
                 detail=f"Customer Company with ID {company_id} not found"
             )
         return company
 
-    async def _validate_vehicle_availability(self, vehicle_id: int, exclude_trip_id: Optional[int] = None) -> None:
-        """Check if vehicle is available for allocation"""
-        vehicle = await self._validate_vehicle_exists(vehicle_id)
-        
+    @staticmethod
+    def _vehicle_status_error(vehicle) -> Optional[str]:
+        """Return why the vehicle cannot take a trip today (and count the failure), or None if it can"""
         # Check if vehicle is active
         if vehicle.status != "active":
-            raise HTTPException(
-                status_code=400,
-                detail=f"Vehicle {vehicle.vehicle_number} is not active (status: {vehicle.status})"
-            )
+            TRIP_VALIDATION_FAILURES.labels("vehicle_inactive").inc()
+            return f"Vehicle {vehicle.vehicle_number} is not active (status: {vehicle.status})"
         
         # Check if vehicle is available today
         if vehicle.daily_status not in ["available", "in_line"]:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Vehicle {vehicle.vehicle_number} is not available (daily status: {vehicle.daily_status})"
-            )
+            TRIP_VALIDATION_FAILURES.labels("vehicle_unavailable").inc()
+            return f"Vehicle {vehicle.vehicle_number} is not available (daily status: {vehicle.daily_status})"
+        return None
+
+    async def _validate_vehicle_availability(self, vehicle_id: int, exclude_trip_id: Optional[int] = None) -> None:
+        """Check if vehicle is available for allocation"""
+        vehicle = await self._validate_vehicle_exists(vehicle_id)
+        
+        error = self._vehicle_status_error(vehicle)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
         
         # Check for existing active trip allocations
         query = select(Trip_Allocation).where(
             Trip_Allocation.vehicle_id == vehicle_id,
-            Trip_Allocation.status.in_(["pending", "in_progress", "allocated"])
+            Trip_Allocation.status.in_(ACTIVE_TRIP_STATUSES)
         )
         
         if exclude_trip_id:
             query = query.where(Trip_Allocation.trip_allocation_id != exclude_trip_id)
         
-        result = await self.db.execute(query)
+        result = await self.db.execute(query.limit(1))
         existing_trip = result.scalar_one_or_none()
         
         if existing_trip:
+            TRIP_VALIDATION_FAILURES.labels("vehicle_busy").inc()
             raise HTTPException(
                 status_code=400,
                 detail=f"Vehicle {vehicle.vehicle_number} is already allocated to another active trip"
             )
 
-    async def get_trips(self, skip: int = 0, limit: int = 100) -> List[Trip_Allocation]:
-        """Get all trips with pagination"""
+    async def get_trips(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None
+    ) -> Tuple[List[Row], Optional[str]]:
+        """
+        Get trips ordered by ID, paged by offset or by an `after` cursor.
+
+        Returns column rows named like TripAllocationOut rather than ORM
+        instances, ready for rows_response.
+        """
         try:
-            query = select(Trip_Allocation).offset(skip).limit(limit)
-            result = await self.db.execute(query)
-            return list(result.scalars().all())
+            query = (
+                select(*[getattr(Trip_Allocation, name) for name in TripAllocationOut.model_fields])
+                .order_by(Trip_Allocation.trip_allocation_id)
+            )
+            if after:
+                query = query.where(keyset_after([Trip_Allocation.trip_allocation_id], after))
+            else:
+                query = query.offset(skip)
+            result = await self.db.execute(query.limit(limit + 1))
+            return split_page(result.all(), limit, "trip_allocation_id")
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.error(f"Error getting trips: {str(e)}")
             raise HTTPException(status_code=500, detail="Error retrieving trips")
@@ -100,24 +141,130 @@ class AsyncTripAllocationService:
             logger.error(f"Error getting trip {trip_id}: {str(e)}")
             raise HTTPException(status_code=500, detail="Error retrieving trip")
 
+    @staticmethod
+    def export_query(
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        company_id: Optional[int] = None,
+        statuses: Optional[List[str]] = None
+    ) -> Select:
+        """
+        Column-only query behind the trip export, ordered by trip date.
+
+        `date_from` is inclusive and `date_to` exclusive, both on trip_date_time.
+        Selecting plain columns skips ORM identity-map bookkeeping per row.
+        Without a company the order is served by ix_trip_allocation_trip_date_id,
+        so rows stream from the first one instead of after a full sort.
+        """
+        query = select(*Trip_Allocation.__table__.columns)
+        # trip_date_time is stored naive, like the schemas' NaiveDatetime
+        if date_from:
+            query = query.where(Trip_Allocation.trip_date_time >= date_from.replace(tzinfo=None))
+        if date_to:
+            query = query.where(Trip_Allocation.trip_date_time < date_to.replace(tzinfo=None))
+        if company_id:
+            query = query.where(Trip_Allocation.customer_company_id == company_id)
+        if statuses:
+            query = query.where(Trip_Allocation.status.in_(statuses))
+        return query.order_by(Trip_Allocation.trip_date_time, Trip_Allocation.trip_allocation_id)
+
+    def _create_trip_statement(self, trip_data: dict):
+        """
+        Build the single statement behind create_trip.
+
+        Looks up the vehicle and company in CTEs, inserts the trip only when
+        the vehicle is active and available today and the company exists,
+        and lets the partial unique index on active trips reject a busy
+        vehicle (ON CONFLICT DO NOTHING), so concurrent dispatches cannot
+        both succeed. One row always comes back: the inserted trip columns
+        (NULL when nothing was inserted) plus the vehicle and company lookups
+        needed to explain why.
+        """
+        table = Trip_Allocation.__table__
+        vehicle = (
+            select(Vehicle.vehicle_number, Vehicle.status, Vehicle.daily_status)
+            .where(Vehicle.vehicle_id == trip_data['vehicle_id'])
+            .cte("v")
+        )
+        company = (
+            select(CustomerCompany.customer_company_id)
+            .where(CustomerCompany.customer_company_id == trip_data['customer_company_id'])
+            .cte("c")
+        )
+        source = (
+            select(*[literal(value, table.c[column].type).label(column) for column, value in trip_data.items()])
+            .select_from(vehicle.join(company, true()))
+            .where(
+                vehicle.c.status == "active",
+                vehicle.c.daily_status.in_(["available", "in_line"])
+            )
+        )
+        inserted = (
+            pg_insert(table)
+            .from_select(list(trip_data), source)
+            .on_conflict_do_nothing(
+                index_elements=[table.c.vehicle_id],
+                index_where=text(ACTIVE_TRIP_PREDICATE)
+            )
+            .returning(*table.c)
+            .cte("ins")
+        )
+        anchor = select(literal(1).label("one")).subquery("anchor")
+        return select(
+            *inserted.c,
+            vehicle.c.vehicle_number.label("vehicle_number"),
+            vehicle.c.status.label("vehicle_status"),
+            vehicle.c.daily_status.label("vehicle_daily_status"),
+            company.c.customer_company_id.label("company_found")
+        ).select_from(
+            anchor
+            .outerjoin(vehicle, true())
+            .outerjoin(company, true())
+            .outerjoin(inserted, true())
+        )
+
     async def create_trip(self, trip: TripAllocationCreate) -> Trip_Allocation:
-        """Create a new trip allocation with validation"""
+        """Create a new trip allocation, validated and inserted in one statement"""
         try:
-            # Validate vehicle exists and is available
-            await self._validate_vehicle_availability(trip.vehicle_id)
-            
-            # Validate customer company exists (using correct field name)
-            await self._validate_company_exists(trip.company_id)
-            
             # Create the trip with corrected field mapping
-            trip_data = trip.dict()
+            trip_data = trip.model_dump()
             # Map company_id to customer_company_id for the database model
             trip_data['customer_company_id'] = trip_data.pop('company_id')
+            trip_data['status'] = "pending"
+            
+            result = await self.db.execute(self._create_trip_statement(trip_data))
+            row = result.one()
+            
+            if row.trip_allocation_id is None:
+                # Nothing inserted; report the first failed condition, in validation order
+                if row.vehicle_number is None:
+                    TRIP_VALIDATION_FAILURES.labels("vehicle_not_found").inc()
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"Vehicle with ID {trip.vehicle_id} not found"
+                    )
+                error = self._vehicle_status_error(SimpleNamespace(
+                    vehicle_number=row.vehicle_number,
+                    status=row.vehicle_status,
+                    daily_status=row.vehicle_daily_status
+                ))
+                if error:
+                    raise HTTPException(status_code=400, detail=error)
+                if row.company_found is None:
+                    TRIP_VALIDATION_FAILURES.labels("company_not_found").inc()
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"Customer Company with ID {trip.company_id} not found"
+                    )
+                TRIP_VALIDATION_FAILURES.labels("vehicle_busy").inc()
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Vehicle {row.vehicle_number} is already allocated to another active trip"
+                )
             
-            db_trip = Trip_Allocation(**trip_data)
-            self.db.add(db_trip)
             await self.db.commit()
-            await self.db.refresh(db_trip)
+            TRIPS_CREATED.labels("single").inc()
+            db_trip = Trip_Allocation(**{column: row._mapping[column] for column in Trip_Allocation.__table__.c.keys()})
             
             logger.info(f"Created trip allocation: ID {db_trip.trip_allocation_id}")
             return db_trip
@@ -130,16 +277,158 @@ class AsyncTripAllocationService:
             logger.error(f"Error creating trip: {str(e)}")
             raise HTTPException(status_code=500, detail="Error creating trip allocation")
 
-    async def update_trip(self, trip_id: int, trip: TripAllocationUpdate) -> Optional[Trip_Allocation]:
-        """Update an existing trip allocation with validation"""
+    async def create_trips_bulk(self, bulk: TripAllocationBulkCreate) -> TripAllocationBulkResult:
+        """
+        Create many trips with set-based validation and one multi-row INSERT.
+
+        Vehicles, companies and active-trip conflicts for the whole batch are
+        loaded with three queries, each item is checked in memory (including
+        two items claiming the same vehicle), and the valid rows are inserted
+        with a single INSERT ... RETURNING in one transaction.
+
+        In all_or_nothing mode nothing is inserted if any item fails; the
+        valid items are then reported as skipped, and a vehicle allocated
+        concurrently after validation fails the whole batch (409). In
+        best_effort mode such a vehicle only fails its own item.
+        """
+        trips = bulk.trips
+        vehicle_ids = {trip.vehicle_id for trip in trips}
+        company_ids = {trip.company_id for trip in trips}
+
         try:
-            db_trip = await self.get_trip(trip_id)
-            if not db_trip:
-                return None
+            result = await self.db.execute(
+                select(Vehicle.vehicle_id, Vehicle.vehicle_number, Vehicle.status, Vehicle.daily_status)
+                .where(Vehicle.vehicle_id.in_(vehicle_ids))
+            )
+            vehicles = {row.vehicle_id: row for row in result.all()}
+
+            result = await self.db.execute(
+                select(CustomerCompany.customer_company_id)
+                .where(CustomerCompany.customer_company_id.in_(company_ids))
+            )
+            companies = set(result.scalars().all())
+
+            result = await self.db.execute(
+                select(Trip_Allocation.vehicle_id)
+                .where(
+                    Trip_Allocation.vehicle_id.in_(vehicle_ids),
+                    Trip_Allocation.status.in_(ACTIVE_TRIP_STATUSES)
+                )
+                .distinct()
+            )
+            busy = set(result.scalars().all())
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error validating bulk trips: {str(e)}")
+            raise HTTPException(status_code=500, detail="Error creating trip allocations")
+
+        results = []
+        rows = []
+        for index, trip in enumerate(trips):
+            vehicle = vehicles.get(trip.vehicle_id)
+            if vehicle is None:
+                TRIP_VALIDATION_FAILURES.labels("vehicle_not_found").inc()
+                error = f"Vehicle with ID {trip.vehicle_id} not found"
+            else:
+                error = self._vehicle_status_error(vehicle)
+                if not error and trip.vehicle_id in busy:
+                    TRIP_VALIDATION_FAILURES.labels("vehicle_busy").inc()
+                    error = f"Vehicle {vehicle.vehicle_number} is already allocated to another active trip"
+            if not error and trip.company_id not in companies:
+                TRIP_VALIDATION_FAILURES.labels("company_not_found").inc()
+                error = f"Customer Company with ID {trip.company_id} not found"
+
+            if error:
+                results.append(TripAllocationBulkItemResult(index=index, status="failed", error=error))
+                continue
+
+            # New trips are active, so later items may not reuse this vehicle
+            busy.add(trip.vehicle_id)
+            trip_data = trip.model_dump()
+            trip_data['customer_company_id'] = trip_data.pop('company_id')
+            rows.append((index, trip_data))
 
+        failed = len(results)
+        if failed and bulk.mode == "all_or_nothing":
+            results.extend(
+                TripAllocationBulkItemResult(
+                    index=index,
+                    status="skipped",
+                    error="Not created: other items in the batch failed validation"
+                )
+                for index, _ in rows
+            )
+            rows = []
+
+        created = {}
+        if rows:
+            statement = insert(Trip_Allocation)
+            if bulk.mode == "best_effort":
+                # A vehicle allocated concurrently since validation fails its own item, not the batch
+                statement = pg_insert(Trip_Allocation).on_conflict_do_nothing(
+                    index_elements=[Trip_Allocation.vehicle_id],
+                    index_where=text(ACTIVE_TRIP_PREDICATE)
+                )
+            try:
+                result = await self.db.execute(
+                    statement.returning(Trip_Allocation),
+                    [trip_data for _, trip_data in rows]
+                )
+                # Each vehicle appears at most once in the rows
+                created = {db_trip.vehicle_id: db_trip for db_trip in result.scalars().all()}
+                await self.db.commit()
+                TRIPS_CREATED.labels("bulk").inc(len(created))
+            except IntegrityError as e:
+                await self.db.rollback()
+                logger.warning(f"Conflict inserting bulk trips: {str(e)}")
+                raise HTTPException(
+                    status_code=409,
+                    detail="Trips were allocated concurrently for some of these vehicles; retry the batch"
+                )
+            except Exception as e:
+                await self.db.rollback()
+                logger.error(f"Error inserting bulk trips: {str(e)}")
+                raise HTTPException(status_code=500, detail="Error creating trip allocations")
+
+            for index, trip_data in rows:
+                db_trip = created.get(trip_data['vehicle_id'])
+                if db_trip is not None:
+                    results.append(TripAllocationBulkItemResult(index=index, status="created", trip=db_trip))
+                    continue
+                TRIP_VALIDATION_FAILURES.labels("vehicle_busy").inc()
+                vehicle_number = vehicles[trip_data['vehicle_id']].vehicle_number
+                results.append(TripAllocationBulkItemResult(
+                    index=index,
+                    status="failed",
+                    error=f"Vehicle {vehicle_number} is already allocated to another active trip"
+                ))
+                failed += 1
+            logger.info(f"Created {len(created)} trip allocations in bulk")
+
+        results.sort(key=lambda item: item.index)
+        return TripAllocationBulkResult(
+            mode=bulk.mode,
+            created=len(created),
+            failed=failed,
+            results=results
+        )
+
+    async def update_trip(self, trip_id: int, trip: TripAllocationUpdate) -> Optional[Trip_Allocation]:
+        """Update an existing trip allocation with validation, using UPDATE ... RETURNING"""
+        try:
             # Get update data
-            update_data = trip.dict(exclude_unset=True)
-            
+            update_data = trip.model_dump(exclude_unset=True)
+            if not update_data:
+                return await self.get_trip(trip_id)
+
+            # A missing trip is a 404 even when the new vehicle or company would not validate
+            if 'vehicle_id' in update_data or 'company_id' in update_data:
+                trip_exists = await self.db.scalar(
+                    select(literal(True)).where(Trip_Allocation.trip_allocation_id == trip_id)
+                )
+                if not trip_exists:
+                    return None
+
             # Validate vehicle if it's being updated
             if 'vehicle_id' in update_data:
                 await self._validate_vehicle_availability(
@@ -154,11 +443,35 @@ class AsyncTripAllocationService:
                 update_data['customer_company_id'] = update_data.pop('company_id')
             
             # Update only provided fields
-            for field, value in update_data.items():
-                setattr(db_trip, field, value)
+            query = (
+                update(Trip_Allocation)
+                .where(Trip_Allocation.trip_allocation_id == trip_id)
+                .values(**update_data)
+                .returning(Trip_Allocation)
+            )
+            # Guard the status change in the same statement so concurrent
+            # updates cannot skip a step of the state machine
+            if 'status' in update_data:
+                new_status = update_data['status']
+                query = query.where(
+                    Trip_Allocation.status.in_(statuses_leading_to(new_status) + (new_status,))
+                )
+            result = await self.db.execute(query)
+            db_trip = result.scalar_one_or_none()
+            if not db_trip:
+                await self.db.rollback()
+                if 'status' in update_data:
+                    current = await self.db.scalar(
+                        select(Trip_Allocation.status).where(Trip_Allocation.trip_allocation_id == trip_id)
+                    )
+                    if current is not None:
+                        raise HTTPException(
+                            status_code=409,
+                            detail=f"Trip {trip_id} cannot move from '{current}' to '{update_data['status']}'"
+                        )
+                return None
 
             await self.db.commit()
-            await self.db.refresh(db_trip)
             
             logger.info(f"Updated trip allocation: ID {trip_id}")
             return db_trip
@@ -166,11 +479,89 @@ class AsyncTripAllocationService:
         except HTTPException:
             await self.db.rollback()
             raise
+        except IntegrityError as e:
+            # Partial unique index: the vehicle gained another active trip concurrently
+            await self.db.rollback()
+            logger.warning(f"Conflict updating trip {trip_id}: {str(e)}")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Trip {trip_id} conflicts with another active trip for the same vehicle"
+            )
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error updating trip {trip_id}: {str(e)}")
             raise HTTPException(status_code=500, detail="Error updating trip allocation")
 
+    async def transition_trips(self, transition: TripStatusTransition) -> TripStatusTransitionResult:
+        """
+        Move all matching trips to `to_status` with one guarded UPDATE ... RETURNING.
+
+        Only trips whose current status may lead to `to_status` are touched;
+        `from_status` narrows that further. With `vehicle_daily_status`, the
+        vehicles of the moved trips get that daily_status in the same
+        transaction.
+        """
+        allowed = statuses_leading_to(transition.to_status)
+        if transition.from_status:
+            allowed = tuple(status for status in allowed if status in transition.from_status)
+        if not allowed:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No trip can move to '{transition.to_status}' from {transition.from_status or 'any status'}"
+            )
+
+        query = (
+            update(Trip_Allocation)
+            .where(Trip_Allocation.status.in_(allowed))
+            .values(status=transition.to_status)
+            .returning(Trip_Allocation.trip_allocation_id, Trip_Allocation.vehicle_id)
+            .execution_options(synchronize_session=False)
+        )
+        if transition.date_from:
+            query = query.where(Trip_Allocation.trip_date_time >= transition.date_from)
+        if transition.date_to:
+            query = query.where(Trip_Allocation.trip_date_time < transition.date_to + timedelta(days=1))
+        if transition.vehicle_ids:
+            query = query.where(Trip_Allocation.vehicle_id.in_(transition.vehicle_ids))
+        if transition.company_id:
+            query = query.where(Trip_Allocation.customer_company_id == transition.company_id)
+
+        try:
+            moved = (await self.db.execute(query)).all()
+            trip_ids = sorted(row.trip_allocation_id for row in moved)
+            vehicle_ids = sorted({row.vehicle_id for row in moved})
+
+            vehicles = []
+            if transition.vehicle_daily_status and vehicle_ids:
+                result = await self.db.execute(
+                    update(Vehicle)
+                    .where(
+                        Vehicle.vehicle_id.in_(vehicle_ids),
+                        Vehicle.daily_status.is_distinct_from(transition.vehicle_daily_status)
+                    )
+                    .values(daily_status=transition.vehicle_daily_status)
+                    .returning(Vehicle)
+                    .execution_options(synchronize_session=False)
+                )
+                vehicles = [snapshot(vehicle) for vehicle in result.scalars().all()]
+
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error moving trips to {transition.to_status}: {str(e)}")
+            raise HTTPException(status_code=500, detail="Error updating trip statuses")
+
+        if vehicles:
+            vehicle_cache.invalidate_many(vehicle["vehicle_id"] for vehicle in vehicles)
+            fleet_index.upsert_many(vehicles)
+        logger.info(f"Moved {len(trip_ids)} trips to {transition.to_status}")
+        return TripStatusTransitionResult(
+            to_status=transition.to_status,
+            updated=len(trip_ids),
+            trip_ids=trip_ids,
+            vehicles_updated=len(vehicles)
+        )
+
     async def delete_trip(self, trip_id: int) -> bool:
         """Delete a trip allocation"""
         try:
@@ -92,14 +92,64 @@
 
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, insert, update, delete, exists, case, func, and_, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload, joinedload
+from app.database import AsyncSessionLocal
+from app.core.cache import restore, snapshot, vehicle_cache, vehicle_number_cache
+from app.core.config import settings
+from app.core.etag import table_versions, versions_installed
+from app.core.fleet_index import fleet_index
+from app.core.pagination import keyset_after, split_page
+from app.core.spreadsheet import iter_batches
 from app.models.vehicle import Vehicle
-from app.models.trip_allocation import Trip_Allocation
+from app.models.trip_allocation import Trip_Allocation, ACTIVE_TRIP_STATUSES
 from app.models.customer_company import CustomerCompany
-from app.schemas.vehicle import VehicleCreate, VehicleUpdate
-from typing import List, Optional, Dict, Any
+from app.models.scheduled_job import ScheduledJobRun
+from app.schemas.vehicle import (
+    VehicleCreate,
+    VehicleUpdate,
+    AllocationCustomer,
+    AllocationEntry,
+    AllocationTrip,
+    AllocationVehicle,
+    CustomerField,
+    VehicleAllocationHistory,
+    VehicleRecentAllocation
+)
+from app.schemas.imports import ImportResult
+from app.services.bulk_import import import_rows
+from datetime import date, timedelta
+from fastapi import UploadFile
+from typing import List, Optional, Dict, Any, Sequence, Tuple, get_args
 import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Customer columns returned by the allocation history by default
+CUSTOMER_FIELDS = get_args(CustomerField)
+
+# scheduled_job_run row claimed by the daily rollover
+DAILY_ROLLOVER_JOB = "daily_status_rollover"
+
+
+async def run_daily_rollover() -> None:
+    """Scheduled job: reset the fleet's daily_status once per day (see rollover_daily_status)"""
+    async with AsyncSessionLocal() as session:
+        changed = await AsyncVehicleService(session).rollover_daily_status(day=date.today())
+    if changed is None:
+        logger.info("Daily status rollover skipped: already done today")
+    else:
+        logger.info(f"Daily status rollover done: {changed}")
+
+
+async def refresh_fleet_index() -> None:
+    """Scheduled job: reconcile this worker's fleet index with the vehicle table"""
+    async with AsyncSessionLocal() as session:
+        await AsyncVehicleService(session).reconcile_fleet_index()
+
 
 class AsyncVehicleService:
     def __init__(self, db: AsyncSession):
@@ -110,52 +160,106 @@ class AsyncVehicleService:
         skip: int = 0, 
         limit: int = 100, 
         status: Optional[str] = None, 
-        daily_status: Optional[str] = None
-    ) -> List[Vehicle]:
-        query = select(Vehicle)
+        daily_status: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> Tuple[List[Vehicle], Optional[str]]:
+        """Get vehicles ordered by ID, paged by offset or by an `after` cursor"""
+        query = select(Vehicle).order_by(Vehicle.vehicle_id)
 
         if status:
             query = query.where(Vehicle.status == status)
         if daily_status:
             query = query.where(Vehicle.daily_status == daily_status)
 
-        query = query.offset(skip).limit(limit)
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        if after:
+            query = query.where(keyset_after([Vehicle.vehicle_id], after))
+        else:
+            query = query.offset(skip)
+        result = await self.db.execute(query.limit(limit + 1))
+        return split_page(result.scalars().all(), limit, "vehicle_id")
     
     async def get_vehicle(self, vehicle_id: int) -> Optional[Vehicle]:
+        """Get a vehicle by ID; served from the lookup cache as a detached instance when fresh"""
+        cached = vehicle_cache.get(vehicle_id)
+        if cached is not None:
+            return restore(Vehicle, cached)
         query = select(Vehicle).where(Vehicle.vehicle_id == vehicle_id)
         result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+        vehicle = result.scalar_one_or_none()
+        if vehicle:
+            vehicle_cache.set(vehicle_id, snapshot(vehicle))
+        return vehicle
     
     async def get_vehicle_by_vehicle_number(self, vehicle_number: str) -> Optional[Vehicle]:
+        """Get a vehicle by number; served from the lookup cache as a detached instance when fresh"""
+        vehicle_id = vehicle_number_cache.get(vehicle_number)
+        if vehicle_id is not None:
+            cached = vehicle_cache.get(vehicle_id)
+            # The number may have been changed by an update since it was cached
+            if cached is not None and cached["vehicle_number"] == vehicle_number:
+                return restore(Vehicle, cached)
         query = select(Vehicle).where(Vehicle.vehicle_number == vehicle_number)
         result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+        vehicle = result.scalar_one_or_none()
+        if vehicle:
+            vehicle_cache.set(vehicle.vehicle_id, snapshot(vehicle))
+            vehicle_number_cache.set(vehicle_number, vehicle.vehicle_id)
+        return vehicle
     
     async def create_vehicle(self, vehicle: VehicleCreate) -> Vehicle:
-        db_vehicle = Vehicle(**vehicle.dict())
-        self.db.add(db_vehicle)
-        await self.db.commit()
-        await self.db.refresh(db_vehicle)
+        """Insert a vehicle with INSERT ... RETURNING; raises ValueError on a duplicate number"""
+        query = insert(Vehicle).values(**vehicle.model_dump()).returning(Vehicle)
+        try:
+            result = await self.db.execute(query)
+            db_vehicle = result.scalar_one()
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("Vehicle number already exists")
+        fleet_index.upsert(snapshot(db_vehicle))
         return db_vehicle
     
+    async def import_vehicles(self, upload: UploadFile, on_conflict: str = "skip") -> ImportResult:
+        """Stream a CSV/XLSX of vehicles into the table, upserting on vehicle_number"""
+        try:
+            return await import_rows(
+                self.db, iter_batches(upload), VehicleCreate, Vehicle, "vehicle_number", on_conflict
+            )
+        finally:
+            vehicle_cache.clear()
+            vehicle_number_cache.clear()
+            fleet_index.mark_stale()
+    
     async def update_vehicle(self, vehicle_id: int, vehicle: VehicleUpdate) -> Optional[Vehicle]:
-        db_vehicle = await self.get_vehicle(vehicle_id)
-        if not db_vehicle:
-            return None
+        """Apply the provided fields with UPDATE ... RETURNING; None if the vehicle does not exist"""
+        update_data = vehicle.model_dump(exclude_unset=True)
+        if not update_data:
+            return await self.get_vehicle(vehicle_id)
             
-        for field, value in vehicle.dict(exclude_unset=True).items():
-            setattr(db_vehicle, field, value)
-            
-        await self.db.commit()
-        await self.db.refresh(db_vehicle)
+        query = (
+            update(Vehicle)
+            .where(Vehicle.vehicle_id == vehicle_id)
+            .values(**update_data)
+            .returning(Vehicle)
+        )
+        try:
+            result = await self.db.execute(query)
+            db_vehicle = result.scalar_one_or_none()
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("Vehicle number already exists")
+        vehicle_cache.invalidate(vehicle_id)
+        if db_vehicle:
+            fleet_index.upsert(snapshot(db_vehicle))
         return db_vehicle
     
     async def delete_vehicle(self, vehicle_id: int) -> bool:
         query = delete(Vehicle).where(Vehicle.vehicle_id == vehicle_id)
         result = await self.db.execute(query)
         await self.db.commit()
+        vehicle_cache.invalidate(vehicle_id)
+        fleet_index.remove(vehicle_id)
         return result.rowcount > 0
     
     async def get_available_vehicles_today(self) -> List[Vehicle]:
@@ -167,13 +271,71 @@ class AsyncVehicleService:
         return result.scalars().all()
     
     async def bulk_update_daily_status(self, vehicle_ids: List[int], status: str) -> int:
+        """Set daily_status for a batch of vehicles in one UPDATE; returns rows changed"""
         query = update(Vehicle).where(
-            Vehicle.id.in_(vehicle_ids)
-        ).values(daily_status=status)
+            Vehicle.vehicle_id.in_(vehicle_ids),
+            Vehicle.daily_status.is_distinct_from(status)
+        ).values(daily_status=status).returning(Vehicle).execution_options(synchronize_session=False)
         
         result = await self.db.execute(query)
+        updated = [snapshot(vehicle) for vehicle in result.scalars().all()]
         await self.db.commit()
-        return result.rowcount
+        vehicle_cache.invalidate_many(vehicle_ids)
+        fleet_index.upsert_many(updated)
+        return len(updated)
+    
+    async def rollover_daily_status(self, day: Optional[date] = None) -> Optional[Dict[str, int]]:
+        """
+        Reset daily_status for the whole fleet in one UPDATE.
+
+        Vehicles with an active trip allocation become 'assigned', all others
+        'available'; rows already in the right state are left untouched.
+        Returns the number of vehicles moved into each status.
+
+        With `day`, the reset is the scheduled run for that day: it first
+        claims the day in scheduled_job_run, in the same transaction, and
+        returns None without changing anything when another worker already
+        ran it. Concurrent claims wait on the row lock, so exactly one runs.
+        """
+        if day is not None:
+            claim = (
+                pg_insert(ScheduledJobRun)
+                .values(job_name=DAILY_ROLLOVER_JOB, last_run_on=day)
+                .on_conflict_do_update(
+                    index_elements=[ScheduledJobRun.job_name],
+                    set_={"last_run_on": day, "ran_at": func.now()},
+                    where=ScheduledJobRun.last_run_on < day
+                )
+                .returning(ScheduledJobRun.job_name)
+            )
+            if (await self.db.execute(claim)).first() is None:
+                await self.db.rollback()
+                return None
+
+        has_active_trip = exists().where(
+            Trip_Allocation.vehicle_id == Vehicle.vehicle_id,
+            Trip_Allocation.status.in_(ACTIVE_TRIP_STATUSES)
+        )
+        target = case((has_active_trip, "assigned"), else_="available")
+        changed_rows = (
+            update(Vehicle)
+            .where(Vehicle.daily_status.is_distinct_from(target))
+            .values(daily_status=target)
+            .returning(Vehicle.daily_status)
+            .cte("changed")
+        )
+        # Only the per-status counts come back, not one row per vehicle
+        query = (
+            select(changed_rows.c.daily_status, func.count())
+            .group_by(changed_rows.c.daily_status)
+        )
+        result = await self.db.execute(query)
+        changed = {"available": 0, "assigned": 0}
+        changed.update({daily_status: count for daily_status, count in result.all()})
+        await self.db.commit()
+        vehicle_cache.clear()
+        fleet_index.mark_stale()
+        return changed
     
     async def get_vehicles_in_line(self) -> List[Vehicle]:
         query = select(Vehicle).where(
@@ -183,172 +345,171 @@ class AsyncVehicleService:
         result = await self.db.execute(query)
         return result.scalars().all()
     
-    # NEW METHOD: Get recently allocated customer details for a vehicle
+    async def reconcile_fleet_index(self) -> None:
+        """
+        Bring the in-memory fleet index up to date with the vehicle table.
+
+        Reads the vehicle change counter first and does nothing more while
+        it has not moved. Otherwise only the vehicles created or updated
+        since the previous reconciliation are read, plus a row count that
+        reveals vehicles deleted (or written) without notice; a mismatch
+        schedules a full reload. Full reloads happen at most once per
+        fleet_index_full_reload_seconds. Without counters (migration 0005)
+        the index is disabled and the endpoints read the database.
+        """
+        versions = await table_versions(self.db, "vehicle")
+        if versions is None:
+            if not versions_installed():
+                logger.warning("Fleet index disabled: table_version counters are not installed")
+                fleet_index.disable()
+            # Otherwise reading them failed; the index goes stale until a later round succeeds
+            return
+        version = versions["vehicle"]
+
+        if fleet_index.loaded_at is None:
+            if fleet_index.full_reload_due():
+                loaded_at = await self.db.scalar(select(func.now()))
+                result = await self.db.execute(select(Vehicle))
+                fleet_index.replace_all((snapshot(vehicle) for vehicle in result.scalars().all()), version, loaded_at)
+            return
+
+        if version == fleet_index.version:
+            fleet_index.touch()
+            return
+
+        loaded_at = await self.db.scalar(select(func.now()))
+        since = fleet_index.loaded_at - timedelta(seconds=settings.fleet_index_overlap_seconds)
+        result = await self.db.execute(
+            select(Vehicle).where(or_(Vehicle.updated_at >= since, Vehicle.created_at >= since))
+        )
+        fleet_index.apply_changes((snapshot(vehicle) for vehicle in result.scalars().all()), version, loaded_at)
+        total = await self.db.scalar(select(func.count()).select_from(Vehicle))
+        if total != len(fleet_index):
+            fleet_index.require_full_reload()
+    
+    async def _allocation_history(
+        self,
+        vehicle_number: str,
+        limit: int,
+        after: Optional[str] = None,
+        customer_fields: Optional[Sequence[str]] = None
+    ) -> Optional[Tuple[AllocationVehicle, List[AllocationEntry], Optional[str]]]:
+        """
+        One query for a vehicle and a page of its allocations, newest first.
+
+        The vehicle is LEFT JOINed to its trips, so a vehicle without
+        (further) trips still comes back as one row with NULL trip columns.
+        The page continues after `after` with a keyset on (created_at,
+        trip_allocation_id) inside the join condition, and is served by
+        ix_trip_allocation_vehicle_created_at at any depth. Only the requested
+        customer columns are selected (all of them by default).
+        Returns None when the vehicle does not exist.
+        """
+        fields = customer_fields or CUSTOMER_FIELDS
+        vehicle_columns = [getattr(Vehicle, name).label(f"v_{name}") for name in AllocationVehicle.model_fields]
+        trip_columns = [getattr(Trip_Allocation, name).label(f"t_{name}") for name in AllocationTrip.model_fields]
+        customer_columns = [
+            getattr(CustomerCompany, name).label(f"c_{name}")
+            for name in ("customer_company_id", *fields)
+        ]
+
+        trip_join = Trip_Allocation.vehicle_id == Vehicle.vehicle_id
+        if after:
+            trip_join = and_(
+                trip_join,
+                keyset_after(
+                    [Trip_Allocation.created_at, Trip_Allocation.trip_allocation_id], after, descending=True
+                )
+            )
+        query = (
+            select(*vehicle_columns, *trip_columns, *customer_columns)
+            .select_from(Vehicle)
+            .outerjoin(Trip_Allocation, trip_join)
+            .outerjoin(
+                CustomerCompany,
+                CustomerCompany.customer_company_id == Trip_Allocation.customer_company_id
+            )
+            .where(Vehicle.vehicle_number == vehicle_number)
+            .order_by(Trip_Allocation.created_at.desc(), Trip_Allocation.trip_allocation_id.desc())
+            .limit(limit + 1)
+        )
+        rows = (await self.db.execute(query)).all()
+        if not rows:
+            return None
+
+        def pick(row, prefix: str) -> Dict[str, Any]:
+            return {
+                key[len(prefix):]: value
+                for key, value in row._mapping.items() if key.startswith(prefix)
+            }
+
+        vehicle = AllocationVehicle(**pick(rows[0], "v_"))
+        page, next_cursor = split_page(
+            [row for row in rows if row.t_trip_allocation_id is not None],
+            limit, "t_created_at", "t_trip_allocation_id"
+        )
+        entries = [
+            AllocationEntry(
+                allocation=AllocationTrip(**pick(row, "t_")),
+                customer=AllocationCustomer(**pick(row, "c_"))
+            )
+            for row in page
+        ]
+        return vehicle, entries, next_cursor
+
     async def get_recent_customer_allocation_by_vehicle_number(
         self, 
-        vehicle_number: str
-    ) -> Optional[Dict[str, Any]]:
+        vehicle_number: str,
+        customer_fields: Optional[Sequence[str]] = None
+    ) -> Optional[VehicleRecentAllocation]:
         """
         Get the most recently allocated customer details for a vehicle based on vehicle number.
         
-        Steps:
-        1. Find the vehicle by vehicle_number
-        2. Get the most recent trip allocation for that vehicle
-        3. Join with customer company details
-        4. Return combined information
+        One joined query (see _allocation_history); None if the vehicle does not exist.
         """
-        
-        # Step 1: Find vehicle by vehicle_number
-        vehicle = await self.get_vehicle_by_vehicle_number(vehicle_number)
-        if not vehicle:
+        history = await self._allocation_history(vehicle_number, 1, customer_fields=customer_fields)
+        if history is None:
             return None
-        
-        # Step 2 & 3: Get most recent trip allocation with customer details
-        query = (
-            select(Trip_Allocation, CustomerCompany)
-            .join(CustomerCompany, Trip_Allocation.customer_company_id == CustomerCompany.customer_company_id)
-            .where(Trip_Allocation.vehicle_id == vehicle.vehicle_id)
-            .order_by(Trip_Allocation.created_at.desc())  # Most recent first
-            .limit(1)
+        vehicle, entries, _ = history
+        if not entries:
+            return VehicleRecentAllocation(
+                vehicle=vehicle,
+                recent_allocation=None,
+                customer_details=None,
+                message="No allocations found for this vehicle"
+            )
+        return VehicleRecentAllocation(
+            vehicle=vehicle,
+            recent_allocation=entries[0].allocation,
+            customer_details=entries[0].customer
         )
-        
-        result = await self.db.execute(query)
-        allocation_and_customer = result.first()
-        
-        if not allocation_and_customer:
-            return {
-                "vehicle": {
-                    "vehicle_id": vehicle.vehicle_id,
-                    "vehicle_number": vehicle.vehicle_number,
-                    "registration_number": vehicle.registration_number,
-                    "vehicle_type": vehicle.vehicle_type,
-                    "status": vehicle.status,
-                    "daily_status": vehicle.daily_status
-                },
-                "recent_allocation": None,
-                "customer_details": None,
-                "message": "No allocations found for this vehicle"
-            }
-        
-        trip_allocation, customer_company = allocation_and_customer
-        
-        # Step 4: Return combined information
-        return {
-            "vehicle": {
-                "vehicle_id": vehicle.vehicle_id,
-                "vehicle_number": vehicle.vehicle_number,
-                "registration_number": vehicle.registration_number,
-                "vehicle_type": vehicle.vehicle_type,
-                "status": vehicle.status,
-                "daily_status": vehicle.daily_status
-            },
-            "recent_allocation": {
-                "trip_allocation_id": trip_allocation.trip_allocation_id,
-                "load_tons": trip_allocation.load_tons,
-                "factory": trip_allocation.factory,
-                "trip_type": trip_allocation.trip_type,
-                "trip_date_time": trip_allocation.trip_date_time,
-                "transport_manager_name": trip_allocation.transport_manager_name,
-                "entry_by_role": trip_allocation.entry_by_role,
-                "status": trip_allocation.status,
-                "created_at": trip_allocation.created_at,
-                "updated_at": trip_allocation.updated_at
-            },
-            "customer_details": {
-                "customer_company_id": customer_company.customer_company_id,
-                "name": customer_company.name,
-                "contact_person": customer_company.contact_person,
-                "phone": customer_company.phone,
-                "email": customer_company.email,
-                "factory_location": customer_company.factory_location,
-                "city": customer_company.city,
-                "state": customer_company.state,
-                "pincode": customer_company.pincode,
-                "contract_type": customer_company.contract_type,
-                "contact_details": customer_company.contact_details
-            }
-        }
     
-    # ALTERNATIVE METHOD: Get all allocations for a vehicle (if you need history)
     async def get_all_customer_allocations_by_vehicle_number(
         self, 
         vehicle_number: str,
-        limit: int = 10
-    ) -> Optional[Dict[str, Any]]:
+        limit: int = 10,
+        after: Optional[str] = None,
+        customer_fields: Optional[Sequence[str]] = None
+    ) -> Optional[VehicleAllocationHistory]:
         """
-        Get all customer allocations for a vehicle (most recent first).
+        Get a page of customer allocations for a vehicle (most recent first).
+
+        Continue with the returned `next_cursor` as `after`; None if the vehicle does not exist.
         """
-        
-        # Find vehicle by vehicle_number
-        vehicle = await self.get_vehicle_by_vehicle_number(vehicle_number)
-        if not vehicle:
+        history = await self._allocation_history(vehicle_number, limit, after, customer_fields)
+        if history is None:
             return None
-        
-        # Get all trip allocations with customer details
-        query = (
-            select(Trip_Allocation, CustomerCompany)
-            .join(CustomerCompany, Trip_Allocation.customer_company_id == CustomerCompany.customer_company_id)
-            .where(Trip_Allocation.vehicle_id == vehicle.vehicle_id)
-            .order_by(Trip_Allocation.created_at.desc())
-            .limit(limit)
+        vehicle, entries, next_cursor = history
+        # An empty page after a cursor is just the end of the history
+        if not entries and not after:
+            return VehicleAllocationHistory(
+                vehicle=vehicle,
+                allocations=[],
+                message="No allocations found for this vehicle"
+            )
+        return VehicleAllocationHistory(
+            vehicle=vehicle,
+            allocations=entries,
+            total_allocations=len(entries),
+            next_cursor=next_cursor
         )
-        
-        result = await self.db.execute(query)
-        allocations_and_customers = result.all()
-        
-        if not allocations_and_customers:
-            return {
-                "vehicle": {
-                    "vehicle_id": vehicle.vehicle_id,
-                    "vehicle_number": vehicle.vehicle_number,
-                    "registration_number": vehicle.registration_number,
-                    "vehicle_type": vehicle.vehicle_type,
-                    "status": vehicle.status,
-                    "daily_status": vehicle.daily_status
-                },
-                "allocations": [],
-                "message": "No allocations found for this vehicle"
-            }
-        
-        allocations_list = []
-        for trip_allocation, customer_company in allocations_and_customers:
-            allocations_list.append({
-                "allocation": {
-                    "trip_allocation_id": trip_allocation.trip_allocation_id,
-                    "load_tons": trip_allocation.load_tons,
-                    "factory": trip_allocation.factory,
-                    "trip_type": trip_allocation.trip_type,
-                    "trip_date_time": trip_allocation.trip_date_time,
-                    "transport_manager_name": trip_allocation.transport_manager_name,
-                    "entry_by_role": trip_allocation.entry_by_role,
-                    "status": trip_allocation.status,
-                    "created_at": trip_allocation.created_at,
-                    "updated_at": trip_allocation.updated_at
-                },
-                "customer": {
-                    "customer_company_id": customer_company.customer_company_id,
-                    "name": customer_company.name,
-                    "contact_person": customer_company.contact_person,
-                    "phone": customer_company.phone,
-                    "email": customer_company.email,
-                    "factory_location": customer_company.factory_location,
-                    "city": customer_company.city,
-                    "state": customer_company.state,
-                    "pincode": customer_company.pincode,
-                    "contract_type": customer_company.contract_type,
-                    "contact_details": customer_company.contact_details
-                }
-            })
-        
-        return {
-            "vehicle": {
-                "vehicle_id": vehicle.vehicle_id,
-                "vehicle_number": vehicle.vehicle_number,
-                "registration_number": vehicle.registration_number,
-                "vehicle_type": vehicle.vehicle_type,
-                "status": vehicle.status,
-                "daily_status": vehicle.daily_status
-            },
-            "allocations": allocations_list,
-            "total_allocations": len(allocations_list)
-        }
\ No newline at end of file
@@ -0,0 +1,92 @@
+# benchmarks/json_encoding.py
+"""
+Time the ways a 1000-row trip list can be turned into a JSON body.
+
+    python -m benchmarks.json_encoding [--rows 1000] [--repeat 50]
+
+No database is needed: rows are synthetic trip_allocation rows, both as ORM
+instances (what select(Trip_Allocation) returns) and as plain dicts (what
+a column select returns through .mappings()). Reports the median time per
+response body; the HTTP round trip and the query itself are not included.
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse
+from app.models.customer_company import CustomerCompany  # noqa: F401 (mapper registry)
+from app.models.trip_allocation import Trip_Allocation
+from app.models.vehicle import Vehicle  # noqa: F401 (mapper registry)
+from app.schemas.trip_allocation import TripAllocationOut
+
+
+def make_rows(count: int) -> List[dict]:
+    start = datetime(2024, 1, 1, 6, 0)
+    return [
+        {
+            "trip_allocation_id": i,
+            "vehicle_id": 1 + i % 300,
+            "customer_company_id": 1 + i % 40,
+            "load_tons": 12.5 + i % 7,
+            "factory": f"Factory {i % 12}",
+            "trip_type": "single" if i % 3 else "multiple",
+            "trip_date_time": start + timedelta(minutes=17 * i),
+            "transport_manager_name": "R. Kumar",
+            "entry_by_role": "TM",
+            "status": "completed",
+            "created_at": start + timedelta(minutes=17 * i, seconds=3),
+            "updated_at": None,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main(args: argparse.Namespace) -> None:
+    data = make_rows(args.rows)
+    instances = [Trip_Allocation(**row) for row in data]
+    adapter = TypeAdapter(List[TripAllocationOut])
+
+    cases = {
+        # FastAPI before 0.115 / with a custom default_response_class:
+        # validate, jsonable_encoder, then json.dumps
+        "response_model + jsonable_encoder + json.dumps": lambda: json.dumps(
+            jsonable_encoder(adapter.validate_python(instances))
+        ).encode(),
+        # Current FastAPI with the default response class: pydantic writes JSON bytes
+        "response_model + pydantic dump_json": lambda: adapter.dump_json(
+            adapter.validate_python(instances)
+        ),
+        # response_model with an orjson response class
+        "response_model + orjson": lambda: orjson.dumps(
+            adapter.dump_python(adapter.validate_python(instances))
+        ),
+        # Fast path: column rows (as dicts) straight to orjson, no model validation
+        "rows -> FastJSONResponse": lambda: FastJSONResponse([dict(row) for row in data]).body,
+    }
+    print(f"{args.rows} rows, median of {args.repeat} runs")
+    for name, fn in cases.items():
+        print(f"  {name:<50} {timed(fn, args.repeat):8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.json_encoding")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
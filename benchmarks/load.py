@@ -0,0 +1,574 @@
+# benchmarks/load.py
+"""
+Drive every API route with concurrent clients and report latency per endpoint.
+
+    python -m benchmarks.load [--base-url http://localhost:8000] [--concurrency 32]
+                              [--duration 10] [--writes] [--only vehicle]
+                              [--output results.json] [--baseline previous.json]
+
+Run against a server on a database filled by `python -m benchmarks.seed`;
+the tool reads sample ids and names from that database (LOGMA_DATABASE_URL)
+and uses them as path and query parameters. Endpoints run one after
+another, each for --duration seconds with --concurrency clients, so their
+numbers do not disturb each other. For each endpoint it reports p50, p95
+and p99 latency, throughput, status codes and, when the pg_stat_statements
+extension is installed, SQL statements per request. Statement counts cover
+the whole database during the run, so background jobs (fleet index
+refresh, pool pre-ping) add a little to them.
+
+Read-only endpoints run by default. --writes also runs the endpoints that
+create, change and delete rows, on vehicles and companies the run creates
+itself; they are deleted again at the end. The daily status rollover does
+change the seeded fleet, so reseed when exact repeatability matters.
+
+--output writes the results as JSON, tagged with the current git commit.
+--baseline compares against such a file and prints the change in p95
+latency and statements per request.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import random
+import statistics
+import subprocess
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from fastapi.routing import APIRoute, APIWebSocketRoute
+from sqlalchemy import text
+
+from app.database import async_engine
+
+logger = logging.getLogger("benchmarks.load")
+
+# WebSocket routes are not request/response endpoints; /stream measures the same broker
+NOT_DRIVEN = {"WS /api/events/ws": "WebSocket; the SSE stream covers the same events"}
+
+STATEMENTS_QUERY = text(
+    "SELECT coalesce(sum(calls), 0) FROM pg_stat_statements "
+    "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database()) "
+    "AND query NOT LIKE '%pg_stat_statements%'"
+)
+
+
+@dataclass
+class Fixtures:
+    """Sample rows of the seeded database, plus what write endpoints create during the run"""
+    vehicle_ids: List[int]
+    vehicle_numbers: List[str]
+    company_ids: List[int]
+    company_names: List[str]
+    trip_ids: List[int]
+    first_day: datetime
+    last_day: datetime
+    tag: str = field(default_factory=lambda: f"BENCH-{int(time.time())}")
+    sequence: int = 0
+    companies: List[int] = field(default_factory=list)
+    vehicles: List[int] = field(default_factory=list)
+    free_vehicles: List[int] = field(default_factory=list)
+    busy_vehicles: List[int] = field(default_factory=list)
+    trips: Dict[int, int] = field(default_factory=dict)  # created trip id -> vehicle id
+
+    def next_name(self) -> str:
+        self.sequence += 1
+        return f"{self.tag}-{self.sequence}"
+
+
+# A request builder returns the keyword arguments of httpx.AsyncClient.request,
+# or None when it has nothing left to work on (the endpoint's run then ends)
+RequestBuilder = Callable[[Fixtures, random.Random], Optional[dict]]
+# Called with the fixtures and the parsed JSON body of every successful response
+ResponseHandler = Callable[[Fixtures, dict, object], None]
+
+
+@dataclass
+class Endpoint:
+    method: str
+    path: str  # route path as declared in the app, e.g. /api/vehicle/{vehicle_id}
+    build: RequestBuilder
+    writes: bool = False
+    handle: Optional[ResponseHandler] = None
+    prepare: Optional[Callable[[Fixtures], None]] = None  # runs once before the endpoint's run
+    max_requests: Optional[int] = None
+    concurrency: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def _get(url: str, **params) -> dict:
+    return {"method": "GET", "url": url, "params": params}
+
+
+def _csv(header: List[str], rows: List[list]) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return out.getvalue().encode()
+
+
+def _pop(items: list) -> Optional[int]:
+    return items.pop() if items else None
+
+
+def _trip_payload(fx: Fixtures, rng: random.Random, vehicle_id: int) -> dict:
+    return {
+        "vehicle_id": vehicle_id,
+        "company_id": rng.choice(fx.company_ids),
+        "load_tons": round(rng.uniform(4, 40), 1),
+        "factory": "Unit 1",
+        "trip_type": "single",
+        "trip_date_time": fx.last_day.isoformat(),
+        "transport_manager_name": "Load Test",
+        "entry_by_role": "TM",
+    }
+
+
+def _month(fx: Fixtures, rng: random.Random) -> dict:
+    start = fx.first_day + timedelta(days=rng.randrange(max((fx.last_day - fx.first_day).days - 30, 1)))
+    return {"date_from": start.date().isoformat(), "date_to": (start + timedelta(days=30)).date().isoformat()}
+
+
+# Request builders for write endpoints
+
+def create_company(fx: Fixtures, rng: random.Random) -> dict:
+    return {"method": "POST", "url": "/api/customer/", "json": {
+        "name": fx.next_name(), "phone": "9000000000", "city": "Chennai", "contract_type": "Fixed",
+    }}
+
+
+def update_company(fx: Fixtures, rng: random.Random) -> Optional[dict]:
+    if not fx.companies:
+        return None
+    return {"method": "PUT", "url": f"/api/customer/{rng.choice(fx.companies)}",
+            "json": {"contact_person": f"Contact {rng.randrange(1000)}"}}
+
+
+def delete_company(fx: Fixtures, rng: random.Random) -> Optional[dict]:
+    company_id = _pop(fx.companies)
+    return None if company_id is None else {"method": "DELETE", "url": f"/api/customer/{company_id}"}
+
+
+def import_companies(fx: Fixtures, rng: random.Random) -> dict:
+    body = _csv(["name", "phone", "city"], [[fx.next_name(), "9000000000", "Madurai"] for _ in range(100)])
+    return {"method": "POST", "url": "/api/customer/import", "files": {"file": ("companies.csv", body, "text/csv")}}
+
+
+def create_vehicle(fx: Fixtures, rng: random.Random) -> dict:
+    name = fx.next_name()
+    return {"method": "POST", "url": "/api/vehicle/", "json": {
+        "vehicle_number": name, "registration_number": name[-20:], "vehicle_type": "Truck",
+    }}
+
+
+def update_vehicle(fx: Fixtures, rng: random.Random) -> Optional[dict]:
+    if not fx.vehicles:
+        return None
+    return {"method": "PUT", "url": f"/api/vehicle/{rng.choice(fx.vehicles)}",
+            "json": {"vehicle_type": rng.choice(["Truck", "Trailer", "Tipper"])}}
+
+
+def delete_vehicle(fx: Fixtures, rng: random.Random) -> Optional[dict]:
+    vehicle_id = _pop(fx.free_vehicles)
+    return None if vehicle_id is None else {"method": "DELETE", "url": f"/api/vehicle/{vehicle_id}"}
+
+
+def import_vehicles(fx: Fixtures, rng: random.Random) -> dict:
+    rows = []
+    for _ in range(100):
+        name = fx.next_name()
+        rows.append([name, name[-20:], "Truck"])
+    body = _csv(["vehicle_number", "registration_number", "vehicle_type"], rows)
+    return {"method": "POST", "url": "/api/vehicle/import", "files": {"file": ("vehicles.csv", body, "text/csv")}}
+
+
+def daily_status(fx: Fixtures, rng: random.Random) -> Optional[dict]:
+    if not fx.vehicles:
+        return None
+    ids = rng.sample(fx.vehicles, min(100, len(fx.vehicles)))
+    return {"method": "POST", "url": "/api/vehicle/daily-status",
+            "json": {"vehicle_ids": ids, "daily_status": rng.choice(["available", "in_line"])}}
+
+
+def create_trip(fx: Fixtures, rng: random.Random) -> Optional[dict]:
+    vehicle_id = _pop(fx.free_vehicles)
+    if vehicle_id is None:
+        return None
+    fx.busy_vehicles.append(vehicle_id)
+    return {"method": "POST", "url": "/api/trip_allocation/", "json": _trip_payload(fx, rng, vehicle_id)}
+
+
+def create_trips_bulk(fx: Fixtures, rng: random.Random) -> Optional[dict]:
+    batch = [fx.free_vehicles.pop() for _ in range(min(50, len(fx.free_vehicles)))]
+    if not batch:
+        return None
+    fx.busy_vehicles.extend(batch)
+    return {"method": "POST", "url": "/api/trip_allocation/bulk", "json": {
+        "trips": [_trip_payload(fx, rng, vehicle_id) for vehicle_id in batch], "mode": "best_effort",
+    }}
+
+
+def update_trip(fx: Fixtures, rng: random.Random) -> Optional[dict]:
+    if not fx.trips:
+        return None
+    trip_id = rng.choice(list(fx.trips))
+    return {"method": "PUT", "url": f"/api/trip_allocation/{trip_id}",
+            "json": {"load_tons": round(rng.uniform(4, 40), 1)}}
+
+
+def transition_trips(fx: Fixtures, rng: random.Random) -> Optional[dict]:
+    batch = [fx.busy_vehicles.pop() for _ in range(min(100, len(fx.busy_vehicles)))]
+    if not batch:
+        return None
+    # Cancelled trips free their vehicles for the bulk create that follows
+    fx.free_vehicles.extend(batch)
+    return {"method": "POST", "url": "/api/trip_allocation/transitions", "json": {
+        "to_status": "cancelled", "vehicle_ids": batch, "vehicle_daily_status": "available",
+    }}
+
+
+def delete_trip(fx: Fixtures, rng: random.Random) -> Optional[dict]:
+    if not fx.trips:
+        return None
+    trip_id, _ = fx.trips.popitem()
+    return {"method": "DELETE", "url": f"/api/trip_allocation/{trip_id}"}
+
+
+# Response handlers: remember what was created
+
+def created_company(fx: Fixtures, request: dict, body) -> None:
+    fx.companies.append(body["customer_company_id"])
+
+
+def created_vehicle(fx: Fixtures, request: dict, body) -> None:
+    fx.vehicles.append(body["vehicle_id"])
+    fx.free_vehicles.append(body["vehicle_id"])
+
+
+def created_trip(fx: Fixtures, request: dict, body) -> None:
+    fx.trips[body["trip_allocation_id"]] = body["vehicle_id"]
+
+
+def created_trips_bulk(fx: Fixtures, request: dict, body) -> None:
+    for item in body["results"]:
+        if item["trip"]:
+            fx.trips[item["trip"]["trip_allocation_id"]] = item["trip"]["vehicle_id"]
+
+
+def vehicles_without_trips(fx: Fixtures) -> None:
+    """Only vehicles whose trips were all deleted can be deleted (foreign key)"""
+    with_trips = set(fx.trips.values())
+    fx.free_vehicles = [vehicle_id for vehicle_id in fx.vehicles if vehicle_id not in with_trips]
+    fx.vehicles = [vehicle_id for vehicle_id in fx.vehicles if vehicle_id in with_trips]
+
+
+# In run order: reads first, on the untouched dataset; then writes, each
+# building on the rows the previous ones created
+ENDPOINTS = [
+    Endpoint("GET", "/", lambda fx, rng: _get("/")),
+    Endpoint("GET", "/api/vehicle/", lambda fx, rng: _get(
+        "/api/vehicle/", limit=100, **rng.choice([{}, {"status": "active"}, {"daily_status": "available"}])
+    )),
+    Endpoint("GET", "/api/vehicle/available", lambda fx, rng: _get("/api/vehicle/available")),
+    Endpoint("GET", "/api/vehicle/in-line", lambda fx, rng: _get("/api/vehicle/in-line")),
+    Endpoint("GET", "/api/vehicle/{vehicle_id}", lambda fx, rng: _get(
+        f"/api/vehicle/{rng.choice(fx.vehicle_ids)}"
+    )),
+    Endpoint("GET", "/api/vehicle/recent-allocation/{vehicle_number}", lambda fx, rng: _get(
+        f"/api/vehicle/recent-allocation/{rng.choice(fx.vehicle_numbers)}"
+    )),
+    Endpoint("GET", "/api/vehicle/allocations/{vehicle_number}", lambda fx, rng: _get(
+        f"/api/vehicle/allocations/{rng.choice(fx.vehicle_numbers)}", limit=20
+    )),
+    Endpoint("GET", "/api/customer/", lambda fx, rng: _get(
+        "/api/customer/", limit=100,
+        **rng.choice([{}, {"city": "Chennai"}, {"contract_type": "Fixed", "count": "estimated"}])
+    )),
+    Endpoint("GET", "/api/customer/search", lambda fx, rng: _get(
+        "/api/customer/search", name=rng.choice(fx.company_names).split()[-2], limit=10
+    )),
+    Endpoint("GET", "/api/customer/{company_id}", lambda fx, rng: _get(
+        f"/api/customer/{rng.choice(fx.company_ids)}"
+    )),
+    Endpoint("GET", "/api/customer/name/{company_name}", lambda fx, rng: _get(
+        f"/api/customer/name/{rng.choice(fx.company_names)}"
+    )),
+    Endpoint("GET", "/api/trip_allocation/", lambda fx, rng: _get("/api/trip_allocation/", limit=100)),
+    Endpoint("GET", "/api/trip_allocation/{trip_id}", lambda fx, rng: _get(
+        f"/api/trip_allocation/{rng.choice(fx.trip_ids)}"
+    )),
+    Endpoint("GET", "/api/trip_allocation/export", lambda fx, rng: _get(
+        "/api/trip_allocation/export", company_id=rng.choice(fx.company_ids), **_month(fx, rng)
+    ), concurrency=4),
+    Endpoint("GET", "/api/reports/trips", lambda fx, rng: _get(
+        "/api/reports/trips", group_by=rng.choice(["company", "vehicle"]),
+        period=rng.choice(["day", "month"]), company_id=rng.choice(fx.company_ids), **_month(fx, rng)
+    )),
+    Endpoint("GET", "/api/events/stream", lambda fx, rng: _get("/api/events/stream"), concurrency=8),
+    Endpoint("GET", "/api/system/pool", lambda fx, rng: _get("/api/system/pool")),
+    Endpoint("GET", "/api/system/cache", lambda fx, rng: _get("/api/system/cache")),
+    Endpoint("GET", "/api/system/fleet-index", lambda fx, rng: _get("/api/system/fleet-index")),
+    Endpoint("GET", "/api/system/events", lambda fx, rng: _get("/api/system/events")),
+
+    Endpoint("POST", "/api/customer/", create_company, writes=True, handle=created_company),
+    Endpoint("PUT", "/api/customer/{company_id}", update_company, writes=True),
+    Endpoint("POST", "/api/customer/import", import_companies, writes=True, concurrency=4),
+    Endpoint("DELETE", "/api/customer/{company_id}", delete_company, writes=True),
+    Endpoint("POST", "/api/vehicle/", create_vehicle, writes=True, handle=created_vehicle),
+    Endpoint("PUT", "/api/vehicle/{vehicle_id}", update_vehicle, writes=True),
+    Endpoint("POST", "/api/vehicle/import", import_vehicles, writes=True, concurrency=4),
+    Endpoint("POST", "/api/vehicle/daily-status", daily_status, writes=True),
+    Endpoint("POST", "/api/trip_allocation/", create_trip, writes=True, handle=created_trip),
+    Endpoint("PUT", "/api/trip_allocation/{trip_id}", update_trip, writes=True),
+    Endpoint("POST", "/api/trip_allocation/transitions", transition_trips, writes=True),
+    Endpoint("POST", "/api/trip_allocation/bulk", create_trips_bulk, writes=True, handle=created_trips_bulk),
+    Endpoint("DELETE", "/api/trip_allocation/{trip_id}", delete_trip, writes=True),
+    Endpoint("DELETE", "/api/vehicle/{vehicle_id}", delete_vehicle, writes=True, prepare=vehicles_without_trips),
+    Endpoint("DELETE", "/api/system/cache", lambda fx, rng: {"method": "DELETE", "url": "/api/system/cache"},
+             writes=True),
+    Endpoint("POST", "/api/vehicle/daily-status/rollover", lambda fx, rng: {
+        "method": "POST", "url": "/api/vehicle/daily-status/rollover"
+    }, writes=True, max_requests=5, concurrency=1),
+]
+
+
+def uncovered_routes() -> List[str]:
+    """Routes of the app that no Endpoint drives (and that are not listed in NOT_DRIVEN)"""
+    from app.main import app
+
+    driven = {endpoint.name for endpoint in ENDPOINTS} | set(NOT_DRIVEN)
+    routes = []
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            routes.extend(f"{method} {route.path}" for method in sorted(route.methods))
+        elif isinstance(route, APIWebSocketRoute):
+            routes.append(f"WS {route.path}")
+    return [route for route in routes if route not in driven]
+
+
+async def load_fixtures(sample: int) -> Fixtures:
+    async with async_engine.connect() as conn:
+        async def column(sql: str) -> list:
+            return list((await conn.execute(text(sql), {"n": sample})).scalars())
+
+        # TABLESAMPLE keeps this fast on 10M trips; ORDER BY random() is fine for the smaller tables
+        vehicles = (await conn.execute(text(
+            "SELECT vehicle_id, vehicle_number FROM vehicle ORDER BY random() LIMIT :n"
+        ), {"n": sample})).all()
+        companies = (await conn.execute(text(
+            "SELECT customer_company_id, name FROM customer_company ORDER BY random() LIMIT :n"
+        ), {"n": sample})).all()
+        trip_ids = await column(
+            "SELECT trip_allocation_id FROM trip_allocation TABLESAMPLE SYSTEM (1) LIMIT :n"
+        ) or await column("SELECT trip_allocation_id FROM trip_allocation LIMIT :n")
+        first_day, last_day = (await conn.execute(text(
+            "SELECT min(trip_date_time), max(trip_date_time) FROM trip_allocation"
+        ))).one()
+    if not (vehicles and companies and trip_ids):
+        raise SystemExit("The database has no vehicles, companies or trips; run `python -m benchmarks.seed`")
+    return Fixtures(
+        vehicle_ids=[row.vehicle_id for row in vehicles],
+        vehicle_numbers=[row.vehicle_number for row in vehicles],
+        company_ids=[row.customer_company_id for row in companies],
+        company_names=[row.name for row in companies],
+        trip_ids=trip_ids,
+        first_day=first_day,
+        last_day=last_day,
+    )
+
+
+async def statement_count() -> Optional[int]:
+    """Statements executed in the database so far, or None without pg_stat_statements"""
+    try:
+        async with async_engine.connect() as conn:
+            return int((await conn.execute(STATEMENTS_QUERY)).scalar_one())
+    except Exception:
+        return None
+
+
+async def cleanup(fx: Fixtures) -> None:
+    """Delete every row the write endpoints created (all named after the run's tag)"""
+    pattern = {"pattern": f"{fx.tag}-%"}
+    async with async_engine.begin() as conn:
+        await conn.execute(text(
+            "DELETE FROM trip_allocation WHERE vehicle_id IN "
+            "(SELECT vehicle_id FROM vehicle WHERE vehicle_number LIKE :pattern)"
+        ), pattern)
+        await conn.execute(text("DELETE FROM vehicle WHERE vehicle_number LIKE :pattern"), pattern)
+        await conn.execute(text("DELETE FROM customer_company WHERE name LIKE :pattern"), pattern)
+
+
+def percentile(sorted_ms: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    rank = max(int(round(pct / 100 * len(sorted_ms) + 0.5)) - 1, 0)
+    return sorted_ms[min(rank, len(sorted_ms) - 1)]
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient,
+    endpoint: Endpoint,
+    fx: Fixtures,
+    rng: random.Random,
+    args: argparse.Namespace
+) -> dict:
+    if endpoint.prepare:
+        endpoint.prepare(fx)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    failures: Counter = Counter()
+    budget = endpoint.max_requests or args.max_requests
+    deadline = time.perf_counter() + args.duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline and (budget is None or len(latencies) + sum(failures.values()) < budget):
+            request = endpoint.build(fx, rng)
+            if request is None:
+                return
+            started = time.perf_counter()
+            try:
+                if request["url"] == "/api/events/stream":
+                    # Open stream: time to the first event, then hang up
+                    async with client.stream(request["method"], request["url"]) as response:
+                        await response.aiter_bytes().__anext__()
+                else:
+                    response = await client.request(**request)
+            except httpx.HTTPError as e:
+                failures[type(e).__name__] += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[str(response.status_code)] += 1
+            if endpoint.handle and response.status_code < 300:
+                endpoint.handle(fx, request, response.json())
+
+    before = await statement_count()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(endpoint.concurrency or args.concurrency)))
+    elapsed = time.perf_counter() - started
+    after = await statement_count()
+
+    latencies.sort()
+    count = len(latencies)
+    errors = sum(n for status, n in statuses.items() if int(status) >= 400) + sum(failures.values())
+    result = {
+        "requests": count,
+        "errors": errors,
+        "status_codes": dict(sorted(statuses.items())),
+        "transport_errors": dict(failures),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(count / elapsed, 1) if elapsed else None,
+        "latency_ms": None,
+        "statements_per_request": None,
+    }
+    if latencies:
+        result["latency_ms"] = {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "mean": round(statistics.fmean(latencies), 2),
+            "max": round(latencies[-1], 2),
+        }
+    if before is not None and after is not None and count:
+        result["statements_per_request"] = round((after - before) / count, 2)
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results: Dict[str, dict], baseline: Optional[Dict[str, dict]]) -> None:
+    header = f"{'endpoint':<52} {'req':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'stmt':>6}"
+    if baseline:
+        header += f" {'p95 Δ':>8} {'stmt Δ':>7}"
+    print(header)
+    for name, result in results.items():
+        latency = result["latency_ms"] or {}
+        statements = result["statements_per_request"]
+        line = (
+            f"{name:<52} {result['requests']:>7} {result['errors']:>5} "
+            f"{result['throughput_rps'] or 0:>8.1f} {latency.get('p50', 0):>8.2f} "
+            f"{latency.get('p95', 0):>8.2f} {latency.get('p99', 0):>8.2f} "
+            f"{'-' if statements is None else f'{statements:.1f}':>6}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous and previous["latency_ms"] and latency:
+            change = (latency["p95"] / previous["latency_ms"]["p95"] - 1) * 100
+            line += f" {change:>+7.0f}%"
+            if statements is not None and previous["statements_per_request"] is not None:
+                line += f" {statements - previous['statements_per_request']:>+7.1f}"
+        print(line)
+
+
+async def main(args: argparse.Namespace) -> None:
+    for route in uncovered_routes():
+        logger.warning(f"No load scenario for {route}")
+    endpoints = [
+        endpoint for endpoint in ENDPOINTS
+        if (args.writes or not endpoint.writes) and (not args.only or args.only in endpoint.name)
+    ]
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["endpoints"]
+
+    rng = random.Random(args.seed)
+    fx = await load_fixtures(args.sample)
+    if await statement_count() is None:
+        logger.warning("pg_stat_statements is not available; statement counts are omitted")
+    results: Dict[str, dict] = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+            for endpoint in endpoints:
+                logger.info(f"Running {endpoint.name}")
+                results[endpoint.name] = await run_endpoint(client, endpoint, fx, rng, args)
+    finally:
+        if args.writes:
+            await cleanup(fx)
+        await async_engine.dispose()
+
+    print_table(results, baseline)
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "seed": args.seed,
+            "endpoints": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients per endpoint")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per endpoint")
+    parser.add_argument("--max-requests", type=int, default=None, help="Stop each endpoint after this many requests")
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds before a request fails")
+    parser.add_argument("--writes", action="store_true", help="Also run endpoints that write (see above)")
+    parser.add_argument("--only", help="Only endpoints whose 'METHOD /path' contains this text")
+    parser.add_argument("--sample", type=int, default=1000, help="Sample ids and names to draw parameters from")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with the JSON output of an earlier run")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,152 @@
+# benchmarks/schema_validation.py
+"""
+Time validation of 1000 trips with the app's schemas and their predecessors.
+
+    python -m benchmarks.schema_validation [--rows 1000] [--repeat 50]
+
+Covers a bulk create payload (dicts -> TripAllocationCreate, one model at a
+time and as one list) and a list response (ORM instances ->
+TripAllocationOut), each for the current pydantic-core schemas and for the
+earlier @validator ones (copied below as Legacy*). Reports the best time of
+all runs and rows per second.
+"""
+import argparse
+import time
+import warnings
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, TypeAdapter, validator
+
+from app.models.customer_company import CustomerCompany  # noqa: F401 (mapper registry)
+from app.models.trip_allocation import Trip_Allocation
+from app.models.vehicle import Vehicle  # noqa: F401 (mapper registry)
+from app.schemas.trip_allocation import TripAllocationCreate, TripAllocationOut
+
+# The trip schemas as they were before the move to pydantic-core validation:
+# enum checks and timezone stripping in Python @validator methods
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+
+    class LegacyTripAllocationCreate(BaseModel):
+        vehicle_id: int = Field(..., description="ID of the vehicle")
+        company_id: int = Field(..., description="ID of the customer company")
+        load_tons: float = Field(..., gt=0, description="Load in tons")
+        factory: str = Field(..., min_length=1, description="Factory name")
+        trip_type: str = Field(..., description="Trip type: 'single' or 'multiple'")
+        trip_date_time: datetime = Field(..., description="Trip date and time")
+        transport_manager_name: str = Field(..., min_length=1, description="Transport manager name")
+        entry_by_role: str = Field(..., description="Entry role: 'TM' or 'TM Assistant'")
+
+        @validator('trip_type')
+        def validate_trip_type(cls, v):
+            if v not in ['single', 'multiple']:
+                raise ValueError("Trip type must be either 'single' or 'multiple'")
+            return v
+
+        @validator('entry_by_role')
+        def validate_entry_by_role(cls, v):
+            if v not in ['TM', 'TM Assistant']:
+                raise ValueError("Entry role must be either 'TM' or 'TM Assistant'")
+            return v
+
+        @validator('trip_date_time')
+        def ensure_naive_datetime(cls, v):
+            if v and v.tzinfo is not None:
+                return v.replace(tzinfo=None)
+            return v
+
+    class LegacyTripAllocationOut(BaseModel):
+        trip_allocation_id: int
+        vehicle_id: int
+        customer_company_id: int
+        load_tons: float
+        factory: str
+        trip_type: str
+        trip_date_time: datetime
+        transport_manager_name: str
+        entry_by_role: str
+        status: str
+        created_at: datetime
+        updated_at: Optional[datetime] = None
+
+        class Config:
+            from_attributes = True
+
+
+def make_payload(count: int) -> List[dict]:
+    start = datetime(2024, 1, 1, 6, 0, tzinfo=timezone.utc)
+    return [
+        {
+            "vehicle_id": 1 + i % 300,
+            "company_id": 1 + i % 40,
+            "load_tons": 12.5 + i % 7,
+            "factory": f"Factory {i % 12}",
+            "trip_type": "single" if i % 3 else "multiple",
+            "trip_date_time": (start + timedelta(minutes=17 * i)).isoformat(),
+            "transport_manager_name": "R. Kumar",
+            "entry_by_role": "TM" if i % 2 else "TM Assistant",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def make_instances(count: int) -> List[Trip_Allocation]:
+    start = datetime(2024, 1, 1, 6, 0)
+    return [
+        Trip_Allocation(
+            trip_allocation_id=i,
+            vehicle_id=1 + i % 300,
+            customer_company_id=1 + i % 40,
+            load_tons=12.5 + i % 7,
+            factory=f"Factory {i % 12}",
+            trip_type="single",
+            trip_date_time=start + timedelta(minutes=17 * i),
+            transport_manager_name="R. Kumar",
+            entry_by_role="TM",
+            status="completed",
+            created_at=start + timedelta(minutes=17 * i, seconds=3),
+            updated_at=None,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return min(samples)
+
+
+def main(args: argparse.Namespace) -> None:
+    payload = make_payload(args.rows)
+    instances = make_instances(args.rows)
+    schemas = {
+        "before (@validator)": (LegacyTripAllocationCreate, LegacyTripAllocationOut),
+        "after (pydantic-core)": (TripAllocationCreate, TripAllocationOut),
+    }
+
+    print(f"{args.rows} rows, best of {args.repeat} runs")
+    for label, (create, out) in schemas.items():
+        create_list = TypeAdapter(List[create])
+        out_list = TypeAdapter(List[out])
+        cases = {
+            "create payload, one model at a time": lambda: [create(**item) for item in payload],
+            "create payload, list TypeAdapter": lambda: create_list.validate_python(payload),
+            "list response from ORM instances": lambda: out_list.validate_python(instances),
+        }
+        print(f"{label}")
+        for name, fn in cases.items():
+            seconds = timed(fn, args.repeat)
+            print(f"  {name:<40} {seconds * 1000:8.2f} ms  {args.rows / seconds:12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.schema_validation")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
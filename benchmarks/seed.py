@@ -0,0 +1,255 @@
+# benchmarks/seed.py
+"""
+Fill a database with a synthetic fleet for load tests.
+
+    python -m benchmarks.seed [--vehicles 100000] [--companies 10000] [--trips 10000000]
+                              [--days 365] [--end YYYY-MM-DD] [--seed 42] [--reset]
+
+Uses the database from LOGMA_DATABASE_URL. Creates the tables and applies
+the migrations first, then writes companies, vehicles and trips with COPY.
+Rows come from a seeded random generator, so the same arguments (including
+--end, which defaults to today) always produce the same dataset.
+
+- Companies: unique names, Tamil Nadu cities, skewed trip volume (low ids get
+  the most trips).
+- Vehicles: about 3% inactive. A share of the active ones (--active-share) have
+  one active trip today and are 'assigned'; the rest are 'available' or 'in_line'.
+- Trips: spread evenly over --days days before --end, ordered by trip time.
+  About 94% are completed and 6% cancelled; the active trips come last.
+
+Row triggers (rollups, change notifications) are disabled during the load.
+Afterwards the rollups are rebuilt, the id sequences are moved past the
+loaded ids and the tables are analyzed. The target tables must be empty
+unless --reset is given, which truncates them first.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, List, Sequence
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.database import AsyncSessionLocal, Base, async_engine
+from app.migrations import upgrade
+from app.models.customer_company import CustomerCompany  # noqa: F401 (create_all)
+from app.models.trip_allocation import Trip_Allocation  # noqa: F401 (create_all)
+from app.models.vehicle import Vehicle  # noqa: F401 (create_all)
+from app.services.report_service import AsyncReportService
+
+logger = logging.getLogger("benchmarks.seed")
+
+TABLES = ["trip_allocation", "vehicle", "customer_company"]
+
+CITIES = [
+    ("Chennai", "Tamil Nadu", "600"), ("Coimbatore", "Tamil Nadu", "641"),
+    ("Madurai", "Tamil Nadu", "625"), ("Tiruchirappalli", "Tamil Nadu", "620"),
+    ("Salem", "Tamil Nadu", "636"), ("Tirunelveli", "Tamil Nadu", "627"),
+    ("Erode", "Tamil Nadu", "638"), ("Vellore", "Tamil Nadu", "632"),
+    ("Thoothukudi", "Tamil Nadu", "628"), ("Hosur", "Tamil Nadu", "635"),
+    ("Tiruppur", "Tamil Nadu", "641"), ("Karur", "Tamil Nadu", "639"),
+    ("Bengaluru", "Karnataka", "560"), ("Puducherry", "Puducherry", "605"),
+]
+NAME_PARTS = [
+    "Sri", "Lakshmi", "Ganesh", "Murugan", "Kaveri", "Annai", "Vetri", "Sakthi",
+    "Bharath", "Southern", "Coastal", "Deccan", "Sundaram", "Kumaran", "Velan", "Arun",
+]
+NAME_KINDS = [
+    "Cements", "Steels", "Textiles", "Mills", "Agro Foods", "Polymers",
+    "Granites", "Paper Boards", "Chemicals", "Logistics", "Spinning Mills", "Foundries",
+]
+CONTRACT_TYPES = ["Fixed", "Variable", "On-Demand", "Hybrid"]
+VEHICLE_TYPES = ["Truck", "Trailer", "Tipper", "Container", "Tanker", "Mini Truck"]
+VEHICLE_TYPE_WEIGHTS = [40, 20, 15, 12, 8, 5]
+MANAGERS = [
+    "R. Kumar", "S. Priya", "M. Senthil", "K. Lakshmi", "A. Rahman", "P. Karthik",
+    "V. Deepa", "G. Suresh", "N. Revathi", "T. Balaji", "J. Meena", "D. Prakash",
+]
+ACTIVE_TRIP_STATUSES = ["pending", "allocated", "in_progress"]
+
+COMPANY_COLUMNS = [
+    "customer_company_id", "name", "contact_person", "phone", "email", "factory_location",
+    "city", "state", "pincode", "contract_type", "contact_details", "created_at",
+]
+VEHICLE_COLUMNS = [
+    "vehicle_id", "vehicle_number", "registration_number", "vehicle_type",
+    "status", "daily_status", "created_at",
+]
+TRIP_COLUMNS = [
+    "trip_allocation_id", "vehicle_id", "customer_company_id", "load_tons", "factory",
+    "trip_type", "trip_date_time", "transport_manager_name", "entry_by_role", "status",
+    "created_at", "updated_at",
+]
+
+
+def vehicle_number(i: int) -> str:
+    """Unique Tamil Nadu style number for vehicle `i`: TN <district> <series> <number>"""
+    district, rest = i % 90 + 1, i // 90
+    series = chr(65 + rest // 10000 // 26 % 26) + chr(65 + rest // 10000 % 26)
+    return f"TN {district:02d} {series} {rest % 10000:04d}"
+
+
+def companies(rng: random.Random, count: int, created: datetime) -> Iterator[tuple]:
+    for i in range(1, count + 1):
+        city, state, pin = rng.choice(CITIES)
+        name = f"{rng.choice(NAME_PARTS)} {rng.choice(NAME_PARTS)} {rng.choice(NAME_KINDS)} {i}"
+        yield (
+            i, name, rng.choice(MANAGERS), f"9{rng.randrange(10 ** 9):09d}",
+            f"dispatch{i}@example.com", f"{city} Industrial Estate", city, state,
+            f"{pin}{rng.randrange(1000):03d}", rng.choice(CONTRACT_TYPES), None,
+            created + timedelta(minutes=i),
+        )
+
+
+def vehicles(
+    rng: random.Random,
+    count: int,
+    active_share: float,
+    created: datetime,
+    active_vehicles: List[int]
+) -> Iterator[tuple]:
+    """Vehicle rows; appends the ids of vehicles that get an active trip to `active_vehicles`"""
+    for i in range(1, count + 1):
+        status = "inactive" if rng.random() < 0.03 else "active"
+        if status == "active" and rng.random() < active_share:
+            daily_status = "assigned"
+            active_vehicles.append(i)
+        else:
+            daily_status = "in_line" if rng.random() < 0.3 else "available"
+        number = vehicle_number(i)
+        yield (
+            i, number, number.replace(" ", ""),
+            rng.choices(VEHICLE_TYPES, VEHICLE_TYPE_WEIGHTS)[0],
+            status, daily_status, created + timedelta(seconds=i),
+        )
+
+
+def trips(
+    rng: random.Random,
+    count: int,
+    vehicle_count: int,
+    company_count: int,
+    active_vehicles: Sequence[int],
+    start: datetime,
+    end: datetime
+) -> Iterator[tuple]:
+    """`count` trips in time order; the last ones are the active trips of `active_vehicles`"""
+    historical = max(count - len(active_vehicles), 0)
+    step = (end - start) / max(historical, 1)
+    trip_id = 0
+
+    def row(vehicle_id: int, when: datetime, status: str) -> tuple:
+        nonlocal trip_id
+        trip_id += 1
+        # Squaring skews volume towards low company ids, like a few large customers
+        company_id = 1 + int(company_count * rng.random() ** 2)
+        created = when - timedelta(hours=rng.randint(1, 48))
+        updated = when + timedelta(hours=rng.randint(2, 30)) if status in ("completed", "cancelled") else None
+        return (
+            trip_id, vehicle_id, company_id, round(rng.uniform(4, 40), 1),
+            f"Unit {company_id % 7 + 1}", "single" if rng.random() < 0.8 else "multiple",
+            when, rng.choice(MANAGERS), "TM" if rng.random() < 0.75 else "TM Assistant",
+            status, created, updated,
+        )
+
+    for i in range(historical):
+        when = start + step * i + timedelta(minutes=rng.randint(0, 59))
+        yield row(rng.randint(1, vehicle_count), when, "completed" if rng.random() < 0.94 else "cancelled")
+    for vehicle_id in active_vehicles[:count - historical]:
+        when = end + timedelta(hours=rng.randint(5, 20))
+        yield row(vehicle_id, when, rng.choice(ACTIVE_TRIP_STATUSES))
+
+
+def _dsn() -> str:
+    return make_url(settings.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def _copy(connection: asyncpg.Connection, table: str, columns: List[str], rows: Iterator[tuple]) -> None:
+    started = time.perf_counter()
+    status = await connection.copy_records_to_table(table, columns=columns, records=rows)
+    logger.info(f"{table}: {status} in {time.perf_counter() - started:.1f}s")
+
+
+async def load(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    end = datetime.combine(args.end, datetime.min.time())
+    start = end - timedelta(days=args.days)
+    created = datetime.combine(args.end - timedelta(days=args.days + 30), datetime.min.time(), timezone.utc)
+    active_vehicles: List[int] = []
+
+    connection = await asyncpg.connect(_dsn())
+    try:
+        async with connection.transaction():
+            if args.reset:
+                await connection.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+            else:
+                for table in TABLES:
+                    if await connection.fetchval(f"SELECT EXISTS (SELECT 1 FROM {table})"):
+                        raise SystemExit(f"{table} is not empty; pass --reset to truncate it first")
+            for table in TABLES:
+                await connection.execute(f"ALTER TABLE {table} DISABLE TRIGGER USER")
+
+            await _copy(connection, "customer_company", COMPANY_COLUMNS, companies(rng, args.companies, created))
+            await _copy(
+                connection, "vehicle", VEHICLE_COLUMNS,
+                vehicles(rng, args.vehicles, args.active_share, created, active_vehicles)
+            )
+            await _copy(
+                connection, "trip_allocation", TRIP_COLUMNS,
+                trips(rng, args.trips, args.vehicles, args.companies, active_vehicles, start, end)
+            )
+
+            for table in TABLES:
+                await connection.execute(f"ALTER TABLE {table} ENABLE TRIGGER USER")
+                # Statement triggers fire even when no row matches: this bumps
+                # table_version so running servers drop their ETags and caches
+                await connection.execute(f"DELETE FROM {table} WHERE false")
+            for table, key in (
+                ("customer_company", "customer_company_id"),
+                ("vehicle", "vehicle_id"),
+                ("trip_allocation", "trip_allocation_id"),
+            ):
+                await connection.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', '{key}'), "
+                    f"(SELECT coalesce(max({key}), 0) + 1 FROM {table}), false)"
+                )
+        for table in TABLES:
+            await connection.execute(f"ANALYZE {table}")
+    finally:
+        await connection.close()
+
+    async with AsyncSessionLocal() as session:
+        await AsyncReportService(session).rebuild_trip_rollups()
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await upgrade(async_engine)
+        started = time.perf_counter()
+        await load(args)
+        print(
+            f"Seeded {args.companies} companies, {args.vehicles} vehicles and {args.trips} trips "
+            f"in {time.perf_counter() - started:.0f}s"
+        )
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.seed")
+    parser.add_argument("--vehicles", type=int, default=100_000)
+    parser.add_argument("--companies", type=int, default=10_000)
+    parser.add_argument("--trips", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=365, help="Days of trip history before --end")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="Day of the active trips")
+    parser.add_argument("--active-share", type=float, default=0.3, help="Share of active vehicles with an active trip")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Truncate vehicles, companies and trips first")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args()))
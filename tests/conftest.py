@@ -0,0 +1,74 @@
+# tests/conftest.py
+import os
+
+import pytest
+
+# Database tests run against LOGMA_TEST_DATABASE_URL and drop and recreate
+# every table in it, so point it at a throwaway database. Without it they
+# are skipped. The app reads its settings on import, so this runs first.
+TEST_DATABASE_URL = os.environ.get("LOGMA_TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    os.environ["LOGMA_DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ.pop("LOGMA_REPLICA_DATABASE_URL", None)
+    # Fail any request that goes over its route's statement budget
+    os.environ["LOGMA_STATEMENT_BUDGET_MODE"] = "raise"
+
+
+class StatementCounter:
+    """Collects the SQL statements an engine sends while the block runs"""
+
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.statements = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        from sqlalchemy import event
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+
+    def __len__(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    """HTTP client for the app on a freshly created, empty schema"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("set LOGMA_TEST_DATABASE_URL to run database tests")
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy import text
+
+    from app.core.cache import company_cache, vehicle_cache, vehicle_number_cache
+    from app.database import Base, async_engine
+    from app.main import app
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        # Tables owned by migrations; tests install the ones they need
+        await conn.execute(text("DROP TABLE IF EXISTS table_version, trip_rollup_daily, schema_migrations"))
+        await conn.run_sync(Base.metadata.create_all)
+    for cache in (vehicle_cache, vehicle_number_cache, company_cache):
+        cache.clear()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    # The pool's connections belong to this test's event loop
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def count_statements():
+    """`with count_statements() as statements:` counts what the primary engine runs"""
+    from app.database import async_engine
+    return lambda: StatementCounter(async_engine)
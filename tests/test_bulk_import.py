@@ -0,0 +1,75 @@
+# tests/test_bulk_import.py
+from pathlib import Path
+
+import pytest
+
+from starlette.datastructures import UploadFile
+
+from app.core.spreadsheet import iter_rows
+from app.schemas.customer_company import CustomerCompanyCreate
+from app.schemas.imports import ImportResult
+from app.schemas.vehicle import VehicleCreate
+from app.services.bulk_import import _validate_rows
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+VEHICLE_CREATE = {"vehicle_number": "TN01AB1001", "registration_number": "REG-1001", "vehicle_type": "trailer"}
+
+
+def _rows(name: str):
+    with open(FIXTURES / name, "rb") as file:
+        return list(iter_rows(UploadFile(file, filename=name)))
+
+
+def test_blank_cells_are_left_out():
+    result = ImportResult()
+    valid = dict(_validate_rows(VehicleCreate, _rows("vehicles_blank_optional.csv"), result))
+
+    assert "status" not in valid[2] and "daily_status" not in valid[2]
+    assert valid[3]["status"] == "inactive"
+    assert "daily_status" not in valid[3]
+    assert valid[4]["daily_status"] == "in_line"
+    # A blank required cell is still an error, reported on its own row
+    assert sorted(valid) == [2, 3, 4]
+    assert result.failed == 1
+    assert result.errors[0].row == 5
+    assert "vehicle_number" in result.errors[0].error
+
+
+def test_blank_company_cells_are_left_out():
+    result = ImportResult()
+    valid = dict(_validate_rows(CustomerCompanyCreate, _rows("companies_blank_optional.csv"), result))
+
+    assert result.failed == 0
+    assert "email" not in valid[2] and "state" not in valid[2]
+    assert valid[3]["contract_type"] == "annual"
+
+
+@pytest.mark.anyio
+async def test_import_with_blank_cells(client):
+    existing = {**VEHICLE_CREATE, "status": "inactive", "daily_status": "assigned"}
+    response = await client.post("/api/vehicle/", json=existing)
+    assert response.status_code == 200
+
+    with open(FIXTURES / "vehicles_blank_optional.csv", "rb") as file:
+        response = await client.post(
+            "/api/vehicle/import",
+            params={"on_conflict": "update"},
+            files={"file": ("vehicles.csv", file, "text/csv")}
+        )
+    assert response.status_code == 200, response.text
+    assert response.json()["failed"] == 1
+
+    vehicles = {
+        vehicle["vehicle_number"]: vehicle
+        for vehicle in (await client.get("/api/vehicle/", params={"limit": 10})).json()
+    }
+    # Blank cells kept the stored values of the existing vehicle...
+    assert vehicles["TN01AB1001"]["status"] == "inactive"
+    assert vehicles["TN01AB1001"]["daily_status"] == "assigned"
+    assert vehicles["TN01AB1001"]["vehicle_type"] == "truck"
+    # ...and got the column defaults on new ones
+    assert vehicles["TN01AB1002"]["status"] == "inactive"
+    assert vehicles["TN01AB1002"]["daily_status"] == "available"
+    assert vehicles["TN01AB1003"]["status"] == "active"
+    assert vehicles["TN01AB1003"]["daily_status"] == "in_line"
@@ -0,0 +1,55 @@
+# tests/test_change_notifications.py
+import asyncio
+import json
+
+import asyncpg
+import pytest
+from sqlalchemy import insert, text
+
+from app.core.events import EVENTS_CHANNEL, _listen_dsn
+from app.database import async_engine
+from app.migrations.versions import v0007_change_notifications
+from app.models.vehicle import Vehicle
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def notifications(client):
+    """Installs the migration 0007 triggers and collects what they send"""
+    async with async_engine.begin() as conn:
+        for statement in v0007_change_notifications.upgrade:
+            await conn.execute(text(statement))
+    received = []
+    connection = await asyncpg.connect(_listen_dsn())
+    await connection.add_listener(EVENTS_CHANNEL, lambda *args: received.append(json.loads(args[-1])))
+    yield received
+    await connection.close()
+
+
+async def _settle() -> None:
+    # Notifications arrive asynchronously after the commit
+    await asyncio.sleep(0.2)
+
+
+async def test_bulk_update_sends_one_event(client, notifications):
+    async with async_engine.begin() as conn:
+        await conn.execute(insert(Vehicle).values([
+            {"vehicle_number": f"TN01AB{i:04d}", "registration_number": f"REG-{i}", "vehicle_type": "truck"}
+            for i in range(1200)
+        ]))
+    await _settle()
+    assert [(event["op"], event["count"], event["ids"]) for event in notifications] == [("insert", 1200, None)]
+
+    notifications.clear()
+    response = await client.post("/api/vehicle/daily-status", json={"vehicle_ids": [1, 2, 3], "daily_status": "in_line"})
+    assert response.json() == {"updated": 3}
+    await _settle()
+    assert notifications == [{"table": "vehicle", "op": "update", "count": 3, "ids": [1, 2, 3]}]
+
+
+async def test_statement_without_rows_sends_nothing(client, notifications):
+    response = await client.post("/api/vehicle/daily-status", json={"vehicle_ids": [1], "daily_status": "in_line"})
+    assert response.json() == {"updated": 0}
+    await _settle()
+    assert notifications == []
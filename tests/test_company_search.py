@@ -0,0 +1,38 @@
+# tests/test_company_search.py
+import pytest
+from sqlalchemy import text
+
+from app.database import AsyncSessionLocal
+from app.services import customer_company_service
+from app.services.customer_company_service import AsyncCustomerCompanyService
+
+from tests.test_write_statements import COMPANY, _create
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def trigram_unknown(monkeypatch):
+    monkeypatch.setattr(customer_company_service, "_trigram_available", None)
+
+
+async def test_failed_trigram_probe_falls_back_to_ilike(client, monkeypatch):
+    await _create(client, "/api/customer/", COMPANY)
+    monkeypatch.setattr(customer_company_service, "text", lambda sql: text("SELECT 1 FROM no_such_table"))
+
+    async with AsyncSessionLocal() as session:
+        companies = await AsyncCustomerCompanyService(session).search_companies_by_name("acme")
+    assert [company.name for company in companies] == [COMPANY["name"]]
+    # The failure is not remembered; the next search probes again
+    assert customer_company_service._trigram_available is None
+
+
+async def test_missing_trigram_is_rechecked(client, monkeypatch):
+    async with AsyncSessionLocal() as session:
+        assert not await AsyncCustomerCompanyService(session).search_companies_by_name("acme")
+    assert customer_company_service._trigram_available is False
+
+    monkeypatch.setattr(customer_company_service, "TRIGRAM_RECHECK_SECONDS", 0)
+    monkeypatch.setattr(customer_company_service, "text", lambda sql: text("SELECT 1"))
+    async with AsyncSessionLocal() as session:
+        assert await AsyncCustomerCompanyService(session)._has_trigram()
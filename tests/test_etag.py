@@ -0,0 +1,43 @@
+# tests/test_etag.py
+import pytest
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app.core import etag
+
+pytestmark = pytest.mark.anyio
+
+
+class _PgError(Exception):
+    def __init__(self, sqlstate: str):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+class _FailingSession:
+    def __init__(self, error: Exception):
+        self.error = error
+        self.rolled_back = False
+
+    async def execute(self, *args, **kwargs):
+        raise self.error
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+@pytest.fixture(autouse=True)
+def versions_available(monkeypatch):
+    monkeypatch.setattr(etag, "_versions_available", True)
+
+
+async def test_transient_error_skips_only_this_call():
+    session = _FailingSession(OperationalError("SELECT", {}, _PgError("57014")))
+    assert await etag.table_versions(session, "vehicle") is None
+    assert session.rolled_back
+    assert etag._versions_available
+
+
+async def test_missing_counter_table_disables_versions():
+    session = _FailingSession(ProgrammingError("SELECT", {}, _PgError(etag.UNDEFINED_TABLE)))
+    assert await etag.table_versions(session, "vehicle") is None
+    assert not etag._versions_available
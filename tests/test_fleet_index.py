@@ -0,0 +1,80 @@
+# tests/test_fleet_index.py
+import pytest
+from sqlalchemy import insert, text
+
+from app.core import etag
+from app.core.fleet_index import FleetIndex
+from app.database import AsyncSessionLocal, async_engine
+from app.migrations.versions import v0005_table_version_counters
+from app.models.vehicle import Vehicle
+from app.services import vehicle_service
+from app.services.vehicle_service import AsyncVehicleService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = FleetIndex(max_staleness=60, full_reload_interval=3600)
+    monkeypatch.setattr(vehicle_service, "fleet_index", index)
+    monkeypatch.setattr(etag, "_versions_available", True)
+    return index
+
+
+async def _reconcile() -> None:
+    async with AsyncSessionLocal() as session:
+        await AsyncVehicleService(session).reconcile_fleet_index()
+
+
+async def _execute(*statements) -> None:
+    async with async_engine.begin() as conn:
+        for statement in statements:
+            await conn.execute(text(statement) if isinstance(statement, str) else statement)
+
+
+@pytest.fixture
+async def vehicles(client):
+    await _execute(*v0005_table_version_counters.upgrade, insert(Vehicle).values([
+        {"vehicle_number": f"TN01AB{i:04d}", "registration_number": f"REG-{i}", "vehicle_type": "truck"}
+        for i in range(1, 21)
+    ]))
+
+
+async def test_disabled_without_version_counters(client, index, count_statements):
+    await _reconcile()
+    assert not index.enabled
+    assert not index.fresh()
+    with count_statements() as statements:
+        await _reconcile()
+    assert len(statements) == 0
+
+
+async def test_reloads_only_changed_rows(vehicles, index, count_statements):
+    await _reconcile()
+    assert (index.reloads, len(index)) == (1, 20)
+
+    with count_statements() as statements:
+        await _reconcile()
+    assert len(statements) == 1  # just the version counter
+    assert index.fresh()
+
+    await _execute("UPDATE vehicle SET daily_status = 'in_line' WHERE vehicle_id = 3")
+    await _reconcile()
+    assert (index.reloads, index.incremental_reloads) == (1, 1)
+    assert [vehicle["vehicle_id"] for vehicle in index.vehicles("active", "in_line")] == [3]
+
+
+async def test_unnoticed_delete_schedules_one_full_reload(vehicles, index):
+    await _reconcile()
+    await _execute("DELETE FROM vehicle WHERE vehicle_id = 5")
+    await _reconcile()
+    assert not index.fresh()
+
+    # Rate limited: the first full reload was just now
+    await _reconcile()
+    assert index.reloads == 1 and not index.fresh()
+
+    index.full_reload_interval = 0
+    await _reconcile()
+    assert index.reloads == 2 and index.fresh()
+    assert len(index) == 19
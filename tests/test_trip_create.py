@@ -0,0 +1,122 @@
+# tests/test_trip_create.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, text
+
+from tests.test_write_statements import COMPANY, _create
+
+pytestmark = pytest.mark.anyio
+
+
+def _vehicle(number: int) -> dict:
+    return {
+        "vehicle_number": f"TN01AB{number:04d}",
+        "registration_number": f"REG-{number:04d}",
+        "vehicle_type": "truck",
+    }
+
+
+def _trip(vehicle_id: int, company_id: int) -> dict:
+    return {
+        "vehicle_id": vehicle_id,
+        "company_id": company_id,
+        "load_tons": 12.5,
+        "factory": "Plant 1",
+        "trip_type": "single",
+        "trip_date_time": "2026-01-05T08:00:00",
+        "transport_manager_name": "R. Kumar",
+        "entry_by_role": "TM",
+    }
+
+
+async def test_create_trip_after_the_statement_goes_generic(client):
+    from app.database import AsyncSessionLocal
+    from app.schemas.trip_allocation import TripAllocationCreate
+    from app.services.trip_allocation_service import AsyncTripAllocationService
+
+    company = await _create(client, "/api/customer/", COMPANY)
+    vehicles = [await _create(client, "/api/vehicle/", _vehicle(number)) for number in range(1, 9)]
+
+    # Postgres moves a prepared statement to a generic plan after five runs;
+    # the ON CONFLICT target must still match the partial index then
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("SET plan_cache_mode = force_generic_plan"))
+        service = AsyncTripAllocationService(session)
+        for vehicle in vehicles:
+            trip = await service.create_trip(
+                TripAllocationCreate(**_trip(vehicle["vehicle_id"], company["customer_company_id"]))
+            )
+            assert trip.vehicle_id == vehicle["vehicle_id"]
+        await session.execute(text("RESET plan_cache_mode"))
+
+    # A busy vehicle is still refused by the index, not by a server error
+    response = await client.post(
+        "/api/trip_allocation/", json=_trip(vehicles[0]["vehicle_id"], company["customer_company_id"])
+    )
+    assert response.status_code == 400, response.text
+
+
+async def _bulk_create_racing_a_trip(client, mode: str):
+    """Bulk-create trips on two vehicles while another request allocates the first one"""
+    from app.database import AsyncSessionLocal
+    from app.models.trip_allocation import Trip_Allocation
+    from app.schemas.trip_allocation import TripAllocationBulkCreate
+    from app.services.trip_allocation_service import AsyncTripAllocationService
+
+    company = await _create(client, "/api/customer/", COMPANY)
+    vehicles = [await _create(client, "/api/vehicle/", _vehicle(number)) for number in (1, 2)]
+    trips = [_trip(vehicle["vehicle_id"], company["customer_company_id"]) for vehicle in vehicles]
+
+    async with AsyncSessionLocal() as session:
+        execute = session.execute
+
+        async def execute_after_a_concurrent_trip(statement, *args, **kwargs):
+            # Lands between the batch's validation queries and its INSERT
+            if getattr(statement, "is_insert", False) and args:
+                concurrent = {**trips[0], "trip_date_time": datetime(2026, 1, 5, 8), "status": "pending"}
+                concurrent["customer_company_id"] = concurrent.pop("company_id")
+                await execute(insert(Trip_Allocation).values(**concurrent))
+            return await execute(statement, *args, **kwargs)
+
+        session.execute = execute_after_a_concurrent_trip
+        service = AsyncTripAllocationService(session)
+        return await service.create_trips_bulk(TripAllocationBulkCreate(trips=trips, mode=mode))
+
+
+async def test_best_effort_bulk_fails_only_the_concurrently_allocated_item(client):
+    result = await _bulk_create_racing_a_trip(client, "best_effort")
+
+    assert (result.created, result.failed) == (1, 1)
+    assert [item.status for item in result.results] == ["failed", "created"]
+    assert "already allocated" in result.results[0].error
+
+
+async def test_all_or_nothing_bulk_fails_on_a_concurrent_allocation(client):
+    from fastapi import HTTPException
+
+    with pytest.raises(HTTPException) as raised:
+        await _bulk_create_racing_a_trip(client, "all_or_nothing")
+    assert raised.value.status_code == 409
+
+
+async def test_allocation_history_past_the_last_page(client):
+    company = await _create(client, "/api/customer/", COMPANY)
+    vehicle = await _create(client, "/api/vehicle/", _vehicle(1))
+    trips = []
+    for _ in range(2):
+        trip = await _create(client, "/api/trip_allocation/", _trip(vehicle["vehicle_id"], company["customer_company_id"]))
+        response = await client.put(f"/api/trip_allocation/{trip['trip_allocation_id']}", json={"status": "cancelled"})
+        assert response.status_code == 200
+        trips.append(trip)
+    path = f"/api/vehicle/allocations/{vehicle['vehicle_number']}"
+
+    first = (await client.get(path, params={"limit": 1})).json()
+    assert len(first["allocations"]) == 1 and first["next_cursor"]
+
+    # The older trip goes away before the client asks for the next page
+    response = await client.delete(f"/api/trip_allocation/{trips[0]['trip_allocation_id']}")
+    assert response.status_code == 200
+    last = (await client.get(path, params={"limit": 1, "after": first["next_cursor"]})).json()
+    assert last["allocations"] == [] and last["next_cursor"] is None
+    assert last.get("message") is None
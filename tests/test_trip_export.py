@@ -0,0 +1,46 @@
+# tests/test_trip_export.py
+import json
+
+import pytest
+
+from tests.test_write_statements import COMPANY, VEHICLE, _create, _create_trip
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_export_accepts_bounds_with_and_without_offset(client):
+    vehicle = await _create(client, "/api/vehicle/", VEHICLE)
+    company = await _create(client, "/api/customer/", COMPANY)
+    trip = await _create_trip(client, vehicle["vehicle_id"], company["customer_company_id"])
+
+    response = await client.get("/api/trip_allocation/export", params={
+        "date_from": "2026-01-05T00:00:00+05:30",
+        "date_to": "2026-01-06T00:00:00",
+    })
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["trip_allocation_id"] for row in rows] == [trip["trip_allocation_id"]]
+    # Encoded like the JSON responses
+    assert rows[0]["trip_date_time"] == trip["trip_date_time"]
+    assert rows[0]["created_at"] == trip["created_at"]
+
+
+async def test_export_rejects_empty_range_across_offsets(client):
+    response = await client.get("/api/trip_allocation/export", params={
+        "date_from": "2026-01-06T00:00:00",
+        "date_to": "2026-01-06T00:00:00+05:30",
+    })
+    assert response.status_code == 400
+
+
+async def test_export_filters_by_status(client):
+    vehicle = await _create(client, "/api/vehicle/", VEHICLE)
+    company = await _create(client, "/api/customer/", COMPANY)
+    trip = await _create_trip(client, vehicle["vehicle_id"], company["customer_company_id"])
+
+    response = await client.get("/api/trip_allocation/export", params={"status": ["pending", "allocated"]})
+    assert response.status_code == 200
+    assert [json.loads(line)["trip_allocation_id"] for line in response.text.splitlines()] == [trip["trip_allocation_id"]]
+
+    response = await client.get("/api/trip_allocation/export", params={"status": "pendng"})
+    assert response.status_code == 422
@@ -0,0 +1,24 @@
+# tests/test_trip_transitions.py
+import pytest
+
+from tests.test_write_statements import COMPANY, VEHICLE, _create, _create_trip
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_transition_requires_a_narrowing_filter(client):
+    response = await client.post("/api/trip_allocation/transitions", json={"to_status": "allocated"})
+    assert response.status_code == 400
+
+
+async def test_transition_by_company(client):
+    vehicle = await _create(client, "/api/vehicle/", VEHICLE)
+    company = await _create(client, "/api/customer/", COMPANY)
+    trip = await _create_trip(client, vehicle["vehicle_id"], company["customer_company_id"])
+
+    response = await client.post("/api/trip_allocation/transitions", json={
+        "to_status": "allocated",
+        "company_id": company["customer_company_id"],
+    })
+    assert response.status_code == 200
+    assert response.json()["trip_ids"] == [trip["trip_allocation_id"]]
@@ -0,0 +1,98 @@
+# tests/test_write_statements.py
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+VEHICLE = {"vehicle_number": "TN01AB0001", "registration_number": "REG-0001", "vehicle_type": "truck"}
+COMPANY = {"name": "Acme Steel", "phone": "9000000001"}
+
+
+async def _create(client, path: str, payload: dict) -> dict:
+    response = await client.post(path, json=payload)
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+async def _create_trip(client, vehicle_id: int, company_id: int) -> dict:
+    return await _create(client, "/api/trip_allocation/", {
+        "vehicle_id": vehicle_id,
+        "company_id": company_id,
+        "load_tons": 12.5,
+        "factory": "Plant 1",
+        "trip_type": "single",
+        "trip_date_time": "2026-01-05T08:00:00",
+        "transport_manager_name": "R. Kumar",
+        "entry_by_role": "TM",
+    })
+
+
+async def test_create_and_update_vehicle_use_one_statement(client, count_statements):
+    with count_statements() as statements:
+        vehicle = await _create(client, "/api/vehicle/", VEHICLE)
+    assert len(statements) == 1
+
+    with count_statements() as statements:
+        response = await client.put(f"/api/vehicle/{vehicle['vehicle_id']}", json={"vehicle_type": "trailer"})
+    assert response.status_code == 200
+    assert response.json()["vehicle_type"] == "trailer"
+    assert len(statements) == 1
+
+
+async def test_unknown_vehicle_status_is_rejected(client, count_statements):
+    with count_statements() as statements:
+        response = await client.post("/api/vehicle/", json={**VEHICLE, "status": "retired"})
+    assert response.status_code == 422
+    assert len(statements) == 0
+
+    vehicle = await _create(client, "/api/vehicle/", {**VEHICLE, "status": "inactive"})
+    response = await client.put(f"/api/vehicle/{vehicle['vehicle_id']}", json={"status": "retired"})
+    assert response.status_code == 422
+
+
+async def test_duplicate_vehicle_number_is_rejected_by_the_insert(client, count_statements):
+    await _create(client, "/api/vehicle/", VEHICLE)
+    with count_statements() as statements:
+        response = await client.post("/api/vehicle/", json=VEHICLE)
+    assert response.status_code == 400
+    assert len(statements) == 1
+
+
+async def test_company_writes_use_one_statement(client, count_statements):
+    with count_statements() as statements:
+        company = await _create(client, "/api/customer/", COMPANY)
+    assert len(statements) == 1
+
+    company_id = company["customer_company_id"]
+    with count_statements() as statements:
+        response = await client.put(f"/api/customer/{company_id}", json={"city": "Chennai"})
+    assert response.status_code == 200
+    assert response.json()["city"] == "Chennai"
+    assert len(statements) == 1
+
+    with count_statements() as statements:
+        response = await client.delete(f"/api/customer/{company_id}")
+    assert response.status_code == 204
+    assert len(statements) == 1
+
+
+async def test_update_trip_status_uses_one_statement(client, count_statements):
+    vehicle = await _create(client, "/api/vehicle/", VEHICLE)
+    company = await _create(client, "/api/customer/", COMPANY)
+    trip = await _create_trip(client, vehicle["vehicle_id"], company["customer_company_id"])
+
+    with count_statements() as statements:
+        response = await client.put(f"/api/trip_allocation/{trip['trip_allocation_id']}", json={"status": "allocated"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "allocated"
+    assert len(statements) == 1
+
+
+async def test_update_missing_trip_with_busy_vehicle_is_404(client, count_statements):
+    vehicle = await _create(client, "/api/vehicle/", VEHICLE)
+    company = await _create(client, "/api/customer/", COMPANY)
+    await _create_trip(client, vehicle["vehicle_id"], company["customer_company_id"])
+
+    with count_statements() as statements:
+        response = await client.put("/api/trip_allocation/999999", json={"vehicle_id": vehicle["vehicle_id"]})
+    assert response.status_code == 404
+    assert len(statements) == 1